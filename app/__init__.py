@@ -1,7 +1,8 @@
 import os
 from datetime import datetime
 from flask import Flask, render_template, g
-from .utils import markdown_to_html, format_dt
+from werkzeug.local import LocalProxy
+from .utils import markdown_to_html, format_dt, navigation_status
 import secrets
 
 from .extensions import (
@@ -52,6 +53,9 @@ def create_app(config_object='config.DevelopmentConfig'):
     @app.after_request
     def set_content_security_policy(response):
         """Restrict script and style sources to self and htmx CDN."""
+        if response.status_code == 304:
+            # keep the cached policy so it matches the cached page's nonce
+            return response
         nonce = getattr(g, 'csp_nonce', '')
         csp = (
             "default-src 'self'; "
@@ -87,17 +91,27 @@ def register_extensions(app):
     mail.init_app(app)
     limiter.init_app(app)
     if not scheduler.running:
+        from .services import timeline
+        app.config.setdefault('SCHEDULER_JOBSTORES', timeline.jobstores(app))
         scheduler.init_app(app)
         from .tasks import register_jobs
         register_jobs()
-        scheduler.start()
+        # jobs stay paused until this process wins the leader election; a
+        # paused scheduler still lets requests plan meeting events
+        scheduler.start(paused=True)
+        if scheduler.running:
+            register_scheduler_leader(app)
+    if app.config.get('EMAIL_DELIVERY') == 'thread':
+        from .services import outbox
+        outbox.start_thread(app)
     login_manager.login_view = 'auth.login'
 
     # register template filters
     app.jinja_env.filters['markdown_to_html'] = markdown_to_html
     app.jinja_env.filters['format_dt'] = format_dt
 
-    from .models import User, AppSetting, Meeting
+    from sqlalchemy.orm import joinedload
+    from .models import User, AppSetting, Role
 
     @app.context_processor
     def inject_settings():
@@ -107,16 +121,10 @@ def register_extensions(app):
 
     @app.context_processor
     def inject_meeting_status():
-        meeting = Meeting.query.order_by(Meeting.notice_date.desc()).first()
-        if meeting:
-            stage_label = meeting.status or 'Draft'
-            quorum_pct = meeting.quorum_percentage()
-        else:
-            stage_label = None
-            quorum_pct = None
+        """Expose the latest meeting's status, looked up only if a template uses it."""
         return {
-            'current_stage_label': stage_label,
-            'current_quorum_pct': quorum_pct,
+            'current_stage_label': LocalProxy(lambda: navigation_status()[0]),
+            'current_quorum_pct': LocalProxy(lambda: navigation_status()[1]),
         }
 
     @app.context_processor
@@ -158,7 +166,30 @@ def register_extensions(app):
 
     @login_manager.user_loader
     def load_user(user_id: str) -> User | None:
-        return db.session.get(User, int(user_id))
+        return db.session.scalar(
+            db.select(User)
+            .options(joinedload(User.role).joinedload(Role.permissions))
+            .where(User.id == int(user_id))
+        )
+
+
+def register_scheduler_leader(app):
+    """Campaign for scheduler leadership in processes that serve the site.
+
+    Tests never campaign. Under the ``flask`` command only the development
+    server serves requests, so it starts campaigning on its first request;
+    other commands leave the jobs to the web workers or ``run-scheduler``.
+    """
+    if app.testing or app.config.get('SCHEDULER_MODE', 'embedded') != 'embedded':
+        return
+    from .services import leader
+    if os.environ.get('FLASK_RUN_FROM_CLI') != 'true':
+        leader.start_thread(app)
+        return
+
+    @app.before_request
+    def start_scheduler_leader():
+        leader.start_thread(app)
 
 
 def register_blueprints(app):
@@ -202,7 +233,18 @@ def register_error_handlers(app):
 
 
 def register_cli_commands(app):
-    from .cli import create_admin, generate_fake_data
+    from .cli import (
+        create_admin,
+        generate_fake_data,
+        rebuild_tallies,
+        run_imports,
+        run_scheduler,
+        send_emails,
+    )
     app.cli.add_command(create_admin)
     app.cli.add_command(generate_fake_data)
+    app.cli.add_command(rebuild_tallies)
+    app.cli.add_command(send_emails)
+    app.cli.add_command(run_imports)
+    app.cli.add_command(run_scheduler)
 
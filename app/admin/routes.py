@@ -38,6 +38,8 @@ from .forms import (
 
 from ..permissions import permission_required
 from ..services.audit import record_action, get_logs
+from ..services import documents
+from ..services.objections import summaries as objection_summaries
 
 bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -48,35 +50,21 @@ bp = Blueprint("admin", __name__, url_prefix="/admin")
 def dashboard():
     meetings = Meeting.query.all()
     now = datetime.utcnow()
-    objection_amend_ids = (
-        db.session.query(AmendmentObjection.amendment_id)
-        .filter(AmendmentObjection.confirmed_at.isnot(None))
-        .group_by(AmendmentObjection.amendment_id)
-        .all()
-    )
+    rows = objection_summaries(now=now, confirmed_only=True)
+    amendments = {
+        a.id: a
+        for a in Amendment.query.filter(Amendment.id.in_([r.amendment_id for r in rows]))
+    }
     objections = []
-    for (aid,) in objection_amend_ids:
-        amend = db.session.get(Amendment, aid)
-        count = (
-            AmendmentObjection.query.filter_by(amendment_id=aid)
-            .filter(AmendmentObjection.confirmed_at.isnot(None))
-            .count()
-        )
-        deadlines = [
-            o.deadline_final or o.deadline_first
-            for o in AmendmentObjection.query.filter_by(amendment_id=aid)
-            .filter(AmendmentObjection.confirmed_at.isnot(None))
-        ]
-        upcoming = [d for d in deadlines if d and d > now]
-        if upcoming:
-            deadline = min(upcoming)
-            diff = deadline - now
+    for row in rows:
+        if row.next_deadline:
+            diff = row.next_deadline - now
             days = diff.days
             hours = diff.seconds // 3600
             remain = f"{days}d {hours}h"
         else:
             remain = "Closed"
-        objections.append((amend, count, remain))
+        objections.append((amendments[row.amendment_id], row.confirmed, remain))
     return render_template(
         "admin/dashboard.html", meetings=meetings, objections=objections
     )
@@ -91,6 +79,8 @@ def toggle_public_results(meeting_id: int):
         abort(404)
     meeting.public_results = not meeting.public_results
     db.session.commit()
+    if meeting.public_results:
+        documents.prewarm(meeting)
     record_action('toggle_public_results', f'meeting_id={meeting.id}')
     return redirect(url_for("admin.dashboard"))
 
@@ -104,6 +94,8 @@ def toggle_results_doc(meeting_id: int):
         abort(404)
     meeting.results_doc_published = not meeting.results_doc_published
     db.session.commit()
+    if meeting.results_doc_published:
+        documents.prewarm(meeting)
     record_action('toggle_results_doc', f'meeting_id={meeting.id}')
     return redirect(url_for("admin.dashboard"))
 
@@ -237,6 +229,7 @@ def _save_role(form: RoleForm, role: Role | None = None) -> Role:
 
     db.session.add(role)
     db.session.commit()
+    Role.invalidate_permissions()
     return role
 
 
@@ -290,6 +283,7 @@ def _save_permission(form: PermissionForm, perm: Permission | None = None) -> Pe
 
     db.session.add(perm)
     db.session.commit()
+    Role.invalidate_permissions()
     return perm
 
 
@@ -4,7 +4,9 @@ import yaml
 from flask import request, abort, jsonify, current_app, render_template
 
 from ..extensions import db, limiter
-from ..models import Meeting, Amendment, Motion, Vote, ApiToken
+from ..models import Meeting, ApiToken
+from ..services import tally
+from ..utils import results_not_modified
 from . import bp
 
 
@@ -30,19 +32,6 @@ def token_key_func():
     return request.remote_addr
 
 
-def _vote_counts(query):
-    counts = {"for": 0, "against": 0, "abstain": 0}
-    rows = (
-        db.session.query(Vote.choice, db.func.count(Vote.id))
-        .filter(query)
-        .group_by(Vote.choice)
-        .all()
-    )
-    for choice, count in rows:
-        counts[choice] = count
-    return counts
-
-
 @bp.get("/docs")
 def api_docs():
     docs_path = os.path.join(current_app.root_path, "..", "docs", "api.yaml")
@@ -72,39 +61,15 @@ def meeting_results(meeting_id: int):
         abort(404)
     if not meeting.public_results:
         abort(404)
-
-    tallies = []
-    amendments = (
-        Amendment.query.filter_by(meeting_id=meeting.id)
-        .order_by(Amendment.order)
-        .all()
-    )
-    for amend in amendments:
-        counts = _vote_counts(Vote.amendment_id == amend.id)
-        tallies.append(
-            {
-                "type": "amendment",
-                "id": amend.id,
-                "text": amend.text_md[:40],
-                **counts,
-            }
-        )
-
-    motions = (
-        Motion.query.filter_by(meeting_id=meeting.id)
-        .order_by(Motion.ordering)
-        .all()
+    not_modified = results_not_modified(meeting, "api", private=True)
+    if not_modified is not None:
+        return not_modified
+
+    matrix = tally.results_tallies(meeting)
+    tallies = tally.tally_rows(
+        tally.amendment_results(meeting, matrix),
+        tally.motion_results(meeting, matrix),
     )
-    for motion in motions:
-        counts = _vote_counts(Vote.motion_id == motion.id)
-        tallies.append(
-            {
-                "type": "motion",
-                "id": motion.id,
-                "text": motion.title,
-                **counts,
-            }
-        )
 
     return jsonify({"meeting_id": meeting.id, "tallies": tallies})
 
@@ -120,21 +85,6 @@ def meeting_stage1_results(meeting_id: int):
     if not (meeting.early_public_results or meeting.public_results):
         abort(404)
 
-    tallies = []
-    amendments = (
-        Amendment.query.filter_by(meeting_id=meeting.id)
-        .order_by(Amendment.order)
-        .all()
-    )
-    for amend in amendments:
-        counts = _vote_counts(Vote.amendment_id == amend.id)
-        tallies.append(
-            {
-                "type": "amendment",
-                "id": amend.id,
-                "text": amend.text_md[:40],
-                **counts,
-            }
-        )
+    tallies = tally.tally_rows(tally.amendment_results(meeting))
 
     return jsonify({"meeting_id": meeting.id, "tallies": tallies})
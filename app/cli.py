@@ -109,18 +109,18 @@ def generate_fake_data() -> None:
             )
             db.session.add(member)
             db.session.flush()
-            t1, _ = VoteToken.create(
+            VoteToken.create(
                 member_id=member.id,
                 stage=1,
                 salt=current_app.config["TOKEN_SALT"],
+                is_test=True,
             )
-            t2, _ = VoteToken.create(
+            VoteToken.create(
                 member_id=member.id,
                 stage=2,
                 salt=current_app.config["TOKEN_SALT"],
+                is_test=True,
             )
-            t1.is_test = True
-            t2.is_test = True
             members.append(member)
 
         motions: list[Motion] = []
@@ -208,4 +208,85 @@ def generate_fake_data() -> None:
     click.echo('Fake data generated.')
 
 
-__all__ = ['create_admin', 'generate_fake_data']
+@click.command('rebuild-tallies')
+@click.option('--meeting-id', type=int, default=None, help='Only rebuild this meeting.')
+@with_appcontext
+def rebuild_tallies(meeting_id: int | None) -> None:
+    """Recompute vote tally counters from the votes table."""
+    from .services import tally
+
+    drift = tally.rebuild_counters(meeting_id)
+    for (m_id, kind, target_id, stage, choice), stored, actual in drift:
+        click.echo(
+            f"Meeting {m_id} {kind} {target_id} stage {stage} {choice}: "
+            f"stored {stored}, actual {actual}"
+        )
+    if drift:
+        click.echo(f'Rebuilt tallies; corrected {len(drift)} drifted counter(s).')
+    else:
+        click.echo('Rebuilt tallies; no drift found.')
+
+
+@click.command('send-emails')
+@click.option('--once', is_flag=True, help='Deliver one batch and exit.')
+@click.option('--batch-size', type=int, default=None, help='Emails claimed per pass.')
+@click.option('--poll-seconds', type=float, default=5.0, show_default=True,
+              help='Wait between passes when the outbox is empty.')
+@click.option('--requeue-dead', is_flag=True, help='Retry dead-lettered emails first.')
+@with_appcontext
+def send_emails(once: bool, batch_size: int | None, poll_seconds: float, requeue_dead: bool) -> None:
+    """Deliver queued emails from the outbox."""
+    from .services import outbox
+
+    if requeue_dead:
+        click.echo(f'Requeued {outbox.requeue_dead()} dead-lettered email(s).')
+    if once:
+        counts = outbox.dispatch(batch_size)
+        click.echo(
+            f"Sent {counts['sent']}, retrying {counts['retry']}, dead-lettered {counts['dead']}."
+        )
+        return
+    if batch_size:
+        current_app.config['EMAIL_OUTBOX_BATCH_SIZE'] = batch_size
+    click.echo('Delivering queued emails; press Ctrl+C to stop.')
+    outbox.run(poll_seconds)
+
+
+@click.command('run-imports')
+@with_appcontext
+def run_imports() -> None:
+    """Run queued member imports and resume ones whose worker stopped."""
+    from .services import member_import
+
+    count = member_import.resume_jobs()
+    click.echo(f'Ran {count} member import job(s).')
+
+
+@click.command('run-scheduler')
+@click.option('--poll-seconds', type=float, default=None, help='Seconds between leader lock checks.')
+@with_appcontext
+def run_scheduler(poll_seconds: float | None) -> None:
+    """Run scheduled jobs in this process while it holds the leader lock."""
+    from .extensions import scheduler
+    from .services import leader
+
+    if not scheduler.running:
+        # bypass Flask-APScheduler's debug reloader check; this process is the worker
+        scheduler.scheduler.start(paused=True)
+    click.echo('Running scheduled jobs while this process is leader; press Ctrl+C to stop.')
+    thread = leader.start_thread(current_app._get_current_object(), poll_seconds)
+    try:
+        while thread.is_alive():
+            thread.join(1)
+    except KeyboardInterrupt:
+        pass
+
+
+__all__ = [
+    'create_admin',
+    'generate_fake_data',
+    'rebuild_tallies',
+    'run_imports',
+    'run_scheduler',
+    'send_emails',
+]
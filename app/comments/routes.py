@@ -54,14 +54,13 @@ def _verify_token(token: str) -> tuple[Member, Meeting]:
             db.session.commit()
         g.member_id = member.id
         return member, meeting
-    vote_token = VoteToken.verify(token, current_app.config["TOKEN_SALT"])
-    if not vote_token:
+    loaded = VoteToken.load(token, current_app.config["TOKEN_SALT"])
+    if loaded is None:
         abort(404)
-    member = db.session.get(Member, vote_token.member_id)
-    if not member or not member.can_comment:
+    _, member, _, meeting, _ = loaded
+    if not member.can_comment:
         abort(403)
-    meeting = db.session.get(Meeting, member.meeting_id)
-    if not meeting or not meeting.comments_enabled:
+    if not meeting.comments_enabled:
         abort(403)
     g.member_id = member.id
     return member, meeting
@@ -32,6 +32,7 @@ from ..models import (
     MeetingFile,
     EmailSetting,
     EmailLog,    
+    ImportJob,
     MotionVersion,
     AmendmentVersion,
     MotionSubmission,
@@ -44,6 +45,7 @@ from ..services.email import (
     send_runoff_invite,
     send_quorum_failure,
     send_final_results,
+    final_results_payload,
     send_objection_confirmation,
     send_proxy_invite,
     send_submission_invite,
@@ -52,8 +54,9 @@ from ..services.email import (
     send_stage1_reminder,
     auto_send_enabled,
     _branding,
+    mail_context,
 )
-from ..services import runoff
+from ..services import documents, member_import, runoff, tally, timeline
 from ..services.audit import record_action
 from ..comments import routes as comments
 from ..permissions import permission_required
@@ -87,7 +90,7 @@ from docx.shared import RGBColor, Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml import parse_xml
 from docx.oxml.ns import nsdecls
-from ..utils import config_or_setting, append_motion_preferences
+from ..utils import config_or_setting, append_motion_preferences, reset_navigation_status
 import os
 
 bp = Blueprint("meetings", __name__, url_prefix="/meetings")
@@ -275,6 +278,11 @@ def _save_meeting(form: MeetingForm, meeting: Meeting | None = None) -> Meeting:
     """Populate Meeting from form and save."""
     if meeting is None:
         meeting = Meeting()
+    published_before = (
+        bool(meeting.public_results),
+        bool(meeting.results_doc_published),
+        meeting.status == "Completed",
+    )
     _prefill_form_defaults(form)
     form.populate_obj(meeting)
     db.session.add(meeting)
@@ -289,6 +297,16 @@ def _save_meeting(form: MeetingForm, meeting: Meeting | None = None) -> Meeting:
     ):
         meeting.status = "Pending Stage 2"
         db.session.commit()
+    timeline.plan_meeting(meeting)
+    reset_navigation_status()
+    published_after = (
+        bool(meeting.public_results),
+        bool(meeting.results_doc_published),
+        meeting.status == "Completed",
+    )
+    # only render documents when this save publishes results or closes the meeting
+    if any(after and not before for before, after in zip(published_before, published_after)):
+        documents.prewarm(meeting)
     return meeting
 
 
@@ -424,103 +442,54 @@ def import_members(meeting_id):
     form = MemberImportForm()
     if form.validate_on_submit():
         file_data = form.csv_file.data
-        csv_text = file_data.read().decode("utf-8-sig")
-        reader = csv.DictReader(io.StringIO(csv_text))
-        expected = ["member_id", "name", "email", "proxy_for"]
-        if reader.fieldnames != expected:
-            flash("CSV headers must be: " + ", ".join(expected), "error")
+        try:
+            job = member_import.create_job(
+                meeting,
+                getattr(file_data, "stream", file_data),
+                getattr(file_data, "filename", None),
+                user_id=current_user.id,
+            )
+        except member_import.HeaderError as exc:
+            flash(str(exc), "error")
             return render_template(
                 "meetings/import_members.html", form=form, meeting=meeting
             )
+        member_import.start_job(
+            current_app._get_current_object(), job.id, base_url=request.host_url
+        )
+        if not auto_send_enabled(meeting, 'stage1_invite'):
+            flash("Automatic emails disabled - use manual send", "warning")
+        flash("Import started - progress is shown below", "success")
+        return redirect(url_for("meetings.list_members", meeting_id=meeting.id))
 
-        seen_emails: set[str] = set()
-        seen_numbers: set[str] = set()
-        tokens_to_send: list[tuple[Member, str]] = []
-        proxy_tokens: list[tuple[Member, Member, str]] = []
-        for idx, row in enumerate(reader, start=2):
-            name = row["name"].strip()
-            email = row["email"].strip().lower()
-            number = (row.get("member_id") or "").strip()
-
-            if not name:
-                flash(f"Row {idx}: name is required", "error")
-                return render_template(
-                    "meetings/import_members.html", form=form, meeting=meeting
-                )
-            if not email or "@" not in email:
-                flash(f"Row {idx}: invalid email: {email}", "error")
-                return render_template(
-                    "meetings/import_members.html", form=form, meeting=meeting
-                )
-            if (
-                email in seen_emails
-                or Member.query.filter_by(meeting_id=meeting.id, email=email).first()
-            ):
-                flash(f"Duplicate email: {email}", "error")
-                return render_template(
-                    "meetings/import_members.html", form=form, meeting=meeting
-                )
-            if number and (
-                number in seen_numbers
-                or Member.query.filter_by(
-                    meeting_id=meeting.id, member_number=number
-                ).first()
-            ):
-                flash(f"Duplicate member ID: {number}", "error")
-                return render_template(
-                    "meetings/import_members.html", form=form, meeting=meeting
-                )
-            seen_emails.add(email)
-            if number:
-                seen_numbers.add(number)
+    return render_template("meetings/import_members.html", form=form, meeting=meeting)
 
-            member = Member(
-                meeting_id=meeting.id,
-                member_number=number,
-                name=name,
-                email=email,
-                proxy_for=(row.get("proxy_for") or "").strip() or None,
-            )
-            db.session.add(member)
-            db.session.flush()
-            if meeting.ballot_mode != "in-person":
-                token_obj, plain = VoteToken.create(
-                    member_id=member.id,
-                    stage=1,
-                    salt=current_app.config["TOKEN_SALT"],
-                )
-                tokens_to_send.append((member, plain))
 
-        db.session.commit()
-        # create proxy tokens after all members exist
-        members = Member.query.filter_by(meeting_id=meeting.id).all()
-        for proxy in members:
-            if proxy.proxy_for:
-                try:
-                    target = db.session.get(Member, int(proxy.proxy_for))
-                except (ValueError, TypeError):
-                    target = None
-                if target and meeting.ballot_mode != "in-person":
-                    token_obj, plain = VoteToken.create(
-                        member_id=target.id,
-                        stage=1,
-                        salt=current_app.config["TOKEN_SALT"],
-                        proxy_holder_id=proxy.id,
-                    )
-                    proxy_tokens.append((proxy, target, plain))
-        db.session.commit()
+@bp.route("/<int:meeting_id>/import-members/errors/<report_id>.csv")
+@login_required
+@permission_required("manage_meetings")
+def import_error_report(meeting_id: int, report_id: str):
+    """Download the rows skipped by a member import."""
+    path = member_import.report_path(meeting_id, report_id)
+    if path is None:
+        abort(404)
+    return send_file(
+        path,
+        mimetype="text/csv",
+        as_attachment=True,
+        download_name="member-import-errors.csv",
+    )
 
-        if auto_send_enabled(meeting, 'stage1_invite'):
-            for m, t in tokens_to_send:
-                send_vote_invite(m, t, meeting)
-            for p, target, tok in proxy_tokens:
-                send_proxy_invite(p, target, tok, meeting)
-        else:
-            flash("Automatic emails disabled - use manual send", "warning")
-        flash("Members imported successfully", "success")
-        return redirect(url_for("meetings.list_meetings"))
 
-    return render_template("meetings/import_members.html", form=form, meeting=meeting)
+@bp.route("/<int:meeting_id>/import-jobs/<int:job_id>")
+@login_required
+@permission_required("manage_meetings")
+def import_job_status(meeting_id: int, job_id: int):
+    """Return the progress card of a member import for HTMX polling."""
+    job = db.session.get(ImportJob, job_id)
+    if job is None or job.meeting_id != meeting_id:
+        abort(404)
+    return render_template("meetings/_import_progress.html", job=job)
 
 
 @bp.route("/sample-members.csv")
@@ -620,6 +589,18 @@ def list_members(meeting_id: int):
         "final_results": meeting.status == "Completed",
     }
 
+    import_jobs = (
+        ImportJob.query.filter(
+            ImportJob.meeting_id == meeting.id,
+            db.or_(
+                ImportJob.status.in_(("queued", "running")),
+                ImportJob.finished_at >= now - timedelta(hours=1),
+            ),
+        )
+        .order_by(ImportJob.id)
+        .all()
+    )
+
     if (
         request.headers.get("HX-Request")
         and request.headers.get("HX-Target") == "member-table-body"
@@ -640,6 +621,7 @@ def list_members(meeting_id: int):
         now=now,
         runoff_exists=runoff_exists,
         email_opts=email_opts,
+        import_jobs=import_jobs,
     )
 
 
@@ -652,7 +634,7 @@ def delete_member(meeting_id: int, member_id: int):
     if meeting is None:
         abort(404)
     member = Member.query.filter_by(id=member_id, meeting_id=meeting.id).first_or_404()
-    Vote.query.filter_by(member_id=member.id).delete()
+    Vote.delete_where(Vote.member_id == member.id)
     VoteToken.query.filter_by(member_id=member.id).delete()
     db.session.delete(member)
     db.session.commit()
@@ -670,9 +652,7 @@ def delete_all_members(meeting_id: int):
         abort(404)
     member_ids = [m.id for m in Member.query.filter_by(meeting_id=meeting.id).all()]
     if member_ids:
-        Vote.query.filter(Vote.member_id.in_(member_ids)).delete(
-            synchronize_session=False
-        )
+        Vote.delete_where(Vote.member_id.in_(member_ids))
         VoteToken.query.filter(VoteToken.member_id.in_(member_ids)).delete(
             synchronize_session=False
         )
@@ -1462,6 +1442,14 @@ def confirm_objection(token: str):
         obj.confirmed_at = datetime.utcnow()
         obj.deadline_first = obj.created_at + timedelta(days=5)
         db.session.commit()
+        meeting = (
+            Meeting.query.join(Amendment, Amendment.meeting_id == Meeting.id)
+            .filter(Amendment.id == obj.amendment_id)
+            .first()
+        )
+        if meeting:
+            # a late confirmation can still tip an amendment past its deadline
+            timeline.plan_meeting(meeting, check_objections=True)
     return render_template("meetings/objection_confirmed.html", objection=obj)
 
 
@@ -1543,52 +1531,12 @@ def delete_conflict(conflict_id: int):
 
 def _amendment_results(meeting: Meeting) -> list[tuple[Amendment, dict]]:
     """Return vote counts for each amendment."""
-    amendments = (
-        Amendment.query.filter_by(meeting_id=meeting.id).order_by(Amendment.order).all()
-    )
-    results = []
-    for amend in amendments:
-        counts = {
-            "for": 0,
-            "against": 0,
-            "abstain": 0,
-        }
-        rows = (
-            db.session.query(Vote.choice, func.count(Vote.id))
-            .filter_by(amendment_id=amend.id)
-            .filter(Vote.is_test.is_(False))
-            .group_by(Vote.choice)
-            .all()
-        )
-        for choice, count in rows:
-            counts[choice] = count
-        results.append((amend, counts))
-    return results
+    return tally.amendment_results(meeting)
 
 
 def _motion_results(meeting: Meeting) -> list[tuple[Motion, dict]]:
     """Return vote counts for each motion."""
-    motions = (
-        Motion.query.filter_by(meeting_id=meeting.id).order_by(Motion.ordering).all()
-    )
-    results: list[tuple[Motion, dict]] = []
-    for motion in motions:
-        counts = {
-            "for": 0,
-            "against": 0,
-            "abstain": 0,
-        }
-        rows = (
-            db.session.query(Vote.choice, func.count(Vote.id))
-            .filter_by(motion_id=motion.id)
-            .filter(Vote.is_test.is_(False))
-            .group_by(Vote.choice)
-            .all()
-        )
-        for choice, count in rows:
-            counts[choice] = count
-        results.append((motion, counts))
-    return results
+    return tally.motion_results(meeting)
 
 
 def _merge_form(motions: list[Motion]) -> FlaskForm:
@@ -1624,8 +1572,9 @@ def close_stage1(meeting_id: int):
                 )
         members = Member.query.filter_by(meeting_id=meeting.id).all()
         if auto_send_enabled(meeting, 'quorum_failure'):
-            for member in members:
-                send_quorum_failure(member, meeting)
+            with mail_context(members):
+                for member in members:
+                    send_quorum_failure(member, meeting)
         else:
             flash("Automatic emails disabled - use manual send", "warning")
         flash(
@@ -1636,14 +1585,13 @@ def close_stage1(meeting_id: int):
 
     # if no amendments were proposed, skip Stage 1 entirely
     if Amendment.query.filter_by(meeting_id=meeting.id).count() == 0:
-        members = Member.query.filter_by(meeting_id=meeting.id).all()
         if meeting.ballot_mode != "in-person":
-            for member in members:
-                VoteToken.create(
-                    member_id=member.id,
-                    stage=2,
-                    salt=current_app.config["TOKEN_SALT"],
-                )
+            member_ids = db.session.scalars(
+                db.select(Member.id).where(Member.meeting_id == meeting.id)
+            ).all()
+            VoteToken.create_bulk(
+                member_ids, 2, current_app.config["TOKEN_SALT"], meeting_id=meeting.id
+            )
         meeting.status = "Pending Stage 2"
         db.session.commit()
         if meeting.opens_at_stage2 and meeting.stage1_closed_at:
@@ -1663,11 +1611,12 @@ def close_stage1(meeting_id: int):
 
     if runoffs:
         if auto_send_enabled(meeting, 'runoff_invite'):
-            for recipient, target, token in tokens_to_send:
-                if target:
-                    send_proxy_invite(recipient, target, token, meeting)
-                else:
-                    send_runoff_invite(recipient, token, meeting)
+            with mail_context([recipient for recipient, _, _ in tokens_to_send]):
+                for recipient, target, token in tokens_to_send:
+                    if target:
+                        send_proxy_invite(recipient, target, token, meeting)
+                    else:
+                        send_runoff_invite(recipient, token, meeting)
         else:
             flash("Automatic emails disabled - use manual send", "warning")
         flash("Run-off ballot issued; Stage 2 start delayed", "success")
@@ -1947,8 +1896,9 @@ def manual_send_emails(meeting_id: int):
     if form.validate_on_submit():
         recipients = []
         if form.test_mode.data:
+            # a test send never re-keys the live link of a real member
             current_user_member = Member.query.filter_by(
-                meeting_id=meeting.id, email=current_user.email
+                meeting_id=meeting.id, email=current_user.email, is_test=True
             ).first()
             if not current_user_member:
                 current_user_member = Member(
@@ -1965,38 +1915,37 @@ def manual_send_emails(meeting_id: int):
         else:
             recipients = [m for m in members if m.id in form.member_ids.data]
 
-        for member in recipients:
-            stage = 1
-            if form.email_type.data == "stage2_invite":
-                stage = 2
-            token_obj, plain = VoteToken.create(
-                member_id=member.id,
-                stage=stage,
-                salt=current_app.config["TOKEN_SALT"],
-            )
-            token_obj.is_test = form.test_mode.data
-            db.session.commit()
-
-            if form.email_type.data == "stage1_invite":
-                send_vote_invite(member, plain, meeting, test_mode=form.test_mode.data)
-            elif form.email_type.data == "stage1_reminder":
-                send_stage1_reminder(
-                    member, plain, meeting, test_mode=form.test_mode.data
-                )
-            elif form.email_type.data == "runoff_invite":
-                send_runoff_invite(
-                    member, plain, meeting, test_mode=form.test_mode.data
-                )
-            elif form.email_type.data == "stage2_invite":
-                send_stage2_invite(
-                    member, plain, meeting, test_mode=form.test_mode.data
-                )
-            elif form.email_type.data == "submission_invite":
-                send_submission_invite(member, meeting, test_mode=form.test_mode.data)
-            elif form.email_type.data == "review_invite":
-                send_review_invite(member, meeting, test_mode=form.test_mode.data)
-            elif form.email_type.data == "amendment_review_invite":
-                send_amendment_review_invite(member, meeting, test_mode=form.test_mode.data)
+        stage = 2 if form.email_type.data == "stage2_invite" else 1
+        tokens = VoteToken.create_bulk(
+            [member.id for member in recipients],
+            stage,
+            current_app.config["TOKEN_SALT"],
+            is_test=form.test_mode.data,
+            meeting_id=meeting.id,
+        )
+        db.session.commit()
+        with mail_context(recipients):
+            for member, (_, plain) in zip(recipients, tokens):
+                if form.email_type.data == "stage1_invite":
+                    send_vote_invite(member, plain, meeting, test_mode=form.test_mode.data)
+                elif form.email_type.data == "stage1_reminder":
+                    send_stage1_reminder(
+                        member, plain, meeting, test_mode=form.test_mode.data
+                    )
+                elif form.email_type.data == "runoff_invite":
+                    send_runoff_invite(
+                        member, plain, meeting, test_mode=form.test_mode.data
+                    )
+                elif form.email_type.data == "stage2_invite":
+                    send_stage2_invite(
+                        member, plain, meeting, test_mode=form.test_mode.data
+                    )
+                elif form.email_type.data == "submission_invite":
+                    send_submission_invite(member, meeting, test_mode=form.test_mode.data)
+                elif form.email_type.data == "review_invite":
+                    send_review_invite(member, meeting, test_mode=form.test_mode.data)
+                elif form.email_type.data == "amendment_review_invite":
+                    send_amendment_review_invite(member, meeting, test_mode=form.test_mode.data)
 
         flash("Emails sent", "success")
         return redirect(url_for("meetings.results_summary", meeting_id=meeting.id))
@@ -2029,6 +1978,7 @@ def extend_stage(meeting_id: int, stage: int):
             meeting.closes_at_stage2 = form.closes_at.data
         meeting.extension_reason = form.reason.data
         db.session.commit()
+        timeline.plan_meeting(meeting)
         flash("Stage dates updated", "success")
         return redirect(url_for("meetings.results_summary", meeting_id=meeting.id))
     return render_template(
@@ -2240,8 +2190,26 @@ def results_docx(meeting_id: int):
     meeting = db.session.get(Meeting, meeting_id)
     if meeting is None:
         abort(404)
-    results = _amendment_results(meeting)
     include_logo = request.args.get("logo") == "1"
+    path = documents.cached_document(
+        meeting,
+        "results.docx",
+        lambda: _stage1_results_docx(meeting, include_logo),
+        include_logo=include_logo,
+    )
+    resp = send_file(
+        path,
+        mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        as_attachment=True,
+        download_name="results.docx",
+    )
+    resp.headers["Content-Disposition"] = 'attachment; filename="results.docx"'
+    return resp
+
+
+def _stage1_results_docx(meeting: Meeting, include_logo: bool = False) -> bytes:
+    """Render the Stage 1 amendment tallies as a DOCX document."""
+    results = _amendment_results(meeting)
     doc = _styled_doc(f"{meeting.title} - Stage 1 Results", include_logo)
 
     table = doc.add_table(rows=1, cols=4)
@@ -2265,15 +2233,7 @@ def results_docx(meeting_id: int):
                 _shade_cell(c, "F7F7F9")
     buf = io.BytesIO()
     doc.save(buf)
-    buf.seek(0)
-    resp = send_file(
-        buf,
-        mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        as_attachment=True,
-        download_name="results.docx",
-    )
-    resp.headers["Content-Disposition"] = 'attachment; filename="results.docx"'
-    return resp
+    return buf.getvalue()
 
 
 @bp.route("/<int:meeting_id>/prepare-stage2", methods=["GET", "POST"])
@@ -2299,36 +2259,26 @@ def prepare_stage2(meeting_id: int):
             data = form[f"motion_{motion.id}"].data
             motion.final_text_md = data
         members = Member.query.filter_by(meeting_id=meeting.id).all()
-        tokens_to_send: list[tuple[Member, str]] = []
-        proxy_tokens: list[tuple[Member, Member, str]] = []
-        for member in members:
-            token_obj, plain = VoteToken.create(
-                member_id=member.id,
-                stage=2,
-                salt=current_app.config["TOKEN_SALT"],
-            )
-            tokens_to_send.append((member, plain))
-        for proxy in members:
-            if proxy.proxy_for:
-                try:
-                    target = db.session.get(Member, int(proxy.proxy_for))
-                except (ValueError, TypeError):
-                    target = None
-                if target:
-                    token_obj, plain = VoteToken.create(
-                        member_id=target.id,
-                        stage=2,
-                        salt=current_app.config["TOKEN_SALT"],
-                        proxy_holder_id=proxy.id,
-                    )
-                    proxy_tokens.append((proxy, target, plain))
+        by_id = {m.id: m for m in members}
+        proxies = VoteToken.proxy_map(members)
+        pairs = VoteToken.create_bulk(
+            by_id, 2, current_app.config["TOKEN_SALT"], proxies, meeting_id=meeting.id
+        )
+        tokens_to_send: list[tuple[Member, str]] = [
+            (by_id[member_id], plain) for member_id, plain in pairs[: len(members)]
+        ]
+        proxy_tokens: list[tuple[Member, Member, str]] = [
+            (by_id[proxy_id], by_id[proxies[proxy_id]], plain)
+            for proxy_id, plain in pairs[len(members) :]
+        ]
         meeting.status = "Stage 2"
         db.session.commit()
         if auto_send_enabled(meeting, 'stage2_invite'):
-            for m, t in tokens_to_send:
-                send_stage2_invite(m, t, meeting)
-            for p, target, tok in proxy_tokens:
-                send_proxy_invite(p, target, tok, meeting)
+            with mail_context([m for m, _ in tokens_to_send] + [p for p, _, _ in proxy_tokens]):
+                for m, t in tokens_to_send:
+                    send_stage2_invite(m, t, meeting)
+                for p, target, tok in proxy_tokens:
+                    send_proxy_invite(p, target, tok, meeting)
         else:
             flash("Automatic emails disabled - use manual send", "warning")
         flash("Stage 2 voting links sent", "success")
@@ -2355,10 +2305,30 @@ def results_stage2_docx(meeting_id: int):
         abort(404)
     if not meeting.public_results or not meeting.results_doc_published:
         abort(404)
-    amend_results = _amendment_results(meeting)
-    motion_results = _motion_results(meeting)
-
     include_logo = request.args.get("logo") == "1"
+    path = documents.cached_document(
+        meeting,
+        "final_results.docx",
+        lambda: _final_results_docx(meeting, include_logo),
+        include_logo=include_logo,
+    )
+    resp = send_file(
+        path,
+        mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        as_attachment=True,
+        download_name="final_results.docx",
+    )
+    resp.headers["Content-Disposition"] = 'attachment; filename="final_results.docx"'
+    return resp
+
+
+@documents.renderer("final_results.docx")
+def _final_results_docx(meeting: Meeting, include_logo: bool = False) -> bytes:
+    """Render carried amendments and motion outcomes as a DOCX document."""
+    tallies = tally.results_tallies(meeting)
+    amend_results = tally.amendment_results(meeting, tallies)
+    motion_results = tally.motion_results(meeting, tallies)
+
     doc = _styled_doc(f"{meeting.title} - Final Results", include_logo)
     para = doc.add_paragraph(
         "This document is a draft summary. The organisation reserves the right to issue a final official version."
@@ -2404,15 +2374,7 @@ def results_stage2_docx(meeting_id: int):
 
     buf = io.BytesIO()
     doc.save(buf)
-    buf.seek(0)
-    resp = send_file(
-        buf,
-        mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        as_attachment=True,
-        download_name="final_results.docx",
-    )
-    resp.headers["Content-Disposition"] = 'attachment; filename="final_results.docx"'
-    return resp
+    return buf.getvalue()
 
 
 @bp.route("/<int:meeting_id>/stage1.ics")
@@ -2495,12 +2457,16 @@ def close_stage2(meeting_id: int):
         motion.status = "carried" if carried else "failed"
 
     meeting.status = "Completed"
+    tally.freeze_results(meeting, 2)
     db.session.commit()
+    documents.prewarm(meeting)
 
     members = Member.query.filter_by(meeting_id=meeting.id).all()
     if auto_send_enabled(meeting, 'final_results'):
-        for member in members:
-            send_final_results(member, meeting)
+        payload = final_results_payload(meeting)
+        with mail_context(members):
+            for member in members:
+                send_final_results(member, meeting, payload=payload)
     else:
         flash("Automatic emails disabled - use manual send", "warning")
 
@@ -2642,8 +2608,10 @@ def send_final_results_all(meeting_id: int):
         abort(404)
 
     members = Member.query.filter_by(meeting_id=meeting.id).all()
-    for member in members:
-        send_final_results(member, meeting)
+    payload = final_results_payload(meeting)
+    with mail_context(members):
+        for member in members:
+            send_final_results(member, meeting, payload=payload)
 
     flash("Final results emailed", "success")
     return redirect(url_for("meetings.meeting_overview", meeting_id=meeting.id))
@@ -1,8 +1,16 @@
 from datetime import datetime, timedelta
 import hashlib
+import json
 import math
-from flask import current_app
+import time
+from collections import defaultdict
+from typing import Iterable, Mapping
+from flask import current_app, g, has_app_context
 from flask_login import UserMixin
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session, aliased
+from uuid import uuid4
 from uuid6 import uuid7
 from .extensions import db, bcrypt
 
@@ -26,6 +34,32 @@ class Role(db.Model):
         "Permission", secondary=roles_permissions, back_populates="roles"
     )
 
+    # AppSetting row changed whenever roles or permissions are edited.
+    VERSION_KEY = "_permissions_version"
+
+    def permission_names(self) -> frozenset[str]:
+        """Return the names of this role's permissions.
+
+        Sets are kept per process and role, tagged with the permissions
+        version, so checks on later requests do not touch the permissions
+        table until :meth:`invalidate_permissions` is called.
+        """
+        if self.id is None:
+            return frozenset(p.name for p in self.permissions)
+        version = AppSetting.get(self.VERSION_KEY)
+        cache = current_app.extensions.setdefault("role_permissions", {})
+        cached = cache.get(self.id)
+        if cached is None or cached[0] != version:
+            cached = (version, frozenset(p.name for p in self.permissions))
+            cache[self.id] = cached
+        return cached[1]
+
+    @classmethod
+    def invalidate_permissions(cls) -> None:
+        """Make every process reload role permissions on their next check."""
+        current_app.extensions.pop("role_permissions", None)
+        AppSetting.set(cls.VERSION_KEY, uuid4().hex)
+
 
 class Permission(db.Model):
     """System permission that can be assigned to roles."""
@@ -38,23 +72,80 @@ class Permission(db.Model):
     )
 
 
+class _SettingsCache:
+    """Every ``app_settings`` row of one app, with the version it was read at."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, str | None] = {}
+        self.version: str | None = None
+        self.loaded = False
+        self.checked_at = 0.0
+
+
 class AppSetting(db.Model):
-    """Key-value application setting stored in the database."""
+    """Key-value application setting stored in the database.
+
+    Each process keeps all settings in memory. Writes through :meth:`set`
+    and :meth:`delete` change the ``_version`` row, and readers compare it
+    once per app context (so once per request) and at most every
+    ``APP_SETTINGS_CACHE_SECONDS`` in long-lived contexts, reloading the
+    table only when it moved.
+    """
 
     __tablename__ = "app_settings"
+    VERSION_KEY = "_version"
 
     id = db.Column(db.Integer, primary_key=True)
     key = db.Column(db.String(50), unique=True, nullable=False)
     value = db.Column(db.Text)
     group = db.Column(db.String(50))
 
+    @staticmethod
+    def _cache() -> _SettingsCache:
+        return current_app.extensions.setdefault("app_settings", _SettingsCache())
+
+    @classmethod
+    def _current_version(cls) -> str | None:
+        return db.session.execute(
+            db.select(cls.value).where(cls.key == cls.VERSION_KEY)
+        ).scalar()
+
+    @classmethod
+    def _fresh_cache(cls) -> _SettingsCache:
+        cache = cls._cache()
+        now = time.monotonic()
+        ttl = current_app.config.get("APP_SETTINGS_CACHE_SECONDS", 5)
+        if cache.loaded and g.get("_settings_checked") and now - cache.checked_at < ttl:
+            return cache
+        version = cls._current_version()
+        if not cache.loaded or version != cache.version:
+            rows = db.session.execute(db.select(cls.key, cls.value)).all()
+            cache.values = {key: value for key, value in rows if key != cls.VERSION_KEY}
+            cache.version = version
+            cache.loaded = True
+        cache.checked_at = now
+        g._settings_checked = True
+        return cache
+
+    @classmethod
+    def _bump_version(cls) -> tuple[str | None, str]:
+        """Give the settings a new version; return the old and new ones."""
+        version = uuid4().hex
+        row = cls.query.filter_by(key=cls.VERSION_KEY).first()
+        if row is None:
+            db.session.add(cls(key=cls.VERSION_KEY, value=version))
+            return None, version
+        previous, row.value = row.value, version
+        return previous, version
+
     @classmethod
     def get(cls, key: str, default: str | None = None) -> str | None:
         try:
-            setting = cls.query.filter_by(key=key).first()
+            values = cls._fresh_cache().values
         except Exception:
             return default
-        return setting.value if setting else default
+        value = values.get(key)
+        return value if key in values else default
 
     @classmethod
     def set(cls, key: str, value: str) -> "AppSetting":
@@ -63,7 +154,9 @@ class AppSetting(db.Model):
             setting = cls(key=key)
             db.session.add(setting)
         setting.value = value
+        versions = cls._bump_version()
         db.session.commit()
+        cls._update_cache(versions, key, value)
         return setting
 
     @classmethod
@@ -71,7 +164,30 @@ class AppSetting(db.Model):
         setting = cls.query.filter_by(key=key).first()
         if setting:
             db.session.delete(setting)
+            versions = cls._bump_version()
             db.session.commit()
+            cls._update_cache(versions, key, deleted=True)
+
+    @classmethod
+    def _update_cache(
+        cls,
+        versions: tuple[str | None, str],
+        key: str,
+        value: str | None = None,
+        *,
+        deleted: bool = False,
+    ) -> None:
+        previous, version = versions
+        cache = cls._cache()
+        if not cache.loaded or cache.version != previous:
+            # another process wrote in between; reload on next read
+            cache.loaded = False
+            return
+        if deleted:
+            cache.values.pop(key, None)
+        else:
+            cache.values[key] = value
+        cache.version = version
 
 
 class Meeting(db.Model):
@@ -114,6 +230,8 @@ class Meeting(db.Model):
     stage2_manual_against = db.Column(db.Integer, default=0)
     stage2_manual_abstain = db.Column(db.Integer, default=0)
     submission_invites_sent_at = db.Column(db.DateTime)
+    results_version = db.Column(db.Integer, nullable=False, default=0)
+    results_updated_at = db.Column(db.DateTime)
 
     files = db.relationship(
         "MeetingFile", backref="meeting", cascade="all, delete-orphan"
@@ -130,6 +248,40 @@ class Meeting(db.Model):
         "Amendment", backref="meeting", cascade="all, delete-orphan"
     )
 
+    @staticmethod
+    def bump_results_version(meeting_ids, session=None) -> None:
+        """Mark the published results of ``meeting_ids`` as changed.
+
+        Runs a single ``UPDATE`` in the current transaction so HTTP
+        validators derived from ``results_version`` stop matching.
+        """
+        ids = {m for m in meeting_ids if m is not None}
+        if not ids:
+            return
+        session = session or db.session
+        session.info.setdefault("cache_meetings", set()).update(ids)
+        session.execute(
+            db.update(Meeting)
+            .where(Meeting.id.in_(ids))
+            .values(
+                results_version=Meeting.results_version + 1,
+                results_updated_at=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def results_revision(self) -> str:
+        """Return a token that changes whenever the results shown change.
+
+        ``results_version`` covers edits to the meeting, its motions and
+        amendments. Votes do not bump it, so until the meeting is completed
+        the vote counters are hashed in as well.
+        """
+        version = str(self.results_version or 0)
+        if self.status == "Completed":
+            return version
+        return f"{version}.{VoteTally.digest(self.id)}"
+
     def stage1_votes_count(self) -> int:
         """Return number of verified Stage-1 votes."""
         if self.ballot_mode == "in-person":
@@ -230,6 +382,9 @@ class Member(db.Model):
     email_opt_out = db.Column(db.Boolean, default=False)
     can_comment = db.Column(db.Boolean, default=True)
     is_test = db.Column(db.Boolean, default=False)
+    # last reminder per stage; a resumed fan-out skips members still in cooldown
+    stage1_reminder_sent_at = db.Column(db.DateTime)
+    stage2_reminder_sent_at = db.Column(db.DateTime)
     comments = db.relationship("Comment", backref="member")
 
 
@@ -267,7 +422,29 @@ class MotionOption(db.Model):
 
 
 class VoteToken(db.Model):
+    """Current voting link of a member, or of a proxy acting for them, per stage.
+
+    There is one row per ``(member_id, stage, proxy_holder_id)``; sending a
+    new link re-keys that row in place and keeps its ``used_at``.
+    """
+
     __tablename__ = "vote_tokens"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "member_id", "stage", "proxy_holder_id", name="uq_vote_tokens_member_stage_proxy"
+        ),
+        # NULL proxy holders are distinct in the constraint above
+        db.Index(
+            "uq_vote_tokens_member_stage_own",
+            "member_id",
+            "stage",
+            unique=True,
+            sqlite_where=db.text("proxy_holder_id IS NULL"),
+            postgresql_where=db.text("proxy_holder_id IS NULL"),
+        ),
+    )
+    # rows per INSERT statement in create_bulk
+    BULK_BATCH_SIZE = 5000
     token = db.Column(db.String(64), primary_key=True)
     member_id = db.Column(db.Integer, db.ForeignKey("members.id"), index=True)
     proxy_holder_id = db.Column(db.Integer, db.ForeignKey("members.id"))
@@ -279,6 +456,47 @@ class VoteToken(db.Model):
     def _hash(token: str, salt: str) -> str:
         return hashlib.sha256(f"{token}{salt}".encode()).hexdigest()
 
+    @staticmethod
+    def _serializer(salt: str) -> URLSafeSerializer:
+        return URLSafeSerializer(current_app.secret_key, salt=f"vote-token:{salt}")
+
+    @classmethod
+    def _issue(
+        cls, member_id: int, stage: int, salt: str, meeting_id: int | None
+    ) -> tuple[str, str]:
+        """Return the plain link value and the stored hash for a new token.
+
+        With ``SIGNED_VOTE_TOKENS`` the link carries the row key, member,
+        stage, meeting and expiry signed with the app secret; otherwise it
+        is the bare key.
+        """
+        key = str(uuid7())
+        plain = key
+        if current_app.config.get("SIGNED_VOTE_TOKENS"):
+            days = current_app.config.get("VOTE_TOKEN_MAX_AGE_DAYS", 90)
+            expires = int(time.time()) + days * 86400
+            plain = cls._serializer(salt).dumps([key, member_id, stage, meeting_id, expires])
+        return plain, cls._hash(key, salt)
+
+    @classmethod
+    def _unsign(cls, token: str, salt: str) -> tuple[str, list | None] | None:
+        """Return the row key of ``token`` and its signed claims.
+
+        Legacy tokens are their own key and have no claims. Signed tokens
+        with a bad signature or past their expiry return None without
+        touching the database.
+        """
+        if "." not in token:
+            return token, None
+        try:
+            claims = cls._serializer(salt).loads(token)
+            key, _, _, _, expires = claims
+        except (BadSignature, TypeError, ValueError):
+            return None
+        if expires < time.time():
+            return None
+        return key, claims
+
     @classmethod
     def create(
         cls,
@@ -287,23 +505,192 @@ class VoteToken(db.Model):
         salt: str,
         *,
         proxy_holder_id: int | None = None,
+        meeting_id: int | None = None,
+        is_test: bool = False,
     ) -> tuple["VoteToken", str]:
-        """Create token, store hash and return plain value."""
-        plain = str(uuid7())
-        hashed = cls._hash(plain, salt)
-        obj = cls(
-            token=hashed,
-            member_id=member_id,
-            stage=stage,
-            proxy_holder_id=proxy_holder_id,
-        )
-        db.session.add(obj)
+        """Issue a new link, re-keying the current token row if there is one.
+
+        The row takes ``is_test`` from this issue, so a real link re-issued
+        over a test one is counted. Returns the row and the plain value;
+        earlier links stop working.
+        """
+        if meeting_id is None and current_app.config.get("SIGNED_VOTE_TOKENS"):
+            meeting_id = db.session.get(Member, member_id).meeting_id
+        plain, hashed = cls._issue(member_id, stage, salt, meeting_id)
+        obj = cls.query.filter_by(
+            member_id=member_id, stage=stage, proxy_holder_id=proxy_holder_id
+        ).first()
+        if obj is None:
+            obj = cls(member_id=member_id, stage=stage, proxy_holder_id=proxy_holder_id)
+            db.session.add(obj)
+        obj.token = hashed
+        obj.is_test = is_test
         return obj, plain
 
+    @classmethod
+    def create_bulk(
+        cls,
+        member_ids: Iterable[int],
+        stage: int,
+        salt: str,
+        proxy_map: Mapping[int, int] | None = None,
+        *,
+        is_test: bool = False,
+        meeting_id: int | None = None,
+    ) -> list[tuple[int, str]]:
+        """Issue links for many members, re-keying current rows in bulk.
+
+        One link is issued per id in ``member_ids``, then one per
+        ``proxy_holder_id: member_id`` entry of ``proxy_map`` for the proxy
+        to vote on that member's behalf. Existing token rows are re-keyed in
+        place, taking ``is_test`` from this issue, and the rest are inserted
+        in batches. Returns
+        ``(member_id, plain)`` pairs in the same order; proxy tokens are
+        keyed by the proxy holder, who receives the link. Nothing is
+        committed.
+        """
+        member_ids = list(member_ids)
+        proxy_map = proxy_map or {}
+        wanted = list({*member_ids, *proxy_map.values()})
+        current: dict[tuple[int, int | None], VoteToken] = {}
+        meetings: Mapping[int, int | None] = defaultdict(lambda: meeting_id)
+        look_up_meetings = meeting_id is None and current_app.config.get("SIGNED_VOTE_TOKENS")
+        if look_up_meetings:
+            meetings = {}
+        for start in range(0, len(wanted), cls.BULK_BATCH_SIZE):
+            batch = wanted[start:start + cls.BULK_BATCH_SIZE]
+            for token in cls.query.filter(cls.stage == stage, cls.member_id.in_(batch)):
+                current[(token.member_id, token.proxy_holder_id)] = token
+            if look_up_meetings:
+                meetings.update(
+                    db.session.execute(
+                        db.select(Member.id, Member.meeting_id).where(Member.id.in_(batch))
+                    ).all()
+                )
+        pairs: list[tuple[int, str]] = []
+        rows: list[dict] = []
+
+        def add(recipient_id: int, member_id: int, proxy_holder_id: int | None) -> None:
+            plain, hashed = cls._issue(member_id, stage, salt, meetings[member_id])
+            pairs.append((recipient_id, plain))
+            existing = current.get((member_id, proxy_holder_id))
+            if existing is not None:
+                existing.token = hashed
+                existing.is_test = is_test
+                return
+            rows.append(
+                {
+                    "token": hashed,
+                    "member_id": member_id,
+                    "stage": stage,
+                    "proxy_holder_id": proxy_holder_id,
+                    "is_test": is_test,
+                }
+            )
+
+        for member_id in member_ids:
+            add(member_id, member_id, None)
+        for proxy_holder_id, member_id in proxy_map.items():
+            add(proxy_holder_id, member_id, proxy_holder_id)
+        db.session.flush()
+        for start in range(0, len(rows), cls.BULK_BATCH_SIZE):
+            db.session.execute(db.insert(cls), rows[start:start + cls.BULK_BATCH_SIZE])
+        return pairs
+
+    @staticmethod
+    def proxy_map(members: Iterable["Member"]) -> dict[int, int]:
+        """Return ``{proxy_holder_id: member_id}`` for proxies among ``members``.
+
+        Only proxies naming another member of the same list are included.
+        """
+        members = list(members)
+        ids = {m.id for m in members}
+        result = {}
+        for proxy in members:
+            try:
+                target_id = int(proxy.proxy_for)
+            except (TypeError, ValueError):
+                continue
+            if target_id in ids:
+                result[proxy.id] = target_id
+        return result
+
+    @classmethod
+    def delete_batched(
+        cls, *criteria, batch_size: int | None = None, pause: float = 0.05
+    ) -> int:
+        """Delete tokens matching ``criteria`` a batch at a time.
+
+        ``criteria`` may refer to the token's ``Member`` and ``Meeting``.
+        Each batch is one ``DELETE ... WHERE token IN (SELECT ... LIMIT n)``
+        committed on its own, with a short pause in between so row locks
+        on ``vote_tokens`` are only held briefly. Returns the rows removed.
+        """
+        batch_size = batch_size or cls.BULK_BATCH_SIZE
+        batch = (
+            db.select(cls.token)
+            .join(Member, cls.member_id == Member.id)
+            .join(Meeting, Member.meeting_id == Meeting.id)
+            .where(*criteria)
+            .limit(batch_size)
+        )
+        removed = 0
+        while True:
+            result = db.session.execute(
+                db.delete(cls)
+                .where(cls.token.in_(batch.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            removed += result.rowcount
+            if result.rowcount < batch_size:
+                return removed
+            time.sleep(pause)
+
     @classmethod
     def verify(cls, token: str, salt: str) -> "VoteToken | None":
-        hashed = cls._hash(token, salt)
-        return cls.query.filter_by(token=hashed).first()
+        unsigned = cls._unsign(token, salt)
+        if unsigned is None:
+            return None
+        return db.session.get(cls, cls._hash(unsigned[0], salt))
+
+    @classmethod
+    def load(
+        cls, token: str, salt: str
+    ) -> "tuple[VoteToken, Member, Member | None, Meeting, bool] | None":
+        """Return the token, member, proxy holder, meeting and used flag.
+
+        Everything comes from one query. The flag is True when any token of
+        the member for the same stage has been used.
+        """
+        unsigned = cls._unsign(token, salt)
+        if unsigned is None:
+            return None
+        key, claims = unsigned
+        holder = aliased(Member)
+        used = aliased(cls)
+        used_any = (
+            db.select(used.token)
+            .where(
+                used.member_id == cls.member_id,
+                used.stage == cls.stage,
+                used.used_at.isnot(None),
+            )
+            .exists()
+        )
+        row = db.session.execute(
+            db.select(cls, Member, holder, Meeting, used_any)
+            .join(Member, Member.id == cls.member_id)
+            .join(Meeting, Meeting.id == Member.meeting_id)
+            .outerjoin(holder, holder.id == cls.proxy_holder_id)
+            .where(cls.token == cls._hash(key, salt))
+        ).first()
+        if row is None:
+            return None
+        vote_token, member, proxy_holder, meeting, used_flag = row
+        if claims is not None and claims[1:4] != [member.id, vote_token.stage, meeting.id]:
+            return None
+        return vote_token, member, proxy_holder, meeting, bool(used_flag)
 
 
 class SubmissionToken(db.Model):
@@ -438,8 +825,23 @@ class Vote(db.Model):
     motion_id = db.Column(db.Integer, db.ForeignKey("motions.id"), nullable=True, index=True)
     choice = db.Column(db.String(10))
     hash = db.Column(db.String(128))
+    stage = db.Column(db.Integer, nullable=True)
     is_test = db.Column(db.Boolean, default=False)
 
+    @staticmethod
+    def _digest(
+        member_id: int,
+        choice: str,
+        salt: str,
+        amendment_id: int | None = None,
+        motion_id: int | None = None,
+        stage: int | None = None,
+    ) -> str:
+        target_id = amendment_id if amendment_id is not None else motion_id or ""
+        stage_val = stage if stage is not None else ""
+        digest_source = f"{member_id}{target_id}{stage_val}{choice}{salt}"
+        return hashlib.sha256(digest_source.encode()).hexdigest()
+
     @classmethod
     def record(
         cls,
@@ -451,23 +853,247 @@ class Vote(db.Model):
         stage: int | None = None,
         is_test: bool = False,
     ) -> "Vote":
-        """Create a vote with hashed choice."""
-        target_id = amendment_id if amendment_id is not None else motion_id or ""
-        stage_val = stage if stage is not None else ""
-        digest_source = f"{member_id}{target_id}{stage_val}{choice}{salt}"
-        digest = hashlib.sha256(digest_source.encode()).hexdigest()
+        """Create a vote with hashed choice and update the tally counters."""
+        digest = cls._digest(member_id, choice, salt, amendment_id, motion_id, stage)
         vote = cls(
             member_id=member_id,
             amendment_id=amendment_id,
             motion_id=motion_id,
             choice=choice,
             hash=digest,
+            stage=stage,
             is_test=is_test,
         )
         db.session.add(vote)
+        VoteTally.apply(
+            [
+                {
+                    "amendment_id": amendment_id,
+                    "motion_id": motion_id,
+                    "stage": stage,
+                    "choice": choice,
+                    "is_test": is_test,
+                }
+            ]
+        )
         db.session.commit()
         return vote
 
+    @classmethod
+    def record_ballot(
+        cls,
+        member_id: int,
+        stage: int,
+        choices: list[tuple[str, int, str]],
+        salt: str,
+        *,
+        replace: bool = False,
+        is_test: bool = False,
+    ) -> list[str]:
+        """Record a whole ballot in a single transaction.
+
+        ``choices`` is a list of ``(kind, target_id, choice)`` tuples where
+        ``kind`` is ``"amendment"`` or ``"motion"``. When ``replace`` is true
+        the member's previous votes on the same targets are removed first.
+        Every token the member holds for ``stage`` is marked as used and the
+        tally counters are updated in the same transaction. Returns the
+        receipt hashes in ballot order.
+        """
+        rows = []
+        hashes = []
+        for kind, target_id, choice in choices:
+            amendment_id = target_id if kind == "amendment" else None
+            motion_id = target_id if kind == "motion" else None
+            digest = cls._digest(member_id, choice, salt, amendment_id, motion_id, stage)
+            rows.append(
+                {
+                    "member_id": member_id,
+                    "amendment_id": amendment_id,
+                    "motion_id": motion_id,
+                    "choice": choice,
+                    "hash": digest,
+                    "stage": stage,
+                    "is_test": is_test,
+                }
+            )
+            hashes.append(digest)
+
+        if replace:
+            amendment_ids = {r["amendment_id"] for r in rows if r["amendment_id"] is not None}
+            motion_ids = {r["motion_id"] for r in rows if r["motion_id"] is not None}
+            cls.delete_where(
+                cls.member_id == member_id,
+                db.or_(
+                    cls.amendment_id.in_(amendment_ids),
+                    cls.motion_id.in_(motion_ids),
+                ),
+            )
+        if rows:
+            db.session.execute(db.insert(cls), rows)
+            VoteTally.apply(rows)
+        VoteToken.query.filter_by(member_id=member_id, stage=stage).update(
+            {"used_at": datetime.utcnow()}
+        )
+        db.session.commit()
+        return hashes
+
+    @classmethod
+    def delete_where(cls, *criteria) -> int:
+        """Delete votes matching ``criteria`` and release their tally counts.
+
+        The caller is responsible for committing. Returns the number of
+        votes removed.
+        """
+        removed = (
+            db.session.query(
+                cls.amendment_id,
+                cls.motion_id,
+                cls.stage,
+                cls.choice,
+                cls.is_test,
+                db.func.count(cls.id).label("count"),
+            )
+            .filter(*criteria)
+            .group_by(cls.amendment_id, cls.motion_id, cls.stage, cls.choice, cls.is_test)
+            .all()
+        )
+        if not removed:
+            return 0
+        VoteTally.apply([row._asdict() for row in removed], sign=-1)
+        cls.query.filter(*criteria).delete(synchronize_session=False)
+        return sum(row.count for row in removed)
+
+
+class VoteTally(db.Model):
+    """Running vote counts per meeting, target, stage and choice.
+
+    Rows are adjusted in the same transaction as the votes they count so
+    results can be read without scanning ``votes``. Test votes are not
+    counted. Votes recorded without a stage are counted under stage ``0``.
+    """
+
+    __tablename__ = "vote_tallies"
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_id = db.Column(db.Integer, db.ForeignKey("meetings.id"), index=True)
+    target_type = db.Column(db.String(10), nullable=False)
+    target_id = db.Column(db.Integer, nullable=False)
+    stage = db.Column(db.Integer, nullable=False, default=0)
+    choice = db.Column(db.String(10), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    __table_args__ = (
+        db.UniqueConstraint(
+            "meeting_id",
+            "target_type",
+            "target_id",
+            "stage",
+            "choice",
+            name="uq_vote_tallies_key",
+        ),
+    )
+
+    KEY_COLUMNS = ("meeting_id", "target_type", "target_id", "stage", "choice")
+
+    @classmethod
+    def apply(cls, votes: list[dict], sign: int = 1) -> None:
+        """Add (or with ``sign=-1`` subtract) ``votes`` from the counters.
+
+        Each vote is a mapping with ``amendment_id``, ``motion_id``,
+        ``stage``, ``choice`` and ``is_test`` keys plus an optional
+        ``count`` weight. Changes are added to the current session without
+        committing so they share the caller's transaction.
+        """
+        deltas: dict[tuple[str, int, int, str], int] = {}
+        for vote in votes:
+            if vote.get("is_test"):
+                continue
+            if vote["amendment_id"] is not None:
+                target = ("amendment", vote["amendment_id"])
+            elif vote["motion_id"] is not None:
+                target = ("motion", vote["motion_id"])
+            else:
+                continue
+            key = (*target, vote.get("stage") or 0, vote["choice"])
+            deltas[key] = deltas.get(key, 0) + sign * vote.get("count", 1)
+        if not deltas:
+            return
+
+        meetings = cls._target_meetings({key[:2] for key in deltas})
+        values = []
+        for (kind, target_id, stage, choice), delta in deltas.items():
+            meeting_id = meetings.get((kind, target_id))
+            if meeting_id is None or delta == 0:
+                continue
+            values.append(
+                {
+                    "meeting_id": meeting_id,
+                    "target_type": kind,
+                    "target_id": target_id,
+                    "stage": stage,
+                    "choice": choice,
+                    "count": delta,
+                }
+            )
+        if values:
+            cls._increment(values)
+            # Ballots do not bump Meeting.results_version: that UPDATE would
+            # serialise every voter of a meeting on one row lock. Validators
+            # for open meetings hash the counters instead, see
+            # Meeting.results_revision.
+            db.session.info.setdefault("cache_meetings", set()).update(
+                row["meeting_id"] for row in values
+            )
+
+    @classmethod
+    def digest(cls, meeting_id: int) -> str:
+        """Return a short hash of the counters of ``meeting_id``."""
+        rows = db.session.execute(
+            db.select(cls.target_type, cls.target_id, cls.stage, cls.choice, cls.count)
+            .where(cls.meeting_id == meeting_id, cls.count != 0)
+            .order_by(cls.target_type, cls.target_id, cls.stage, cls.choice)
+        ).all()
+        canonical = json.dumps([list(row) for row in rows], separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _target_meetings(targets: set[tuple[str, int]]) -> dict[tuple[str, int], int]:
+        """Return the meeting id for each ``(kind, target_id)`` pair."""
+        found: dict[tuple[str, int], int] = {}
+        for kind, model in (("amendment", Amendment), ("motion", Motion)):
+            ids = {target_id for k, target_id in targets if k == kind}
+            if not ids:
+                continue
+            rows = db.session.query(model.id, model.meeting_id).filter(model.id.in_(ids))
+            found.update({(kind, target_id): meeting_id for target_id, meeting_id in rows})
+        return found
+
+    @classmethod
+    def _increment(cls, values: list[dict]) -> None:
+        """Upsert counter rows, adding ``count`` to any existing value."""
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+
+        if insert is not None:
+            stmt = insert(cls).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(cls.KEY_COLUMNS),
+                set_={"count": cls.count + stmt.excluded.count},
+            )
+            db.session.execute(stmt)
+            return
+
+        for row in values:
+            key = {col: row[col] for col in cls.KEY_COLUMNS}
+            updated = cls.query.filter_by(**key).update(
+                {cls.count: cls.count + row["count"]}, synchronize_session=False
+            )
+            if not updated:
+                db.session.add(cls(**row))
+
 
 class User(db.Model, UserMixin):
     __tablename__ = "users"
@@ -486,9 +1112,13 @@ class User(db.Model, UserMixin):
         return bcrypt.check_password_hash(self.password_hash, password)
 
     def has_permission(self, permission_name: str) -> bool:
+        return permission_name in self.permission_names
+
+    @property
+    def permission_names(self) -> frozenset[str]:
         if not self.role:
-            return False
-        return any(p.name == permission_name for p in self.role.permissions)
+            return frozenset()
+        return self.role.permission_names()
 
 
 class Runoff(db.Model):
@@ -500,6 +1130,68 @@ class Runoff(db.Model):
     tie_break_method = db.Column(db.String(20), nullable=True)
 
 
+class ResultSnapshot(db.Model):
+    """Frozen tallies and outcomes recorded when a voting stage closes."""
+
+    __tablename__ = "result_snapshots"
+    meeting_id = db.Column(db.Integer, db.ForeignKey("meetings.id"), primary_key=True)
+    stage = db.Column(db.Integer, primary_key=True)
+    tallies_json = db.Column(db.Text, nullable=False)
+    statuses_json = db.Column(db.Text, nullable=False)
+    tie_breaks_json = db.Column(db.Text, nullable=False)
+    digest = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def _load(raw: str) -> dict[str, dict[int, object]]:
+        """Decode a ``{kind: {id: value}}`` mapping restoring integer ids."""
+        data = json.loads(raw)
+        return {kind: {int(k): v for k, v in values.items()} for kind, values in data.items()}
+
+    @property
+    def tallies(self) -> dict[str, dict[int, dict[str, int]]]:
+        return self._load(self.tallies_json)
+
+    @property
+    def statuses(self) -> dict[str, dict[int, str | None]]:
+        return self._load(self.statuses_json)
+
+    @property
+    def tie_breaks(self) -> dict[str, dict[int, str]]:
+        return self._load(self.tie_breaks_json)
+
+    @classmethod
+    def store(
+        cls,
+        meeting_id: int,
+        stage: int,
+        tallies: dict,
+        statuses: dict,
+        tie_breaks: dict,
+    ) -> "ResultSnapshot":
+        """Create or replace the snapshot for ``meeting_id`` and ``stage``.
+
+        The digest is a SHA-256 over the canonical JSON of all three
+        payloads. The caller is responsible for committing.
+        """
+        payload = {
+            "tallies": tallies,
+            "statuses": statuses,
+            "tie_breaks": tie_breaks,
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        snapshot = db.session.get(cls, (meeting_id, stage))
+        if snapshot is None:
+            snapshot = cls(meeting_id=meeting_id, stage=stage)
+            db.session.add(snapshot)
+        snapshot.tallies_json = json.dumps(tallies, sort_keys=True)
+        snapshot.statuses_json = json.dumps(statuses, sort_keys=True)
+        snapshot.tie_breaks_json = json.dumps(tie_breaks, sort_keys=True)
+        snapshot.digest = hashlib.sha256(canonical.encode()).hexdigest()
+        snapshot.created_at = datetime.utcnow()
+        return snapshot
+
+
 class AmendmentConflict(db.Model):
     __tablename__ = "amendment_conflicts"
     id = db.Column(db.Integer, primary_key=True)
@@ -576,6 +1268,79 @@ class EmailLog(db.Model):
     sent_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class EmailOutbox(db.Model):
+    """Rendered email waiting to be delivered by the outbox dispatcher.
+
+    ``status`` moves from ``pending`` to ``sending`` when a dispatcher claims
+    the row, then to ``sent`` or back to ``pending`` with a later
+    ``next_attempt_at``. Rows that keep failing end up ``dead``.
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        db.Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_id = db.Column(db.Integer, db.ForeignKey("meetings.id"), index=True)
+    member_id = db.Column(db.Integer, db.ForeignKey("members.id"), index=True)
+    kind = db.Column(db.String(50))
+    is_test = db.Column(db.Boolean, default=False)
+    message_json = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+
+class ImportJob(db.Model):
+    """Member CSV upload imported in the background.
+
+    ``status`` moves from ``queued`` to ``running`` and ends ``completed`` or
+    ``failed``. ``last_line`` is the last CSV line committed, so a job whose
+    worker stopped (``heartbeat_at`` gone stale) resumes after it.
+    ``pending_invites`` lists the members and proxies of the last committed
+    chunk until their invites are sent.
+    """
+
+    __tablename__ = "import_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_id = db.Column(db.Integer, db.ForeignKey("meetings.id"), index=True)
+    created_by_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    filename = db.Column(db.String(255))
+    upload_path = db.Column(db.String(500), nullable=False)
+    report_id = db.Column(db.String(32), nullable=False)
+    status = db.Column(db.String(10), nullable=False, default="queued", index=True)
+    total_rows = db.Column(db.Integer)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    last_line = db.Column(db.Integer, nullable=False, default=1)
+    pending_invites = db.Column(db.Text)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    @property
+    def created(self) -> int:
+        return self.processed - self.failed
+
+    @property
+    def percent(self) -> int:
+        if not self.total_rows:
+            return 100 if self.status == "completed" else 0
+        return min(100, self.processed * 100 // self.total_rows)
+
+
 class EmailSetting(db.Model):
     __tablename__ = "email_settings"
 
@@ -662,3 +1427,76 @@ class MeetingFile(db.Model):
     title = db.Column(db.String(255))
     description = db.Column(db.Text)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+_RESULTS_VERSION_COLUMNS = {"results_version", "results_updated_at"}
+
+
+def _changed_meeting_ids(session) -> set[int]:
+    """Return meetings whose published results are affected by pending changes."""
+    ids: set[int] = set()
+    for obj in session.dirty:
+        if isinstance(obj, Meeting):
+            state = db.inspect(obj)
+            changed = {
+                attr.key
+                for attr in state.attrs
+                if attr.key not in _RESULTS_VERSION_COLUMNS and attr.history.has_changes()
+            }
+            if changed and obj.id is not None:
+                ids.add(obj.id)
+        elif isinstance(obj, (Amendment, Motion, Runoff)) and session.is_modified(obj):
+            ids.add(obj.meeting_id)
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (Amendment, Motion, Runoff)):
+            ids.add(obj.meeting_id)
+    ids.discard(None)
+    return ids
+
+
+@sa_event.listens_for(Session, "before_flush")
+def _bump_results_versions(session, flush_context, instances) -> None:
+    """Bump ``Meeting.results_version`` when anything shown in results changes."""
+    ids = _changed_meeting_ids(session)
+    if ids:
+        Meeting.bump_results_version(ids, session=session)
+
+
+@sa_event.listens_for(Session, "before_flush")
+def _collect_cache_meetings(session, flush_context, instances) -> None:
+    """Note meetings whose cached pages are affected by pending changes."""
+    ids = _changed_meeting_ids(session)
+    member_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Meeting) and obj.id is not None:
+            ids.add(obj.id)
+        elif isinstance(obj, Comment):
+            ids.add(obj.meeting_id)
+        elif isinstance(obj, Vote):
+            member_ids.add(obj.member_id)
+    member_ids.discard(None)
+    if member_ids:
+        with session.no_autoflush:
+            ids.update(
+                session.scalars(
+                    db.select(Member.meeting_id).where(Member.id.in_(member_ids))
+                )
+            )
+    ids.discard(None)
+    if ids:
+        session.info.setdefault("cache_meetings", set()).update(ids)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _invalidate_cache_meetings(session) -> None:
+    """Invalidate cached content of meetings changed by the committed transaction."""
+    ids = session.info.pop("cache_meetings", None)
+    if ids and has_app_context():
+        from .services import cache
+
+        cache.invalidate_meetings(ids)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _forget_cache_meetings(session) -> None:
+    session.info.pop("cache_meetings", None)
@@ -21,6 +21,7 @@ from wtforms.validators import DataRequired
 from ..extensions import db
 from ..models import Meeting, Amendment, Motion, Vote, VoteToken, Member, Runoff
 from ..permissions import permission_required
+from ..services import tally
 
 bp = Blueprint('ro', __name__, url_prefix='/ro')
 
@@ -48,13 +49,12 @@ def _pending_tie_breaks(meeting: Meeting) -> bool:
 def _pending_runoff_tie_breaks(meeting: Meeting) -> bool:
     """Return True if any run-off votes are tied without a decision."""
     runoffs = Runoff.query.filter_by(meeting_id=meeting.id).all()
+    if not runoffs:
+        return False
+    tallies = tally.meeting_tallies(meeting.id)
     for rof in runoffs:
-        a_for = Vote.query.filter_by(
-            amendment_id=rof.amendment_a_id, choice="for"
-        ).count()
-        b_for = Vote.query.filter_by(
-            amendment_id=rof.amendment_b_id, choice="for"
-        ).count()
+        a_for = tally.counts_for(tallies, "amendment", rof.amendment_a_id)["for"]
+        b_for = tally.counts_for(tallies, "amendment", rof.amendment_b_id)["for"]
         if a_for == b_for and rof.tie_break_method is None:
             return True
     return False
@@ -138,25 +138,28 @@ def download_tallies(meeting_id: int):
         'seconded_method',
         'seconded_at',
     ])
+    tallies = tally.meeting_tallies(meeting.id)
     for amend in Amendment.query.filter_by(meeting_id=meeting.id).all():
+        counts = tally.counts_for(tallies, 'amendment', amend.id)
         writer.writerow([
             'amendment',
             amend.id,
             amend.text_md[:40],
-            Vote.query.filter_by(amendment_id=amend.id, choice='for').count(),
-            Vote.query.filter_by(amendment_id=amend.id, choice='against').count(),
-            Vote.query.filter_by(amendment_id=amend.id, choice='abstain').count(),
+            counts['for'],
+            counts['against'],
+            counts['abstain'],
             amend.seconded_method or '',
             (amend.seconded_at.isoformat(timespec='seconds') if amend.seconded_at else ''),
         ])
     for motion in Motion.query.filter_by(meeting_id=meeting.id).all():
+        counts = tally.counts_for(tallies, 'motion', motion.id)
         writer.writerow([
             'motion',
             motion.id,
             motion.title,
-            Vote.query.filter_by(motion_id=motion.id, choice='for').count(),
-            Vote.query.filter_by(motion_id=motion.id, choice='against').count(),
-            Vote.query.filter_by(motion_id=motion.id, choice='abstain').count(),
+            counts['for'],
+            counts['against'],
+            counts['abstain'],
         ])
     csv_bytes = output.getvalue().encode()
     resp = send_file(
@@ -178,28 +181,31 @@ def download_tallies_json(meeting_id: int):
     if meeting is None:
         abort(404)
     rows: list[dict[str, int | str]] = []
+    tallies = tally.meeting_tallies(meeting.id)
     for amend in Amendment.query.filter_by(meeting_id=meeting.id).all():
+        counts = tally.counts_for(tallies, 'amendment', amend.id)
         rows.append(
             {
                 'type': 'amendment',
                 'id': amend.id,
                 'text': amend.text_md[:40],
-                'for': Vote.query.filter_by(amendment_id=amend.id, choice='for').count(),
-                'against': Vote.query.filter_by(amendment_id=amend.id, choice='against').count(),
-                'abstain': Vote.query.filter_by(amendment_id=amend.id, choice='abstain').count(),
+                'for': counts['for'],
+                'against': counts['against'],
+                'abstain': counts['abstain'],
                 'seconded_method': amend.seconded_method,
                 'seconded_at': amend.seconded_at.isoformat(timespec='seconds') if amend.seconded_at else None,
             }
         )
     for motion in Motion.query.filter_by(meeting_id=meeting.id).all():
+        counts = tally.counts_for(tallies, 'motion', motion.id)
         rows.append(
             {
                 'type': 'motion',
                 'id': motion.id,
                 'text': motion.title,
-                'for': Vote.query.filter_by(motion_id=motion.id, choice='for').count(),
-                'against': Vote.query.filter_by(motion_id=motion.id, choice='against').count(),
-                'abstain': Vote.query.filter_by(motion_id=motion.id, choice='abstain').count(),
+                'for': counts['for'],
+                'against': counts['against'],
+                'abstain': counts['abstain'],
             }
         )
     return jsonify({'meeting_id': meeting.id, 'tallies': rows})
@@ -248,12 +254,11 @@ def tie_breaks(meeting_id: int):
     meeting = db.session.get(Meeting, meeting_id)
     if meeting is None:
         abort(404)
-    amends = []
-    for a in Amendment.query.filter_by(meeting_id=meeting.id).order_by(Amendment.order).all():
-        for_count = Vote.query.filter_by(amendment_id=a.id, choice='for').count()
-        against_count = Vote.query.filter_by(amendment_id=a.id, choice='against').count()
-        if for_count == against_count:
-            amends.append(a)
+    amends = [
+        a
+        for a, counts in tally.amendment_results(meeting)
+        if counts['for'] == counts['against']
+    ]
     form = _tie_break_form(amends)
     if form.validate_on_submit():
         for a in amends:
@@ -276,11 +281,12 @@ def tie_breaks_runoff(meeting_id: int):
     if meeting is None:
         abort(404)
     runoffs = []
+    tallies = tally.meeting_tallies(meeting.id)
     for r in Runoff.query.filter_by(meeting_id=meeting.id).all():
         a = db.session.get(Amendment, r.amendment_a_id)
         b = db.session.get(Amendment, r.amendment_b_id)
-        a_for = Vote.query.filter_by(amendment_id=a.id, choice='for').count()
-        b_for = Vote.query.filter_by(amendment_id=b.id, choice='for').count()
+        a_for = tally.counts_for(tallies, 'amendment', a.id)['for']
+        b_for = tally.counts_for(tallies, 'amendment', b.id)['for']
         if a_for == b_for:
             runoffs.append((r, a, b))
     form = _runoff_tie_break_form([r[0] for r in runoffs])
@@ -321,18 +327,13 @@ def download_stage2_tallies(meeting_id: int):
     output = StringIO()
     writer = csv.writer(output)
     writer.writerow(['id', 'title', 'for', 'against', 'abstain', 'outcome'])
-    motions = (
-        Motion.query.filter_by(meeting_id=meeting.id)
-        .order_by(Motion.ordering)
-        .all()
-    )
-    for motion in motions:
+    for motion, counts in tally.motion_results(meeting):
         writer.writerow([
             motion.id,
             motion.title,
-            Vote.query.filter_by(motion_id=motion.id, choice='for').count(),
-            Vote.query.filter_by(motion_id=motion.id, choice='against').count(),
-            Vote.query.filter_by(motion_id=motion.id, choice='abstain').count(),
+            counts['for'],
+            counts['against'],
+            counts['abstain'],
             (motion.status or '').capitalize(),
         ])
     csv_bytes = output.getvalue().encode()
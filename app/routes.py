@@ -11,6 +11,7 @@ from flask import (
     send_from_directory,
     Response,
     flash,
+    session,
 )
 from werkzeug.utils import secure_filename
 from .extensions import db, limiter
@@ -28,15 +29,16 @@ from .models import (
     MeetingFile,
 )
 from .services.email import send_vote_invite, send_stage2_invite, send_runoff_invite
+from .services import documents, tally
 from .utils import (
     generate_stage_ics,
     generate_runoff_ics,
     generate_results_pdf,
     hash_for_log,
+    results_not_modified,
 )
 from .voting.routes import compile_motion_text
 import io
-from sqlalchemy import func
 from flask_login import login_required, current_user
 from datetime import datetime
 from .permissions import permission_required
@@ -302,6 +304,9 @@ def public_stage1_ics(meeting_id: int):
     meeting = db.session.get(Meeting, meeting_id)
     if meeting is None:
         abort(404)
+    not_modified = results_not_modified(meeting, "stage1-ics", weak=True)
+    if not_modified is not None:
+        return not_modified
     try:
         ics = generate_stage_ics(meeting, 1)
     except ValueError:
@@ -320,6 +325,9 @@ def public_stage2_ics(meeting_id: int):
     meeting = db.session.get(Meeting, meeting_id)
     if meeting is None:
         abort(404)
+    not_modified = results_not_modified(meeting, "stage2-ics", weak=True)
+    if not_modified is not None:
+        return not_modified
     try:
         ics = generate_stage_ics(meeting, 2)
     except ValueError:
@@ -338,6 +346,9 @@ def public_runoff_ics(meeting_id: int):
     meeting = db.session.get(Meeting, meeting_id)
     if meeting is None:
         abort(404)
+    not_modified = results_not_modified(meeting, "runoff-ics", weak=True)
+    if not_modified is not None:
+        return not_modified
     try:
         ics = generate_runoff_ics(meeting)
     except ValueError:
@@ -375,19 +386,6 @@ def public_meeting_file(meeting_id: int, file_id: int):
     return resp
 
 
-def _vote_counts(query):
-    counts = {'for': 0, 'against': 0, 'abstain': 0}
-    rows = (
-        db.session.query(Vote.choice, func.count(Vote.id))
-        .filter(query)
-        .group_by(Vote.choice)
-        .all()
-    )
-    for choice, count in rows:
-        counts[choice] = count
-    return counts
-
-
 @bp.route('/results/<int:meeting_id>/stage1')
 def public_stage1_results(meeting_id: int):
     """Show Stage 1 results when awaiting Stage 2."""
@@ -397,14 +395,7 @@ def public_stage1_results(meeting_id: int):
     if meeting.status != 'Pending Stage 2' or not meeting.early_public_results:
         abort(404)
 
-    amendments = (
-        Amendment.query.filter_by(meeting_id=meeting.id)
-        .order_by(Amendment.order)
-        .all()
-    )
-    results = []
-    for amend in amendments:
-        results.append((amend, _vote_counts(Vote.amendment_id == amend.id)))
+    results = tally.amendment_results(meeting)
 
     return render_template('public_stage1_results.html', meeting=meeting, results=results)
 
@@ -416,24 +407,23 @@ def public_results(meeting_id: int):
         abort(404)
     if not meeting.public_results:
         abort(404)
+    if current_user.is_authenticated:
+        # the page chrome differs per signed-in user
+        variant = f"html-{current_user.get_id()}"
+    else:
+        variant = "html"
+    # the page carries a per-request CSP nonce and flashed messages, so
+    # shared caches must not store it and pending flashes must be rendered
+    if not session.get('_flashes'):
+        not_modified = results_not_modified(
+            meeting, variant, private=True, revalidate=True
+        )
+        if not_modified is not None:
+            return not_modified
 
-    amendments = (
-        Amendment.query.filter_by(meeting_id=meeting.id)
-        .order_by(Amendment.order)
-        .all()
-    )
-    stage1 = []
-    for amend in amendments:
-        stage1.append((amend, _vote_counts(Vote.amendment_id == amend.id)))
-
-    motions = (
-        Motion.query.filter_by(meeting_id=meeting.id)
-        .order_by(Motion.ordering)
-        .all()
-    )
-    stage2 = []
-    for motion in motions:
-        stage2.append((motion, _vote_counts(Vote.motion_id == motion.id)))
+    tallies = tally.results_tallies(meeting)
+    stage1 = tally.amendment_results(meeting, tallies)
+    stage2 = tally.motion_results(meeting, tallies)
 
     return render_template(
         'public_results.html', meeting=meeting, stage1=stage1, stage2=stage2
@@ -458,39 +448,15 @@ def public_results_json(meeting_id: int):
         abort(404)
     if not meeting.public_results:
         abort(404)
-
-    tallies: list[dict[str, int | str]] = []
-    amendments = (
-        Amendment.query.filter_by(meeting_id=meeting.id)
-        .order_by(Amendment.order)
-        .all()
+    not_modified = results_not_modified(meeting, "json")
+    if not_modified is not None:
+        return not_modified
+
+    matrix = tally.results_tallies(meeting)
+    tallies = tally.tally_rows(
+        tally.amendment_results(meeting, matrix),
+        tally.motion_results(meeting, matrix),
     )
-    for amend in amendments:
-        counts = _vote_counts(Vote.amendment_id == amend.id)
-        tallies.append(
-            {
-                "type": "amendment",
-                "id": amend.id,
-                "text": amend.text_md[:40],
-                **counts,
-            }
-        )
-
-    motions = (
-        Motion.query.filter_by(meeting_id=meeting.id)
-        .order_by(Motion.ordering)
-        .all()
-    )
-    for motion in motions:
-        counts = _vote_counts(Vote.motion_id == motion.id)
-        tallies.append(
-            {
-                "type": "motion",
-                "id": motion.id,
-                "text": motion.title,
-                **counts,
-            }
-        )
 
     return jsonify({"meeting_id": meeting.id, "tallies": tallies})
 
@@ -503,48 +469,39 @@ def public_results_pdf(meeting_id: int):
         abort(404)
     if not meeting.public_results:
         abort(404)
-
-    amendments = (
-        Amendment.query.filter_by(meeting_id=meeting.id)
-        .order_by(Amendment.order)
-        .all()
-    )
-    stage1 = [(a, _vote_counts(Vote.amendment_id == a.id)) for a in amendments]
-
-    motions = (
-        Motion.query.filter_by(meeting_id=meeting.id)
-        .order_by(Motion.ordering)
-        .all()
-    )
-    stage2 = [(m, _vote_counts(Vote.motion_id == m.id)) for m in motions]
+    not_modified = results_not_modified(meeting, "pdf")
+    if not_modified is not None:
+        return not_modified
 
     try:
-        pdf_bytes = generate_results_pdf(meeting, stage1, stage2)
-        
-        # Create a safe filename
-        safe_filename = f"{secure_filename(meeting.title)}_final_results.pdf"
-        
-        # Create response with PDF data
-        response = Response(
-            pdf_bytes,
-            mimetype='application/pdf',
-            headers={
-                'Content-Disposition': f'attachment; filename="{safe_filename}"',
-                'Content-Type': 'application/pdf',
-                'Content-Length': str(len(pdf_bytes)),
-                'Cache-Control': 'no-cache, no-store, must-revalidate',
-                'Pragma': 'no-cache',
-                'Expires': '0'
-            }
+        path = documents.cached_document(
+            meeting, 'final.pdf', lambda: _final_results_pdf(meeting)
         )
-        
-        return response
-        
     except Exception as e:
         # Log the error and return a simple error response
         current_app.logger.error(f"Error generating PDF: {e}")
         abort(500)
 
+    # Create a safe filename
+    safe_filename = f"{secure_filename(meeting.title)}_final_results.pdf"
+    return send_file(
+        path,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=safe_filename,
+        conditional=False,
+        etag=False,
+    )
+
+
+@documents.renderer('final.pdf')
+def _final_results_pdf(meeting: Meeting) -> bytes:
+    """Render the public PDF summary of a meeting's results."""
+    tallies = tally.results_tallies(meeting)
+    stage1 = tally.amendment_results(meeting, tallies)
+    stage2 = tally.motion_results(meeting, tallies)
+    return generate_results_pdf(meeting, stage1, stage2)
+
 
 @bp.route('/results/motion/<int:motion_id>')
 def public_motion_text(motion_id: int):
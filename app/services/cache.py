@@ -0,0 +1,306 @@
+import pickle
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable
+from urllib.parse import unquote, urlparse
+from uuid import uuid4
+
+from flask import current_app
+
+from . import singleflight
+
+_MISSING = object()
+
+
+class CacheError(Exception):
+    """Raised when the cache server replies with an error."""
+
+
+class MemoryBackend:
+    """Least-recently-used cache held in this process.
+
+    Entries are not shared between workers, so pair it with keys that
+    change when the underlying data does, or a single-process deployment.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[float | None, bytes]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _get(self, key: str, now: float) -> bytes | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires <= now:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        now = time.monotonic()
+        with self.lock:
+            return [self._get(key, now) for key in keys]
+
+    def _store(self, key: str, value: bytes, timeout: int | None) -> None:
+        expires = time.monotonic() + timeout if timeout else None
+        self.entries[key] = (expires, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def set(self, key: str, value: bytes, timeout: int | None = None) -> None:
+        with self.lock:
+            self._store(key, value, timeout)
+
+    def add(self, key: str, value: bytes) -> bool:
+        with self.lock:
+            if self._get(key, time.monotonic()) is not None:
+                return False
+            self._store(key, value, None)
+            return True
+
+    def delete(self, *keys: str) -> None:
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+
+class RedisBackend:
+    """Cache on a server speaking the Redis protocol.
+
+    Only ``GET``, ``MGET``, ``SET`` and ``DEL`` are used, so Redis, Valkey,
+    KeyDB and similar servers all work. Each thread keeps its own
+    connection.
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0) -> None:
+        parsed = urlparse(url)
+        self.address = (parsed.hostname or "localhost", parsed.port or 6379)
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.strip("/") or 0)
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        self.local.sock = sock
+        self.local.reader = sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", self.db)
+
+    def _close(self) -> None:
+        sock = getattr(self.local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self.local.sock = None
+
+    def _read(self):
+        line = self.local.reader.readline()
+        if not line:
+            raise ConnectionError("Cache server closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise CacheError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            return self.local.reader.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise CacheError(f"Unexpected reply from cache server: {line!r}")
+
+    def _send(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self.local.sock.sendall(b"".join(parts))
+        return self._read()
+
+    def command(self, *args):
+        """Run one command, reconnecting once if the connection dropped."""
+        for attempt in (1, 2):
+            if getattr(self.local, "sock", None) is None:
+                self._connect()
+            try:
+                return self._send(*args)
+            except OSError:
+                self._close()
+                if attempt == 2:
+                    raise
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return self.command("MGET", *keys) if keys else []
+
+    def set(self, key: str, value: bytes, timeout: int | None = None) -> None:
+        if timeout:
+            self.command("SET", key, value, "EX", int(timeout))
+        else:
+            self.command("SET", key, value)
+
+    def add(self, key: str, value: bytes) -> bool:
+        return self.command("SET", key, value, "NX") is not None
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.command("DEL", *keys)
+
+
+def make_backend(url: str | None = None, max_entries: int = 1024):
+    """Return the backend for ``url``: ``memory://`` or ``redis://host:port/db``."""
+    if not url or url.startswith("memory://"):
+        return MemoryBackend(max_entries)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
+
+
+def backend():
+    """Return the cache backend of the current app, creating it on first use."""
+    store = current_app.extensions.get("cache")
+    if store is None:
+        store = make_backend(
+            current_app.config.get("CACHE_URL"),
+            current_app.config.get("CACHE_MAX_ENTRIES", 1024),
+        )
+        current_app.extensions["cache"] = store
+    return store
+
+
+def shared() -> bool:
+    """Return True when cached entries are visible to other processes."""
+    return not isinstance(backend(), MemoryBackend)
+
+
+def _key(name: str) -> str:
+    return current_app.config.get("CACHE_KEY_PREFIX", "votebuddy:") + name
+
+
+def meeting_tag(meeting_id: int) -> str:
+    return f"meeting:{meeting_id}"
+
+
+def _tag_versions(store, tags: list[str]) -> list[bytes]:
+    """Return the current version of each tag, starting any that are missing."""
+    keys = [_key(f"tag:{tag}") for tag in tags]
+    versions = store.get_many(keys)
+    for i, version in enumerate(versions):
+        if version is None:
+            store.add(keys[i], uuid4().hex.encode())
+    if None in versions:
+        versions = store.get_many(keys)
+    return versions
+
+
+def _entry_key(store, name: str, tags: Iterable[str]) -> str:
+    tags = sorted(frozenset(tags))
+    versions = _tag_versions(store, tags) if tags else []
+    suffix = ",".join(f"{t}={(v or b'').decode()}" for t, v in zip(tags, versions))
+    return _key(f"{name}|{suffix}")
+
+
+def _lookup(name: str, tags: Iterable[str]) -> tuple[str | None, object]:
+    """Return the entry key for ``name`` under the current tag versions and
+    its cached value, or ``_MISSING``. The key is None if the cache is down.
+    """
+    try:
+        store = backend()
+        key = _entry_key(store, name, tags)
+        data = store.get_many([key])[0]
+    except (OSError, CacheError):
+        current_app.logger.warning("Cache unavailable", exc_info=True)
+        return None, _MISSING
+    return key, _MISSING if data is None else pickle.loads(data)
+
+
+def _store(key: str | None, value, timeout: int | None) -> None:
+    if key is None:
+        return
+    if timeout is None:
+        timeout = current_app.config.get("CACHE_DEFAULT_TIMEOUT", 300)
+    try:
+        backend().set(key, pickle.dumps(value), timeout)
+    except (OSError, CacheError):
+        current_app.logger.warning("Cache unavailable", exc_info=True)
+
+
+def get(name: str, tags: Iterable[str] = (), default=None):
+    """Return the cached value for ``name``, or ``default`` when missing.
+
+    Entries stored with tags are missed once any of them is invalidated.
+    """
+    value = _lookup(name, tags)[1]
+    return default if value is _MISSING else value
+
+
+def set(name: str, value, tags: Iterable[str] = (), timeout: int | None = None) -> None:
+    """Store ``value`` under ``name``, tied to ``tags``."""
+    try:
+        store = backend()
+        key = _entry_key(store, name, tags)
+    except (OSError, CacheError):
+        current_app.logger.warning("Cache unavailable", exc_info=True)
+        return
+    _store(key, value, timeout)
+
+
+def cached(
+    name: str,
+    compute: Callable[[], object],
+    tags: Iterable[str] = (),
+    timeout: int | None = None,
+    *,
+    coalesce: bool = False,
+):
+    """Return the cached value for ``name``, calling ``compute`` on a miss.
+
+    The value is stored under the tag versions read before computing, so
+    an invalidation that lands meanwhile is not masked. With ``coalesce``
+    concurrent misses wait for a single computation instead of each running
+    their own: across processes for a shared backend, and across the
+    threads of this process for ``memory://``. Values are pickled:
+    callers get their own copy and should cache plain data rather than ORM
+    instances.
+    """
+    tags = list(tags)
+    key, value = _lookup(name, tags)
+    if value is not _MISSING:
+        return value
+    if not coalesce:
+        value = compute()
+        _store(key, value, timeout)
+        return value
+    with singleflight.hold(f"cache:{name}", shared=shared()):
+        key, value = _lookup(name, tags)
+        if value is _MISSING:
+            value = compute()
+            _store(key, value, timeout)
+    return value
+
+
+def invalidate(*tags: str) -> None:
+    """Make every entry stored with any of ``tags`` a miss, in all processes."""
+    if not tags:
+        return
+    try:
+        backend().delete(*(_key(f"tag:{tag}") for tag in tags))
+    except (OSError, CacheError):
+        current_app.logger.warning("Cache unavailable", exc_info=True)
+
+
+def invalidate_meetings(meeting_ids: Iterable[int]) -> None:
+    """Invalidate everything cached for ``meeting_ids``."""
+    invalidate(*(meeting_tag(m) for m in meeting_ids if m is not None))
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import time
+from typing import Callable
+from uuid import uuid4
+
+from flask import current_app
+
+from ..extensions import db
+from ..models import AppSetting, Meeting, ResultSnapshot
+from . import cache, singleflight, tally
+
+# Bump when the layout of any cached document changes so stale renders are
+# never served after a deploy.
+TEMPLATE_VERSION = "1"
+
+# Settings edited in the admin area that change how documents are branded.
+BRANDING_SETTINGS = ("site_title", "site_logo")
+# Temporary files older than this were left by a render that died.
+STALE_TMP_SECONDS = 600
+
+RENDERERS: dict[str, Callable[[Meeting], bytes]] = {}
+
+
+def renderer(name: str):
+    """Register ``func`` as the default renderer for document ``name``."""
+
+    def decorator(func: Callable[[Meeting], bytes]):
+        RENDERERS[name] = func
+        return func
+
+    return decorator
+
+
+def cache_dir() -> str:
+    """Return the directory holding rendered documents."""
+    root = current_app.config.get(
+        "UPLOAD_FOLDER", os.path.join(current_app.instance_path, "files")
+    )
+    return os.path.abspath(os.path.join(root, "document-cache"))
+
+
+def _branding_version(include_logo: bool) -> str:
+    settings = ",".join(f"{key}={AppSetting.get(key, '')}" for key in BRANDING_SETTINGS)
+    if not include_logo:
+        return f"plain;{settings}"
+    logo_path = os.path.join(current_app.root_path, "..", "assets", "logo.png")
+    try:
+        stat = os.stat(logo_path)
+    except OSError:
+        return f"logo-missing;{settings}"
+    return f"logo-{stat.st_size}-{int(stat.st_mtime)};{settings}"
+
+
+def document_key(meeting: Meeting, name: str, *, include_logo: bool = False) -> str:
+    """Return the content address for document ``name`` of ``meeting``.
+
+    The key covers the meeting's results revision, the frozen results digest
+    when one exists, the document template version and branding.
+    """
+    snapshot = db.session.get(ResultSnapshot, (meeting.id, 2))
+    parts = {
+        "meeting": meeting.id,
+        "name": name,
+        "results_revision": meeting.results_revision(),
+        "results_digest": snapshot.digest if snapshot else None,
+        "template": TEMPLATE_VERSION,
+        "branding": _branding_version(include_logo),
+    }
+    canonical = json.dumps(parts, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def cached_document(
+    meeting: Meeting,
+    name: str,
+    render: Callable[[], bytes],
+    *,
+    include_logo: bool = False,
+) -> str:
+    """Return the path of a rendered document, calling ``render`` on a miss."""
+    directory = cache_dir()
+    ext = os.path.splitext(name)[1]
+    key = document_key(meeting, name, include_logo=include_logo)
+    path = os.path.join(directory, f"{key}{ext}")
+    if _touch(path):
+        return path
+
+    # concurrent misses for the same document wait for one render
+    with singleflight.hold(f"document:{key}"):
+        if _touch(path):
+            return path
+        data = render()
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    evict(keep=path)
+    return path
+
+
+def _touch(path: str) -> bool:
+    """Refresh the timestamp used for LRU eviction; False if ``path`` is missing."""
+    if not os.path.exists(path):
+        return False
+    try:
+        os.utime(path)
+    except OSError:
+        return False
+    return True
+
+
+def evict(keep: str | None = None) -> int:
+    """Delete least recently used documents until the cache fits its cap.
+
+    Returns the number of files removed.
+    """
+    max_bytes = current_app.config.get("DOCUMENT_CACHE_MAX_MB", 200) * 1024 * 1024
+    directory = cache_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    entries = []
+    stale_before = time.time() - STALE_TMP_SECONDS
+    for entry in names:
+        path = os.path.join(directory, entry)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if entry.endswith(".tmp"):
+            # another process may still be writing it
+            if stat.st_mtime < stale_before:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def prewarm(meeting: Meeting) -> list[str]:
+    """Cache the tallies of public results and render the documents of a
+    completed meeting, so the first visitors after publication find them ready.
+
+    Tallies are only computed ahead when the cache is shared between
+    processes; a ``memory://`` cache would warm just the publishing worker.
+    Failures are logged rather than raised so publishing never fails
+    because a document could not be rendered. Returns the cached paths.
+    """
+    if not meeting.public_results:
+        return []
+    try:
+        if cache.shared():
+            tally.results_tallies(meeting)
+    except Exception as exc:
+        current_app.logger.error(f"Error pre-computing tallies: {exc}")
+    if meeting.status != "Completed":
+        return []
+    names = ["final.pdf"]
+    if meeting.results_doc_published:
+        names.append("final_results.docx")
+    paths = []
+    for name in names:
+        render = RENDERERS.get(name)
+        if render is None:
+            continue
+        try:
+            paths.append(cached_document(meeting, name, lambda: render(meeting)))
+        except Exception as exc:
+            current_app.logger.error(f"Error pre-rendering {name}: {exc}")
+    return paths
@@ -1,9 +1,15 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
+
 from flask import render_template, url_for, current_app
 from flask_mail import Message
 from ..utils import config_or_setting, generate_stage_ics, carried_amendment_summary
 from ..utils import markdown_to_html
 
-from ..extensions import mail, db
+from ..extensions import db
+from . import mailer, outbox
 from ..models import (
     Member,
     Meeting,
@@ -21,7 +27,6 @@ from ..models import (
     SubmissionToken,
 )
 from uuid6 import uuid7
-from sqlalchemy import func
 from docx import Document
 from docx.shared import RGBColor, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
@@ -43,49 +48,216 @@ def auto_send_enabled(meeting: Meeting, kind: str) -> bool:
     return setting.auto_send if setting else True
 
 
+class MailContext:
+    """Values shared by every email of one bulk send.
+
+    Settings such as the sender and branding are resolved on first use and
+    reused for the remaining recipients. Unsubscribe tokens for all
+    recipients are loaded, and any missing ones created, up front. Email
+    log rows are buffered and inserted in batches.
+    """
+
+    FLUSH_EVERY = 500
+
+    def __init__(self, members: Iterable[Member] = ()) -> None:
+        self.values: dict = {}
+        self.tokens: dict[int, str] = {}
+        self.logs: list[dict] = []
+        self.pending = 0
+        self._load_tokens([m.id for m in members if not m.email_opt_out])
+
+    def _load_tokens(self, member_ids: list[int]) -> None:
+        member_ids = list(dict.fromkeys(member_ids))
+        for start in range(0, len(member_ids), self.FLUSH_EVERY):
+            chunk = member_ids[start:start + self.FLUSH_EVERY]
+            rows = UnsubscribeToken.query.filter(UnsubscribeToken.member_id.in_(chunk))
+            for row in rows:
+                self.tokens.setdefault(row.member_id, row.token)
+            missing = [
+                {"token": str(uuid7()), "member_id": member_id}
+                for member_id in chunk
+                if member_id not in self.tokens
+            ]
+            if missing:
+                db.session.execute(db.insert(UnsubscribeToken), missing)
+                self.tokens.update((row["member_id"], row["token"]) for row in missing)
+        db.session.commit()
+
+    def shared(self, key, compute: Callable):
+        if key not in self.values:
+            self.values[key] = compute()
+        return self.values[key]
+
+    def log(self, entry: dict) -> None:
+        self.logs.append(entry)
+        self.sent()
+
+    def sent(self) -> None:
+        self.pending += 1
+        if self.pending >= self.FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert buffered log rows and commit queued emails."""
+        if self.logs:
+            db.session.execute(db.insert(EmailLog), self.logs)
+            self.logs = []
+        if self.pending:
+            db.session.commit()
+            outbox.notify()
+        self.pending = 0
+
+    def abort(self) -> None:
+        """Roll back after a failed send, keeping the log of emails already sent.
+
+        Emails queued for the outbox are dropped with the rest of the
+        failed work.
+        """
+        db.session.rollback()
+        try:
+            if self.logs:
+                db.session.execute(db.insert(EmailLog), self.logs)
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception("Could not log emails sent before a failed send")
+        self.logs = []
+        self.pending = 0
+
+
+_context: ContextVar[MailContext | None] = ContextVar("mail_context", default=None)
+
+
+@contextmanager
+def mail_context(members: Iterable[Member] = ()) -> Iterator[MailContext]:
+    """Share settings, tokens and one SMTP connection across a bulk send."""
+    if _context.get() is not None:
+        yield _context.get()
+        return
+    context = MailContext(members)
+    token = _context.set(context)
+    try:
+        with mailer.bulk_send():
+            yield context
+    except BaseException:
+        _context.reset(token)
+        context.abort()
+        raise
+    _context.reset(token)
+    context.flush()
+
+
+def _shared(key, compute: Callable):
+    """Return ``compute()``, cached for the current bulk send if any."""
+    context = _context.get()
+    if context is None:
+        return compute()
+    return context.shared(key, compute)
+
+
 def _log_email(member: Member, meeting: Meeting, kind: str, test_mode: bool) -> None:
-    entry = EmailLog(
+    entry = dict(
         meeting_id=meeting.id if meeting else None,
         member_id=member.id if member else None,
         type=kind,
         is_test=test_mode,
+        sent_at=datetime.utcnow(),
     )
-    db.session.add(entry)
+    context = _context.get()
+    if context is not None:
+        context.log(entry)
+        return
+    db.session.add(EmailLog(**entry))
     db.session.commit()
 
 
-def _unsubscribe_url(member: Member) -> str:
+def _deliver(
+    msg: Message,
+    member: Member | None = None,
+    meeting: Meeting | None = None,
+    kind: str | None = None,
+    test_mode: bool = False,
+) -> None:
+    """Send ``msg`` now, or queue it when the email outbox is enabled.
+
+    ``kind`` is written to the email log once the message is delivered.
+    """
+    if outbox.enabled():
+        context = _context.get()
+        outbox.enqueue(
+            msg,
+            member_id=member.id if member else None,
+            meeting_id=meeting.id if meeting else None,
+            kind=kind,
+            is_test=test_mode,
+            commit=context is None,
+        )
+        if context is not None:
+            context.sent()
+        return
+    mailer.send(msg)
+    if kind:
+        _log_email(member, meeting, kind, test_mode)
+
+
+def _unsubscribe_token(member: Member) -> str:
+    context = _context.get()
+    if context is not None and member.id in context.tokens:
+        return context.tokens[member.id]
     token = UnsubscribeToken.query.filter_by(member_id=member.id).first()
     if not token:
         token = UnsubscribeToken(token=str(uuid7()), member_id=member.id)
         db.session.add(token)
         db.session.commit()
-    return url_for('notifications.unsubscribe', token=token.token, _external=True)
+    if context is not None:
+        context.tokens[member.id] = token.token
+    return token.token
+
+
+def _unsubscribe_url(member: Member) -> str:
+    return url_for('notifications.unsubscribe', token=_unsubscribe_token(member), _external=True)
 
 
 def _resubscribe_url(member: Member) -> str:
-    token = UnsubscribeToken.query.filter_by(member_id=member.id).first()
-    if not token:
-        token = UnsubscribeToken(token=str(uuid7()), member_id=member.id)
-        db.session.add(token)
-        db.session.commit()
-    return url_for('notifications.resubscribe', token=token.token, _external=True)
+    return url_for('notifications.resubscribe', token=_unsubscribe_token(member), _external=True)
+
+
+def _why_text() -> str:
+    return _shared(
+        'why_text', lambda: config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT)
+    )
+
+
+def _stage_ics(meeting: Meeting, stage: int) -> str:
+    return _shared(('ics', meeting.id, stage), lambda: generate_stage_ics(meeting, stage))
+
+
+def _amendment_summary(meeting: Meeting) -> str:
+    return _shared(('summary', meeting.id), lambda: carried_amendment_summary(meeting))
 
 
 def _sender() -> str:
     """Return configured sender email or a safe default."""
-    sender = AppSetting.get("from_email") or current_app.config.get("MAIL_DEFAULT_SENDER")
-    return sender or "noreply@example.com"
+
+    def lookup() -> str:
+        sender = AppSetting.get("from_email") or current_app.config.get("MAIL_DEFAULT_SENDER")
+        return sender or "noreply@example.com"
+
+    return _shared("sender", lookup)
 
 
 def _branding() -> dict[str, str | None]:
     """Return site title and optional absolute logo URL."""
-    title = AppSetting.get("site_title", "VoteBuddy")
-    logo_file = AppSetting.get("site_logo")
-    logo_url = (
-        url_for("static", filename=logo_file, _external=True) if logo_file else None
-    )
-    return {"site_title": title, "logo": logo_url}
+
+    def lookup() -> dict[str, str | None]:
+        title = AppSetting.get("site_title", "VoteBuddy")
+        logo_file = AppSetting.get("site_logo")
+        logo_url = (
+            url_for("static", filename=logo_file, _external=True) if logo_file else None
+        )
+        return {"site_title": title, "logo": logo_url}
+
+    return _shared("branding", lookup)
 
 
 def send_vote_invite(member: Member, token: str, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -112,7 +284,7 @@ def send_vote_invite(member: Member, token: str, meeting: Meeting, *, test_mode:
         objection_link=objection_link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
@@ -125,18 +297,17 @@ def send_vote_invite(member: Member, token: str, meeting: Meeting, *, test_mode:
         objection_link=objection_link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
     try:
-        ics = generate_stage_ics(meeting, 1)
+        ics = _stage_ics(meeting, 1)
     except Exception:
         ics = None
     if ics:
         msg.attach('stage1.ics', 'text/calendar', ics)
-    mail.send(msg)
-    _log_email(member, meeting, 'stage1_invite', test_mode)
+    _deliver(msg, member, meeting, 'stage1_invite', test_mode)
 
 
 def send_proxy_invite(proxy: Member, principal: Member, token: str, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -160,7 +331,7 @@ def send_proxy_invite(proxy: Member, principal: Member, token: str, meeting: Mee
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
@@ -172,12 +343,11 @@ def send_proxy_invite(proxy: Member, principal: Member, token: str, meeting: Mee
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
-    mail.send(msg)
-    _log_email(proxy, meeting, 'proxy_invite', test_mode)
+    _deliver(msg, proxy, meeting, 'proxy_invite', test_mode)
 
 
 def send_stage2_invite(member: Member, token: str, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -187,7 +357,7 @@ def send_stage2_invite(member: Member, token: str, meeting: Meeting, *, test_mod
     link = url_for('voting.ballot_token', token=token, _external=True)
     unsubscribe = _unsubscribe_url(member)
     resubscribe = _resubscribe_url(member)
-    summary = carried_amendment_summary(meeting)
+    summary = _amendment_summary(meeting)
     if summary:
         results_link = None
     else:
@@ -208,7 +378,7 @@ def send_stage2_invite(member: Member, token: str, meeting: Meeting, *, test_mod
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         summary=summary,
         results_link=results_link,
         test_mode=test_mode,
@@ -221,20 +391,19 @@ def send_stage2_invite(member: Member, token: str, meeting: Meeting, *, test_mod
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         summary=summary,
         results_link=results_link,
         test_mode=test_mode,
         **branding,
     )
     try:
-        ics = generate_stage_ics(meeting, 2)
+        ics = _stage_ics(meeting, 2)
     except Exception:
         ics = None
     if ics:
         msg.attach('stage2.ics', 'text/calendar', ics)
-    mail.send(msg)
-    _log_email(member, meeting, 'stage2_invite', test_mode)
+    _deliver(msg, member, meeting, 'stage2_invite', test_mode)
 
 def send_runoff_invite(member: Member, token: str, meeting: Meeting, *, test_mode: bool = False) -> None:
     """Email run-off voting link after Stage 1."""
@@ -256,7 +425,7 @@ def send_runoff_invite(member: Member, token: str, meeting: Meeting, *, test_mod
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
@@ -267,7 +436,7 @@ def send_runoff_invite(member: Member, token: str, meeting: Meeting, *, test_mod
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
@@ -277,13 +446,12 @@ def send_runoff_invite(member: Member, token: str, meeting: Meeting, *, test_mod
             'opens_at_stage1': meeting.runoff_opens_at,
             'closes_at_stage1': meeting.runoff_closes_at,
         })()
-        ics = generate_stage_ics(tmp_meeting, 1)
+        ics = _shared(('runoff_ics', meeting.id), lambda: generate_stage_ics(tmp_meeting, 1))
     except Exception:
         ics = None
     if ics:
         msg.attach('runoff.ics', 'text/calendar', ics)
-    mail.send(msg)
-    _log_email(member, meeting, 'runoff_invite', test_mode)
+    _deliver(msg, member, meeting, 'runoff_invite', test_mode)
 
 
 def send_stage1_reminder(member: Member, token: str, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -291,7 +459,9 @@ def send_stage1_reminder(member: Member, token: str, meeting: Meeting, *, test_m
     if member.email_opt_out:
         return
     link = url_for('voting.ballot_token', token=token, _external=True)
-    template_base = config_or_setting('REMINDER_TEMPLATE', 'email/reminder')
+    template_base = _shared(
+        'reminder_template', lambda: config_or_setting('REMINDER_TEMPLATE', 'email/reminder')
+    )
     unsubscribe = _unsubscribe_url(member)
     resubscribe = _resubscribe_url(member)
     msg = Message(
@@ -309,7 +479,7 @@ def send_stage1_reminder(member: Member, token: str, meeting: Meeting, *, test_m
         objection_link=objection_link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
@@ -321,12 +491,11 @@ def send_stage1_reminder(member: Member, token: str, meeting: Meeting, *, test_m
         objection_link=objection_link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
-    mail.send(msg)
-    _log_email(member, meeting, 'stage1_reminder', test_mode)
+    _deliver(msg, member, meeting, 'stage1_reminder', test_mode)
 
 
 def send_stage2_reminder(member: Member, token: str, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -334,10 +503,13 @@ def send_stage2_reminder(member: Member, token: str, meeting: Meeting, *, test_m
     if member.email_opt_out:
         return
     link = url_for('voting.ballot_token', token=token, _external=True)
-    template_base = config_or_setting('STAGE2_REMINDER_TEMPLATE', 'email/stage2_reminder')
+    template_base = _shared(
+        'stage2_reminder_template',
+        lambda: config_or_setting('STAGE2_REMINDER_TEMPLATE', 'email/stage2_reminder'),
+    )
     unsubscribe = _unsubscribe_url(member)
     resubscribe = _resubscribe_url(member)
-    summary = carried_amendment_summary(meeting)
+    summary = _amendment_summary(meeting)
     if summary:
         results_link = None
     else:
@@ -358,7 +530,7 @@ def send_stage2_reminder(member: Member, token: str, meeting: Meeting, *, test_m
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         summary=summary,
         results_link=results_link,
         test_mode=test_mode,
@@ -371,14 +543,13 @@ def send_stage2_reminder(member: Member, token: str, meeting: Meeting, *, test_m
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         summary=summary,
         results_link=results_link,
         test_mode=test_mode,
         **branding,
     )
-    mail.send(msg)
-    _log_email(member, meeting, 'stage2_reminder', test_mode)
+    _deliver(msg, member, meeting, 'stage2_reminder', test_mode)
 
 
 def send_vote_receipt(member: Member, meeting: Meeting, hashes: list[str], *, test_mode: bool = False) -> None:
@@ -400,7 +571,7 @@ def send_vote_receipt(member: Member, meeting: Meeting, hashes: list[str], *, te
         hashes=hashes,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
@@ -411,12 +582,11 @@ def send_vote_receipt(member: Member, meeting: Meeting, hashes: list[str], *, te
         hashes=hashes,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
-    mail.send(msg)
-    _log_email(member, meeting, 'receipt', test_mode)
+    _deliver(msg, member, meeting, 'receipt', test_mode)
 
 def send_quorum_failure(member: Member, meeting: Meeting, *, test_mode: bool = False) -> None:
     """Notify a member that Stage 1 failed to reach quorum."""
@@ -436,7 +606,7 @@ def send_quorum_failure(member: Member, meeting: Meeting, *, test_mode: bool = F
         meeting=meeting,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
@@ -446,12 +616,11 @@ def send_quorum_failure(member: Member, meeting: Meeting, *, test_mode: bool = F
         meeting=meeting,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
-    mail.send(msg)
-    _log_email(member, meeting, 'quorum_failure', test_mode)
+    _deliver(msg, member, meeting, 'quorum_failure', test_mode)
 
 
 def _shade_cell(cell, color_hex: str) -> None:
@@ -480,37 +649,19 @@ def _styled_doc(title: str) -> Document:
 
 
 def _final_results_docx(meeting: Meeting) -> bytes:
-    from ..models import Amendment, Motion, Vote
-    amend_results = (
-        Amendment.query.filter_by(meeting_id=meeting.id)
-        .order_by(Amendment.order)
-        .all()
-    )
-    motion_results = (
-        Motion.query.filter_by(meeting_id=meeting.id)
-        .order_by(Motion.ordering)
-        .all()
-    )
+    from . import tally
+
+    tallies = tally.results_tallies(meeting)
+    amend_results = tally.amendment_results(meeting, tallies)
+    motion_results = tally.motion_results(meeting, tallies)
 
     doc = _styled_doc(f"{meeting.title} - Final Results")
     doc.add_heading("Carried Amendments", level=2)
-    carried = []
-    for amend in amend_results:
-        counts = {
-            "for": 0,
-            "against": 0,
-        }
-        rows = (
-            db.session.query(Vote.choice, func.count(Vote.id))
-            .filter_by(amendment_id=amend.id)
-            .filter(Vote.is_test.is_(False))
-            .group_by(Vote.choice)
-            .all()
-        )
-        for choice, count in rows:
-            counts[choice] = count
-        if counts.get("for", 0) > counts.get("against", 0):
-            carried.append(amend)
+    carried = [
+        amend
+        for amend, counts in amend_results
+        if counts.get("for", 0) > counts.get("against", 0)
+    ]
 
     table_ca = doc.add_table(rows=1, cols=1)
     if carried:
@@ -534,21 +685,7 @@ def _final_results_docx(meeting: Meeting) -> bytes:
     for cell in hdr:
         for run in cell.paragraphs[0].runs:
             run.bold = True
-    for idx, motion in enumerate(motion_results, start=1):
-        counts = {
-            "for": 0,
-            "against": 0,
-            "abstain": 0,
-        }
-        rows = (
-            db.session.query(Vote.choice, func.count(Vote.id))
-            .filter_by(motion_id=motion.id)
-            .filter(Vote.is_test.is_(False))
-            .group_by(Vote.choice)
-            .all()
-        )
-        for choice, count in rows:
-            counts[choice] = count
+    for idx, (motion, counts) in enumerate(motion_results, start=1):
         row = table.add_row().cells
         row[0].text = motion.title or "Motion"
         row[1].text = str(counts["for"])
@@ -565,24 +702,52 @@ def _final_results_docx(meeting: Meeting) -> bytes:
     return buf.read()
 
 
-def send_final_results(member: Member, meeting: Meeting, *, test_mode: bool = False) -> None:
-    """Email certified results to a member."""
-    if member.email_opt_out:
-        return
+def final_results_payload(meeting: Meeting) -> dict:
+    """Return the parts of the final results email shared by all recipients.
 
-    unsubscribe = _unsubscribe_url(member)
-    resubscribe = _resubscribe_url(member)
+    The summary Markdown and its HTML rendering, the results link and, when
+    results are not public, the rendered DOCX attachment are computed once so a bulk send does not
+    repeat the tally queries and document build for every member.
+    """
     from ..utils import carried_amendment_summary, motion_results_summary
 
-    ca_summary = carried_amendment_summary(meeting) or "No amendments carried."
+    ca_summary = _amendment_summary(meeting) or "No amendments carried."
     motion_summary = motion_results_summary(meeting)
-    summary = f"{ca_summary}\n\nMotion Outcomes:\n{motion_summary}"
-
     results_link = (
         url_for('main.public_results', meeting_id=meeting.id, _external=True)
         if meeting.public_results
         else None
     )
+    summary = f"{ca_summary}\n\nMotion Outcomes:\n{motion_summary}"
+    return {
+        'summary': summary,
+        'summary_html': markdown_to_html(summary),
+        'results_link': results_link,
+        'docx': None if results_link else _final_results_docx(meeting),
+    }
+
+
+def send_final_results(
+    member: Member,
+    meeting: Meeting,
+    *,
+    test_mode: bool = False,
+    payload: dict | None = None,
+) -> None:
+    """Email certified results to a member.
+
+    Pass ``payload`` from :func:`final_results_payload` when emailing many
+    members so the shared content is only built once.
+    """
+    if member.email_opt_out:
+        return
+
+    unsubscribe = _unsubscribe_url(member)
+    resubscribe = _resubscribe_url(member)
+    if payload is None:
+        payload = final_results_payload(meeting)
+    summary = payload['summary']
+    results_link = payload['results_link']
 
     msg = Message(
         subject=("[TEST] " if test_mode else "") + f"Certified results for {meeting.title}",
@@ -597,7 +762,7 @@ def send_final_results(member: Member, meeting: Meeting, *, test_mode: bool = Fa
         results_link=results_link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
     )
     msg.html = render_template(
@@ -605,22 +770,21 @@ def send_final_results(member: Member, meeting: Meeting, *, test_mode: bool = Fa
         member=member,
         meeting=meeting,
         summary=summary,
+        summary_html=payload['summary_html'],
         results_link=results_link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
     )
 
-    if not results_link:
-        doc_bytes = _final_results_docx(meeting)
+    if payload['docx'] is not None:
         msg.attach(
             'final_results.docx',
             'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            doc_bytes,
+            payload['docx'],
         )
-    mail.send(msg)
-    _log_email(member, meeting, 'final_results', test_mode)
+    _deliver(msg, member, meeting, 'final_results', test_mode)
 
 
 def send_objection_confirmation(obj: AmendmentObjection, amendment: Amendment, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -634,16 +798,16 @@ def send_objection_confirmation(obj: AmendmentObjection, amendment: Amendment, m
     msg.body = render_template(
         'email/objection_confirm.txt',
         link=link,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     msg.html = render_template(
         'email/objection_confirm.html',
         link=link,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
-    mail.send(msg)
+    _deliver(msg)
 
 
 def send_board_notice(amendment: Amendment, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -658,17 +822,17 @@ def send_board_notice(amendment: Amendment, meeting: Meeting, *, test_mode: bool
         "email/board_notice.txt",
         amendment=amendment,
         meeting=meeting,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     msg.html = render_template(
         "email/board_notice.html",
         amendment=amendment,
         meeting=meeting,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
-    mail.send(msg)
+    _deliver(msg)
 
 
 def send_amendment_reinstated(amendment: Amendment, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -690,17 +854,17 @@ def send_amendment_reinstated(amendment: Amendment, meeting: Meeting, *, test_mo
         "email/amendment_reinstated.txt",
         amendment=amendment,
         meeting=meeting,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     msg.html = render_template(
         "email/amendment_reinstated.html",
         amendment=amendment,
         meeting=meeting,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
-    mail.send(msg)
+    _deliver(msg)
 
 def send_motion_submission_alert(submission: MotionSubmission, meeting: Meeting, *, test_mode: bool = False) -> None:
     recipient = AppSetting.get('from_email', current_app.config.get('MAIL_DEFAULT_SENDER'))
@@ -714,18 +878,18 @@ def send_motion_submission_alert(submission: MotionSubmission, meeting: Meeting,
         'email/motion_submission.txt',
         submission=submission,
         meeting=meeting,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     msg.html = render_template(
         'email/motion_submission.html',
         submission=submission,
         meeting=meeting,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     try:
-        mail.send(msg)
+        _deliver(msg)
     except OSError as exc:
         current_app.logger.warning("Email send failed: %s", exc)
 
@@ -742,18 +906,18 @@ def send_amendment_submission_alert(submission: AmendmentSubmission, motion: Mot
         'email/amendment_submission.txt',
         submission=submission,
         motion=motion,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     msg.html = render_template(
         'email/amendment_submission.html',
         submission=submission,
         motion=motion,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     try:
-        mail.send(msg)
+        _deliver(msg)
     except OSError as exc:
         current_app.logger.warning("Email send failed: %s", exc)
 
@@ -770,16 +934,16 @@ def notify_seconder_motion(seconder: Member, meeting: Meeting, *, test_mode: boo
     msg.body = render_template(
         "email/seconder_notice.txt",
         meeting=meeting,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     msg.html = render_template(
         "email/seconder_notice.html",
         meeting=meeting,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
-    mail.send(msg)
+    _deliver(msg)
 
 
 def notify_seconder_amendment(seconder: Member, meeting: Meeting, motion: Motion, *, test_mode: bool = False) -> None:
@@ -795,17 +959,17 @@ def notify_seconder_amendment(seconder: Member, meeting: Meeting, motion: Motion
         "email/seconder_notice.txt",
         meeting=meeting,
         motion=motion,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     msg.html = render_template(
         "email/seconder_notice.html",
         meeting=meeting,
         motion=motion,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
-    mail.send(msg)
+    _deliver(msg)
 
 
 def send_submission_invite(member: Member, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -831,7 +995,7 @@ def send_submission_invite(member: Member, meeting: Meeting, *, test_mode: bool
         member=member,
         meeting=meeting,
         link=link,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     msg.html = render_template(
@@ -839,11 +1003,10 @@ def send_submission_invite(member: Member, meeting: Meeting, *, test_mode: bool
         member=member,
         meeting=meeting,
         link=link,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
-    mail.send(msg)
-    _log_email(member, meeting, 'submission_invite', test_mode)
+    _deliver(msg, member, meeting, 'submission_invite', test_mode)
 
 
 def send_review_invite(member: Member, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -874,7 +1037,7 @@ def send_review_invite(member: Member, meeting: Meeting, *, test_mode: bool = Fa
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
@@ -886,12 +1049,11 @@ def send_review_invite(member: Member, meeting: Meeting, *, test_mode: bool = Fa
         link=link,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
-    mail.send(msg)
-    _log_email(member, meeting, 'review_invite', test_mode)
+    _deliver(msg, member, meeting, 'review_invite', test_mode)
 
 
 def send_amendment_review_invite(member: Member, meeting: Meeting, *, test_mode: bool = False) -> None:
@@ -920,7 +1082,7 @@ def send_amendment_review_invite(member: Member, meeting: Meeting, *, test_mode:
         review_url=review_url,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
@@ -931,12 +1093,11 @@ def send_amendment_review_invite(member: Member, meeting: Meeting, *, test_mode:
         review_url=review_url,
         unsubscribe_url=unsubscribe,
         resubscribe_url=resubscribe,
-        why_text=config_or_setting('EMAIL_WHY_TEXT', DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         test_mode=test_mode,
         **branding,
     )
-    mail.send(msg)
-    _log_email(member, meeting, 'amendment_review_invite', test_mode)
+    _deliver(msg, member, meeting, 'amendment_review_invite', test_mode)
 
 def send_password_reset(user: User, token: str, *, test_mode: bool = False) -> None:
     msg = Message(
@@ -950,15 +1111,15 @@ def send_password_reset(user: User, token: str, *, test_mode: bool = False) -> N
         "email/password_reset.txt",
         user=user,
         link=link,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
     msg.html = render_template(
         "email/password_reset.html",
         user=user,
         link=link,
-        why_text=config_or_setting("EMAIL_WHY_TEXT", DEFAULT_EMAIL_WHY_TEXT),
+        why_text=_why_text(),
         **branding,
     )
-    mail.send(msg)
+    _deliver(msg)
 
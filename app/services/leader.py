@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+
+from ..extensions import db, scheduler
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Key of the PostgreSQL advisory lock held by the scheduler leader.
+ADVISORY_LOCK_KEY = 0x766F7465
+# Seconds between attempts while waiting for a lock file.
+POLL_SECONDS = 0.05
+
+_thread: threading.Thread | None = None
+
+
+class AdvisoryLock:
+    """PostgreSQL session advisory lock held on a dedicated connection.
+
+    The lock goes away with the connection, so a leader that dies or loses
+    its database connection releases it without any cleanup.
+    """
+
+    def __init__(self, engine, key: int = ADVISORY_LOCK_KEY) -> None:
+        self.engine = engine
+        self.key = key
+        self.connection = None
+
+    def acquire(self, timeout: float = 0) -> bool:
+        """Take the lock, waiting up to ``timeout`` seconds on one connection.
+
+        Returns False if the lock is held elsewhere or the database cannot
+        be reached, including when the connection pool is exhausted.
+        """
+        try:
+            connection = self.engine.connect()
+        except SQLAlchemyError:
+            return False
+        try:
+            if timeout > 0:
+                # the wait is cut short by the server, not by reconnecting
+                connection.execute(
+                    db.text("SELECT set_config('lock_timeout', :value, true)"),
+                    {"value": f"{int(timeout * 1000)}ms"},
+                )
+                connection.execute(
+                    db.text("SELECT pg_advisory_lock(:key)"), {"key": self.key}
+                )
+                acquired = True
+            else:
+                acquired = connection.execute(
+                    db.text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+                ).scalar()
+            connection.commit()
+        except SQLAlchemyError:
+            acquired = False
+        if not acquired:
+            connection.close()
+            return False
+        self.connection = connection
+        return True
+
+    def alive(self) -> bool:
+        try:
+            self.connection.execute(db.text("SELECT 1"))
+            self.connection.commit()
+        except DBAPIError:
+            self.release()
+            return False
+        return True
+
+    def release(self) -> None:
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute(
+                db.text("SELECT pg_advisory_unlock(:key)"), {"key": self.key}
+            )
+            self.connection.commit()
+        except DBAPIError:
+            pass
+        finally:
+            self.connection.close()
+            self.connection = None
+
+
+class FileLock:
+    """Exclusive lock on a file, for SQLite installs on a single host.
+
+    The operating system drops the lock when the holding process exits.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.handle = None
+
+    def acquire(self, timeout: float = 0) -> bool:
+        """Take the lock, polling for up to ``timeout`` seconds."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        deadline = time.monotonic() + timeout
+        while not self._try_acquire():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_SECONDS)
+        return True
+
+    def _try_acquire(self) -> bool:
+        handle = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            handle.close()
+            return False
+        self.handle = handle
+        return True
+
+    def alive(self) -> bool:
+        return self.handle is not None
+
+    def release(self) -> None:
+        if self.handle is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+            else:
+                self.handle.seek(0)
+                msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        self.handle.close()
+        self.handle = None
+
+
+def make_lock() -> AdvisoryLock | FileLock:
+    """Return the leader lock suited to the configured database."""
+    if db.engine.dialect.name == "postgresql":
+        return AdvisoryLock(db.engine)
+    path = current_app.config.get("SCHEDULER_LOCK_FILE") or os.path.join(
+        current_app.instance_path, "scheduler.lock"
+    )
+    return FileLock(os.path.abspath(path))
+
+
+def campaign(stop: threading.Event, poll_seconds: float | None = None) -> None:
+    """Run scheduled jobs in this process only while it holds the leader lock.
+
+    The scheduler is expected to be started paused. Every ``poll_seconds``
+    a follower tries to take the lock and a leader checks it still has it,
+    so a replacement takes over shortly after the leader dies.
+    """
+    poll_seconds = poll_seconds or current_app.config.get(
+        "SCHEDULER_LEADER_POLL_SECONDS", 15
+    )
+    lock = make_lock()
+    leader = False
+    try:
+        while not stop.is_set():
+            if leader and not lock.alive():
+                leader = False
+                scheduler.pause()
+                current_app.logger.warning("Lost scheduler leadership")
+            if not leader and lock.acquire():
+                leader = True
+                scheduler.resume()
+                current_app.logger.info("Running scheduled jobs in process %s", os.getpid())
+            elif leader:
+                # pick up meeting events planned by other processes
+                scheduler.scheduler.wakeup()
+            stop.wait(poll_seconds)
+    finally:
+        if leader:
+            scheduler.pause()
+        lock.release()
+
+
+def start_thread(app, poll_seconds: float | None = None) -> threading.Thread:
+    """Campaign for scheduler leadership in a daemon thread of this process.
+
+    The lock is released by the operating system or the database when the
+    process exits.
+    """
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return _thread
+
+    def target() -> None:
+        with app.app_context():
+            campaign(threading.Event(), poll_seconds)
+
+    _thread = threading.Thread(target=target, name="scheduler-leader", daemon=True)
+    _thread.start()
+    return _thread
@@ -0,0 +1,73 @@
+import smtplib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from flask import current_app
+from flask_mail import Connection, Message
+
+from ..extensions import mail
+
+# Errors after which the connection is unusable but the message may be fine.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class _SharedConnection:
+    """A Flask-Mail connection opened on first use and reopened when dropped."""
+
+    def __init__(self) -> None:
+        self.connection: Connection | None = None
+
+    def _open(self) -> Connection:
+        if self.connection is None:
+            self.connection = mail.connect().__enter__()
+        return self.connection
+
+    def close(self) -> None:
+        if self.connection is None:
+            return
+        try:
+            self.connection.__exit__(None, None, None)
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.connection = None
+
+    def send(self, msg: Message) -> None:
+        try:
+            self._open().send(msg)
+        except RECONNECT_ERRORS as exc:
+            current_app.logger.warning("SMTP connection lost, reconnecting: %s", exc)
+            self.close()
+            self._open().send(msg)
+
+
+_shared: ContextVar[_SharedConnection | None] = ContextVar("shared_smtp", default=None)
+
+
+@contextmanager
+def bulk_send() -> Iterator[None]:
+    """Send every email inside the block over one SMTP connection.
+
+    The connection is opened by the first message, recycled by Flask-Mail
+    after ``MAIL_MAX_EMAILS`` messages and reopened if the server drops it.
+    Nested blocks share the outer connection.
+    """
+    if _shared.get() is not None:
+        yield
+        return
+    shared = _SharedConnection()
+    token = _shared.set(shared)
+    try:
+        yield
+    finally:
+        _shared.reset(token)
+        shared.close()
+
+
+def send(msg: Message) -> None:
+    """Send ``msg`` over the bulk connection if one is open."""
+    shared = _shared.get()
+    if shared is None:
+        mail.send(msg)
+    else:
+        shared.send(msg)
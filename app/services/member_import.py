@@ -0,0 +1,461 @@
+import csv
+import io
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta
+from typing import IO, Iterable, Iterator
+from uuid import uuid4
+
+from flask import current_app
+
+from ..extensions import db
+from ..models import ImportJob, Meeting, Member, VoteToken
+from .email import auto_send_enabled, mail_context, send_proxy_invite, send_vote_invite
+
+EXPECTED_HEADERS = ["member_id", "name", "email", "proxy_for"]
+CHUNK_SIZE = 1000
+# A running job whose heartbeat is older than this lost its worker and may
+# be claimed again.
+STALE_AFTER = timedelta(minutes=10)
+# How often a worker sending a chunk's invites refreshes its heartbeat.
+HEARTBEAT_EVERY = timedelta(minutes=1)
+
+RowError = tuple[int, dict[str, str], str]
+
+
+class HeaderError(ValueError):
+    """Raised when the CSV does not have the expected header row."""
+
+
+def read_rows(stream: IO[bytes]) -> Iterator[tuple[int, dict[str, str]]]:
+    """Return ``(line_number, row)`` pairs from an uploaded members CSV.
+
+    The header is checked straight away; rows are decoded lazily as they are
+    consumed so large rolls are never held in memory as a single string.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    if reader.fieldnames != EXPECTED_HEADERS:
+        raise HeaderError("CSV headers must be: " + ", ".join(EXPECTED_HEADERS))
+    return enumerate(reader, start=2)
+
+
+def _validate(
+    idx: int, row: dict[str, str], emails: set[str], numbers: set[str]
+) -> tuple[dict | None, str | None]:
+    name = (row.get("name") or "").strip()
+    email = (row.get("email") or "").strip().lower()
+    number = (row.get("member_id") or "").strip()
+    if not name:
+        return None, f"Row {idx}: name is required"
+    if not email or "@" not in email:
+        return None, f"Row {idx}: invalid email: {email}"
+    if email in emails:
+        return None, f"Duplicate email: {email}"
+    if number and number in numbers:
+        return None, f"Duplicate member ID: {number}"
+    emails.add(email)
+    if number:
+        numbers.add(number)
+    return {
+        "member_number": number,
+        "name": name,
+        "email": email,
+        "proxy_for": (row.get("proxy_for") or "").strip() or None,
+    }, None
+
+
+def import_chunks(
+    meeting: Meeting,
+    rows: Iterable[tuple[int, dict[str, str]]],
+    *,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[dict]:
+    """Validate and insert members from ``rows`` in chunks.
+
+    Existing emails and member numbers are loaded once; every row is checked
+    against them and the rows already accepted. Invalid rows are skipped and
+    reported rather than aborting the import. Each chunk of members, their
+    Stage 1 tokens and proxy tokens is inserted with one executemany per
+    table and yielded uncommitted, so the caller can save its progress in
+    the same transaction before committing.
+
+    Each chunk is a dict with ``processed`` (rows read), ``last_line``,
+    ``created`` (count), ``errors`` (``RowError`` tuples of line, row and
+    message), ``tokens`` (``(member_id, plain)``) and ``proxy_tokens``
+    (``(proxy_id, target_id, plain)``). Proxies are resolved against the
+    members of the meeting inserted so far.
+    """
+    issue_tokens = meeting.ballot_mode != "in-person"
+    existing = db.session.query(Member.id, Member.email, Member.member_number).filter_by(
+        meeting_id=meeting.id
+    )
+    member_ids: set[int] = set()
+    emails: set[str] = set()
+    numbers: set[str] = set()
+    for member_id, email, number in existing:
+        member_ids.add(member_id)
+        if email:
+            emails.add(email.lower())
+        if number:
+            numbers.add(number)
+
+    def insert(values: list[dict], errors: list[RowError], last_line: int) -> dict:
+        chunk = {
+            "processed": len(values) + len(errors),
+            "last_line": last_line,
+            "created": 0,
+            "errors": errors,
+            "tokens": [],
+            "proxy_tokens": [],
+        }
+        if not values:
+            return chunk
+        ids = db.session.scalars(
+            db.insert(Member).returning(Member.id, sort_by_parameter_order=True),
+            [dict(v, meeting_id=meeting.id) for v in values],
+        ).all()
+        member_ids.update(ids)
+        chunk["created"] = len(ids)
+        if not issue_tokens:
+            return chunk
+        proxies = {}
+        for member_id, v in zip(ids, values):
+            try:
+                target_id = int(v["proxy_for"] or "")
+            except ValueError:
+                continue
+            # targets in later chunks are picked up by resolve_proxies
+            if target_id in member_ids:
+                proxies[member_id] = target_id
+        chunk["tokens"], chunk["proxy_tokens"] = issue_tokens_for(meeting, ids, proxies)
+        return chunk
+
+    values: list[dict] = []
+    errors: list[RowError] = []
+    idx = None
+    for idx, row in rows:
+        accepted, error = _validate(idx, row, emails, numbers)
+        if error:
+            errors.append((idx, row, error))
+        else:
+            values.append(accepted)
+        if len(values) + len(errors) >= chunk_size:
+            yield insert(values, errors, idx)
+            values, errors = [], []
+    if idx is not None and (values or errors):
+        yield insert(values, errors, idx)
+
+
+def issue_tokens_for(
+    meeting: Meeting, member_ids: list[int], proxies: dict[int, int]
+) -> tuple[list[tuple[int, str]], list[tuple[int, int, str]]]:
+    """Issue Stage 1 links for ``member_ids`` and the ``proxy: target`` pairs.
+
+    Returns ``(member_id, plain)`` and ``(proxy_id, target_id, plain)``
+    tuples; current links of the same members are re-keyed. Nothing is
+    committed.
+    """
+    salt = current_app.config["TOKEN_SALT"]
+    pairs = VoteToken.create_bulk(member_ids, 1, salt, proxies, meeting_id=meeting.id)
+    proxy_tokens = [
+        (proxy_id, proxies[proxy_id], plain) for proxy_id, plain in pairs[len(member_ids):]
+    ]
+    return pairs[: len(member_ids)], proxy_tokens
+
+
+def resolve_proxies(meeting: Meeting) -> dict:
+    """Issue proxy links whose holder was imported before their target.
+
+    Runs once every row exists, like the proxies of a single-chunk import,
+    and only for holders without a proxy link yet. Returns a chunk shaped
+    like those of :func:`import_chunks`, uncommitted.
+    """
+    chunk = {"tokens": [], "proxy_tokens": []}
+    if meeting.ballot_mode == "in-person":
+        return chunk
+    holders = db.select(VoteToken.proxy_holder_id).where(
+        VoteToken.stage == 1, VoteToken.proxy_holder_id.isnot(None)
+    )
+    rows = db.session.execute(
+        db.select(Member.id, Member.proxy_for).where(
+            Member.meeting_id == meeting.id,
+            Member.proxy_for.isnot(None),
+            Member.id.not_in(holders),
+        )
+    ).all()
+    wanted = {}
+    for proxy_id, proxy_for in rows:
+        try:
+            wanted[proxy_id] = int(proxy_for)
+        except ValueError:
+            continue
+    if not wanted:
+        return chunk
+    known = set(
+        db.session.scalars(
+            db.select(Member.id).where(
+                Member.meeting_id == meeting.id, Member.id.in_(set(wanted.values()))
+            )
+        )
+    )
+    proxies = {p: t for p, t in wanted.items() if t in known and t != p}
+    if proxies:
+        _, chunk["proxy_tokens"] = issue_tokens_for(meeting, [], proxies)
+    return chunk
+
+
+def load_members(chunk: dict) -> dict[int, Member]:
+    """Return the members named in ``chunk`` tokens, keyed by id."""
+    wanted = {member_id for member_id, _ in chunk["tokens"]}
+    for proxy_id, target_id, _ in chunk["proxy_tokens"]:
+        wanted.update((proxy_id, target_id))
+    wanted_ids = list(wanted)
+    members: dict[int, Member] = {}
+    for start in range(0, len(wanted_ids), CHUNK_SIZE):
+        batch = wanted_ids[start:start + CHUNK_SIZE]
+        members.update((m.id, m) for m in Member.query.filter(Member.id.in_(batch)))
+    return members
+
+
+def _touch(job_id: int, now: datetime) -> None:
+    """Refresh a job's heartbeat without committing or expiring the session."""
+    with db.engine.begin() as connection:
+        connection.execute(
+            db.update(ImportJob).where(ImportJob.id == job_id).values(heartbeat_at=now)
+        )
+
+
+def _send_invites(meeting: Meeting, chunk: dict, job_id: int | None = None) -> None:
+    """Email a chunk's invites, keeping ``job_id`` alive while they go out."""
+    members = load_members(chunk)
+    beat = datetime.utcnow()
+
+    def heartbeat() -> None:
+        nonlocal beat
+        now = datetime.utcnow()
+        if job_id is not None and now - beat >= HEARTBEAT_EVERY:
+            _touch(job_id, now)
+            beat = now
+
+    with mail_context(members.values()):
+        for member_id, plain in chunk["tokens"]:
+            send_vote_invite(members[member_id], plain, meeting)
+            heartbeat()
+        for proxy_id, target_id, plain in chunk["proxy_tokens"]:
+            send_proxy_invite(members[proxy_id], members[target_id], plain, meeting)
+            heartbeat()
+
+
+def _upload_root() -> str:
+    return current_app.config.get(
+        "UPLOAD_FOLDER", os.path.join(current_app.instance_path, "files")
+    )
+
+
+def report_dir() -> str:
+    return os.path.abspath(os.path.join(_upload_root(), "import-reports"))
+
+
+def append_error_report(meeting_id: int, report_id: str, errors: list[RowError]) -> None:
+    """Add skipped rows to an error report CSV, creating it if needed."""
+    directory = report_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{meeting_id}-{report_id}.csv")
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="") as fh:
+        writer = csv.writer(fh)
+        if new_file:
+            writer.writerow(["row", *EXPECTED_HEADERS, "error"])
+        for idx, row, message in errors:
+            writer.writerow([idx, *(row.get(h) or "" for h in EXPECTED_HEADERS), message])
+
+
+def report_path(meeting_id: int, report_id: str) -> str | None:
+    """Return the path of an error report, or None if it does not exist."""
+    if len(report_id) != 32 or not all(c in "0123456789abcdef" for c in report_id):
+        return None
+    path = os.path.join(report_dir(), f"{meeting_id}-{report_id}.csv")
+    return path if os.path.exists(path) else None
+
+
+def create_job(
+    meeting: Meeting, stream: IO[bytes], filename: str | None, user_id: int | None = None
+) -> ImportJob:
+    """Store an uploaded CSV and queue an import job for it.
+
+    Raises :class:`HeaderError` if the header row is wrong; nothing is kept
+    in that case.
+    """
+    directory = os.path.abspath(os.path.join(_upload_root(), "imports"))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{meeting.id}-{uuid4().hex}.csv")
+    with open(path, "wb") as fh:
+        shutil.copyfileobj(stream, fh)
+    try:
+        with open(path, "rb") as fh:
+            read_rows(fh)
+    except HeaderError:
+        os.remove(path)
+        raise
+    job = ImportJob(
+        meeting_id=meeting.id,
+        created_by_id=user_id,
+        filename=filename,
+        upload_path=path,
+        report_id=uuid4().hex,
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def _claimable(now: datetime):
+    return db.or_(
+        ImportJob.status == "queued",
+        db.and_(ImportJob.status == "running", ImportJob.heartbeat_at < now - STALE_AFTER),
+    )
+
+
+def claim_job(job_id: int, now: datetime | None = None) -> bool:
+    """Mark a queued or abandoned job as running; False if another worker has it."""
+    now = now or datetime.utcnow()
+    claimed = (
+        ImportJob.query.filter(ImportJob.id == job_id, _claimable(now)).update(
+            {
+                ImportJob.status: "running",
+                ImportJob.heartbeat_at: now,
+                ImportJob.started_at: db.func.coalesce(ImportJob.started_at, now),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.session.commit()
+    return claimed == 1
+
+
+def _pending_invites(chunk: dict) -> str:
+    return json.dumps(
+        {
+            "members": [member_id for member_id, _ in chunk["tokens"]],
+            "proxies": [[p, t] for p, t, _ in chunk["proxy_tokens"]],
+        }
+    )
+
+
+def _send_checkpointed(job: ImportJob, meeting: Meeting, chunk: dict) -> None:
+    """Send a committed chunk's invites, then clear the job's checkpoint."""
+    _send_invites(meeting, chunk, job.id)
+    job.pending_invites = None
+    db.session.commit()
+
+
+def _resend_pending(job: ImportJob, meeting: Meeting) -> None:
+    """Re-issue and send invites of a chunk whose worker died before sending.
+
+    The links are re-keyed, so any invite that did go out before the crash
+    stops working and its member receives the new one.
+    """
+    pending = json.loads(job.pending_invites)
+    proxies = {p: t for p, t in pending["proxies"]}
+    tokens, proxy_tokens = issue_tokens_for(meeting, pending["members"], proxies)
+    db.session.commit()
+    _send_checkpointed(job, meeting, {"tokens": tokens, "proxy_tokens": proxy_tokens})
+
+
+def run_job(job_id: int, *, chunk_size: int = CHUNK_SIZE) -> ImportJob | None:
+    """Claim and run an import job, resuming after its ``last_line``.
+
+    Members, tokens, the job's progress and the list of invites still to
+    send are committed together per chunk; that list is cleared once the
+    chunk's invites are sent, so a job resumed after a crash in between
+    sends them first. If sending fails instead, the job fails with the
+    list cleared and its error names how many invites may not have gone
+    out. Proxies whose target came in a later chunk are issued once every
+    row exists. Returns None if the job could not be claimed.
+    """
+    if not claim_job(job_id):
+        return None
+    job = db.session.get(ImportJob, job_id)
+    meeting = db.session.get(Meeting, job.meeting_id)
+    try:
+        if job.total_rows is None:
+            with open(job.upload_path, "rb") as fh:
+                job.total_rows = sum(1 for _ in read_rows(fh))
+            db.session.commit()
+        send = auto_send_enabled(meeting, "stage1_invite")
+        if send and job.pending_invites:
+            _resend_pending(job, meeting)
+        with open(job.upload_path, "rb") as fh:
+            rows = ((idx, row) for idx, row in read_rows(fh) if idx > job.last_line)
+            for chunk in import_chunks(meeting, rows, chunk_size=chunk_size):
+                if chunk["errors"]:
+                    append_error_report(meeting.id, job.report_id, chunk["errors"])
+                job.processed += chunk["processed"]
+                job.failed += len(chunk["errors"])
+                job.last_line = chunk["last_line"]
+                job.heartbeat_at = datetime.utcnow()
+                if send and (chunk["tokens"] or chunk["proxy_tokens"]):
+                    job.pending_invites = _pending_invites(chunk)
+                db.session.commit()
+                if job.pending_invites:
+                    _send_checkpointed(job, meeting, chunk)
+        chunk = resolve_proxies(meeting)
+        if send and chunk["proxy_tokens"]:
+            job.pending_invites = _pending_invites(chunk)
+        db.session.commit()
+        if job.pending_invites:
+            _send_checkpointed(job, meeting, chunk)
+    except Exception as exc:
+        current_app.logger.exception("Member import %s failed", job_id)
+        db.session.rollback()
+        job.status = "failed"
+        job.error = f"{type(exc).__name__}: {exc}"
+        if job.pending_invites:
+            pending = json.loads(job.pending_invites)
+            unsent = len(pending["members"]) + len(pending["proxies"])
+            job.error = (
+                f"Up to {unsent} invite(s) from the last saved rows were not sent; "
+                f"use Resend Stage 1 Invite on the members page. {job.error}"
+            )
+            job.pending_invites = None
+        job.error = job.error[:1000]
+    else:
+        job.status = "completed"
+        try:
+            os.remove(job.upload_path)
+        except OSError:
+            pass
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    return job
+
+
+def resume_jobs() -> int:
+    """Run queued jobs and jobs abandoned by a stopped worker; return how many ran."""
+    job_ids = db.session.scalars(
+        db.select(ImportJob.id).where(_claimable(datetime.utcnow())).order_by(ImportJob.id)
+    ).all()
+    return sum(run_job(job_id) is not None for job_id in job_ids)
+
+
+def start_job(app, job_id: int, base_url: str | None = None) -> threading.Thread:
+    """Run an import job in a daemon thread of this process.
+
+    ``base_url`` is the site root of the upload request, used for the links
+    in invite emails.
+    """
+
+    def target() -> None:
+        ctx = app.test_request_context(base_url=base_url) if base_url else app.app_context()
+        with ctx:
+            try:
+                run_job(job_id)
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=target, name=f"member-import-{job_id}", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,140 @@
+import math
+from datetime import datetime, timedelta
+
+from ..extensions import db
+from ..models import Amendment, AmendmentObjection, Meeting, Member
+from .email import send_amendment_reinstated, send_board_notice
+
+# Confirmed objections that send an amendment to the board.
+BOARD_NOTICE_THRESHOLD = 10
+# Time the board has after the first deadline before the final one.
+FINAL_WINDOW = timedelta(days=5)
+
+
+def summaries(
+    *criteria,
+    now: datetime | None = None,
+    due: str | None = None,
+    confirmed_only: bool = False,
+) -> list:
+    """Return one row per amendment with objections, from a single grouped query.
+
+    Each row has ``amendment_id``, ``meeting_id``, ``confirmed`` (count),
+    ``first_due`` (earliest first deadline of rows without a final one),
+    ``final_due`` (earliest final deadline) and ``next_deadline`` (the
+    earliest confirmed deadline still ahead of ``now``). ``criteria`` filter
+    the amendments. ``due`` of ``"first"`` or ``"final"`` keeps amendments
+    whose deadline of that kind has passed; ``confirmed_only`` drops those
+    without confirmed objections.
+    """
+    now = now or datetime.utcnow()
+    deadline = db.func.coalesce(
+        AmendmentObjection.deadline_final, AmendmentObjection.deadline_first
+    )
+    first_due = db.func.min(
+        db.case(
+            (AmendmentObjection.deadline_final.is_(None), AmendmentObjection.deadline_first)
+        )
+    )
+    final_due = db.func.min(AmendmentObjection.deadline_final)
+    query = (
+        db.select(
+            AmendmentObjection.amendment_id,
+            Amendment.meeting_id,
+            db.func.count(AmendmentObjection.confirmed_at).label("confirmed"),
+            first_due.label("first_due"),
+            final_due.label("final_due"),
+            db.func.min(
+                db.case(
+                    (
+                        db.and_(AmendmentObjection.confirmed_at.isnot(None), deadline > now),
+                        deadline,
+                    )
+                )
+            ).label("next_deadline"),
+        )
+        .join(Amendment, Amendment.id == AmendmentObjection.amendment_id)
+        .where(*criteria)
+        .group_by(AmendmentObjection.amendment_id, Amendment.meeting_id)
+        .order_by(AmendmentObjection.amendment_id)
+    )
+    if due == "first":
+        query = query.having(first_due <= now)
+    elif due == "final":
+        query = query.having(final_due <= now)
+    if confirmed_only:
+        query = query.having(db.func.count(AmendmentObjection.confirmed_at) > 0)
+    return db.session.execute(query).all()
+
+
+def member_totals(meeting_ids) -> dict[int, int]:
+    """Return the number of members of each meeting in ``meeting_ids``."""
+    meeting_ids = list(set(meeting_ids))
+    if not meeting_ids:
+        return {}
+    rows = db.session.execute(
+        db.select(Member.meeting_id, db.func.count(Member.id))
+        .where(Member.meeting_id.in_(meeting_ids))
+        .group_by(Member.meeting_id)
+    )
+    return dict(rows.all())
+
+
+def reinstate_threshold(total_members: int) -> int:
+    return max(25, math.ceil(total_members * 0.05))
+
+
+def _load(rows) -> tuple[dict[int, Amendment], dict[int, Meeting]]:
+    amendments = {
+        a.id: a
+        for a in Amendment.query.filter(Amendment.id.in_([r.amendment_id for r in rows]))
+    }
+    meetings = {
+        m.id: m
+        for m in Meeting.query.filter(Meeting.id.in_({r.meeting_id for r in rows}))
+    }
+    return amendments, meetings
+
+
+def process_deadlines(meeting_id: int | None = None, now: datetime | None = None) -> dict:
+    """Act on objection deadlines that have passed, once per amendment.
+
+    When the first deadline passes with at least ``BOARD_NOTICE_THRESHOLD``
+    confirmed objections the board is notified and a final deadline set.
+    When the final deadline passes the amendment is reinstated if enough of
+    the meeting's members objected. Returns counts of ``notices`` and
+    ``reinstated`` amendments.
+    """
+    now = now or datetime.utcnow()
+    scope = [Amendment.meeting_id == meeting_id] if meeting_id is not None else []
+    counts = {"notices": 0, "reinstated": 0}
+
+    rows = [
+        r
+        for r in summaries(*scope, now=now, due="first")
+        if r.confirmed >= BOARD_NOTICE_THRESHOLD
+    ]
+    amendments, meetings = _load(rows)
+    for row in rows:
+        amendment = amendments[row.amendment_id]
+        send_board_notice(amendment, meetings[row.meeting_id])
+        AmendmentObjection.query.filter_by(amendment_id=row.amendment_id).update(
+            {"deadline_final": row.first_due + FINAL_WINDOW}, synchronize_session=False
+        )
+        db.session.commit()
+        counts["notices"] += 1
+
+    rows = summaries(*scope, now=now, due="final")
+    amendments, meetings = _load(rows)
+    totals = member_totals(meetings)
+    for row in rows:
+        amendment = amendments[row.amendment_id]
+        if row.confirmed >= reinstate_threshold(totals.get(row.meeting_id, 0)):
+            amendment.status = None
+            send_amendment_reinstated(amendment, meetings[row.meeting_id])
+            counts["reinstated"] += 1
+        AmendmentObjection.query.filter_by(amendment_id=row.amendment_id).update(
+            {"deadline_final": None}, synchronize_session=False
+        )
+        db.session.commit()
+    return counts
@@ -0,0 +1,288 @@
+import base64
+import json
+import smtplib
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_mail import Attachment, Message
+
+from ..extensions import db
+from ..models import EmailLog, EmailOutbox
+from . import mailer
+
+# A row left in ``sending`` for longer than this belongs to a dispatcher that
+# died mid-batch and may be claimed again.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+MAX_BACKOFF = timedelta(hours=6)
+
+_wakeup = threading.Event()
+_thread: threading.Thread | None = None
+
+
+def enabled() -> bool:
+    """Return True when emails are queued rather than sent inline."""
+    return current_app.config.get("EMAIL_DELIVERY", "sync") in ("outbox", "thread")
+
+
+def serialize(msg: Message) -> str:
+    """Return ``msg`` as JSON, with attachment data base64 encoded."""
+    attachments = []
+    for att in msg.attachments:
+        data = att.data.encode() if isinstance(att.data, str) else att.data
+        attachments.append(
+            {
+                "filename": att.filename,
+                "content_type": att.content_type,
+                "disposition": att.disposition,
+                "headers": att.headers,
+                "data": base64.b64encode(data).decode("ascii"),
+            }
+        )
+    return json.dumps(
+        {
+            "subject": msg.subject,
+            "sender": msg.sender,
+            "recipients": msg.recipients,
+            "cc": msg.cc,
+            "bcc": msg.bcc,
+            "reply_to": msg.reply_to,
+            "body": msg.body,
+            "html": msg.html,
+            "extra_headers": msg.extra_headers,
+            "msg_id": msg.msgId,
+            "attachments": attachments,
+        }
+    )
+
+
+def deserialize(data: str) -> Message:
+    """Rebuild the :class:`Message` stored by :func:`serialize`."""
+    fields = json.loads(data)
+    msg = Message(
+        subject=fields["subject"],
+        sender=fields["sender"],
+        recipients=fields["recipients"],
+        cc=fields["cc"],
+        bcc=fields["bcc"],
+        reply_to=fields["reply_to"],
+        body=fields["body"],
+        html=fields["html"],
+        extra_headers=fields["extra_headers"],
+        attachments=[
+            Attachment(
+                filename=att["filename"],
+                content_type=att["content_type"],
+                data=base64.b64decode(att["data"]),
+                disposition=att["disposition"],
+                headers=att["headers"],
+            )
+            for att in fields["attachments"]
+        ],
+    )
+    # keep the Message-ID stable so a retried delivery is recognisable
+    msg.msgId = fields["msg_id"]
+    return msg
+
+
+def enqueue(
+    msg: Message,
+    *,
+    member_id: int | None = None,
+    meeting_id: int | None = None,
+    kind: str | None = None,
+    is_test: bool = False,
+    commit: bool = True,
+) -> EmailOutbox:
+    """Queue ``msg`` for delivery.
+
+    The row is committed together with any pending changes in the session,
+    so the email only goes out if the work that triggered it is saved.
+    Pass ``commit=False`` to leave the commit, and :func:`notify`, to the
+    caller.
+    """
+    entry = EmailOutbox(
+        meeting_id=meeting_id,
+        member_id=member_id,
+        kind=kind,
+        is_test=is_test,
+        message_json=serialize(msg),
+    )
+    db.session.add(entry)
+    if commit:
+        db.session.commit()
+        notify()
+    return entry
+
+
+def notify() -> None:
+    """Wake the in-process dispatcher after new emails were committed."""
+    _wakeup.set()
+
+
+def _claimable(now: datetime):
+    return db.or_(
+        db.and_(
+            EmailOutbox.status == "pending",
+            EmailOutbox.next_attempt_at <= now,
+        ),
+        db.and_(
+            EmailOutbox.status == "sending",
+            EmailOutbox.claimed_at < now - CLAIM_TIMEOUT,
+        ),
+    )
+
+
+def claim(batch_size: int, now: datetime | None = None) -> list[EmailOutbox]:
+    """Mark up to ``batch_size`` due rows as ``sending`` and return them.
+
+    Candidates are picked first and then claimed with a compare-and-set
+    update, so when several dispatchers race for the same rows only the
+    one whose update lands delivers them. Every row it claimed carries its
+    ``claimed_at`` stamp, which is how they are told apart afterwards.
+    """
+    now = now or datetime.utcnow()
+    ids = [
+        row_id
+        for (row_id,) in db.session.query(EmailOutbox.id)
+        .filter(_claimable(now))
+        .order_by(EmailOutbox.id)
+        .limit(batch_size)
+        .all()
+    ]
+    if not ids:
+        db.session.commit()
+        return []
+    EmailOutbox.query.filter(EmailOutbox.id.in_(ids), _claimable(now)).update(
+        {EmailOutbox.status: "sending", EmailOutbox.claimed_at: now},
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return (
+        EmailOutbox.query.filter(
+            EmailOutbox.id.in_(ids),
+            EmailOutbox.status == "sending",
+            EmailOutbox.claimed_at == now,
+        )
+        .order_by(EmailOutbox.id)
+        .all()
+    )
+
+
+def _permanent(exc: Exception) -> bool:
+    """Return True if retrying ``exc`` cannot succeed."""
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code >= 500
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    return not isinstance(exc, OSError)
+
+
+def _record_failure(row: EmailOutbox, exc: Exception, now: datetime) -> str:
+    row.attempts += 1
+    row.last_error = f"{type(exc).__name__}: {exc}"[:1000]
+    row.claimed_at = None
+    max_attempts = current_app.config.get("EMAIL_MAX_ATTEMPTS", 8)
+    if _permanent(exc) or row.attempts >= max_attempts:
+        row.status = "dead"
+        current_app.logger.error(
+            "Email %s dead-lettered after %s attempt(s): %s",
+            row.id,
+            row.attempts,
+            row.last_error,
+        )
+        return "dead"
+    base = current_app.config.get("EMAIL_RETRY_BASE_SECONDS", 60)
+    delay = min(timedelta(seconds=base * 2 ** (row.attempts - 1)), MAX_BACKOFF)
+    row.status = "pending"
+    row.next_attempt_at = now + delay
+    return "retry"
+
+
+def dispatch(batch_size: int | None = None, now: datetime | None = None) -> dict[str, int]:
+    """Deliver one batch of due emails.
+
+    The batch shares one SMTP connection. Each delivered email gets its
+    ``EmailLog`` entry; failures are retried with exponential backoff until
+    ``EMAIL_MAX_ATTEMPTS`` is reached.
+    Returns counts of ``sent``, ``retry`` and ``dead`` rows.
+    """
+    batch_size = batch_size or current_app.config.get("EMAIL_OUTBOX_BATCH_SIZE", 50)
+    counts = {"sent": 0, "retry": 0, "dead": 0}
+    with mailer.bulk_send():
+        for row in claim(batch_size, now):
+            attempt_at = now or datetime.utcnow()
+            try:
+                mailer.send(deserialize(row.message_json))
+            except Exception as exc:
+                counts[_record_failure(row, exc, attempt_at)] += 1
+            else:
+                row.status = "sent"
+                row.sent_at = attempt_at
+                row.claimed_at = None
+                row.last_error = None
+                row.attempts += 1
+                if row.kind:
+                    db.session.add(
+                        EmailLog(
+                            meeting_id=row.meeting_id,
+                            member_id=row.member_id,
+                            type=row.kind,
+                            is_test=row.is_test,
+                            sent_at=attempt_at,
+                        )
+                    )
+                counts["sent"] += 1
+            db.session.commit()
+    return counts
+
+
+def requeue_dead() -> int:
+    """Return dead-lettered emails to the queue and return how many."""
+    count = EmailOutbox.query.filter_by(status="dead").update(
+        {
+            EmailOutbox.status: "pending",
+            EmailOutbox.attempts: 0,
+            EmailOutbox.next_attempt_at: datetime.utcnow(),
+        },
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return count
+
+
+def run(poll_seconds: float = 5.0, stop: threading.Event | None = None) -> None:
+    """Drain the outbox until ``stop`` is set.
+
+    Sleeps for ``poll_seconds`` whenever a batch comes back short, waking
+    early when :func:`enqueue` is called in the same process.
+    """
+    stop = stop or threading.Event()
+    batch_size = current_app.config.get("EMAIL_OUTBOX_BATCH_SIZE", 50)
+    while not stop.is_set():
+        try:
+            handled = sum(dispatch(batch_size).values())
+        except Exception:
+            current_app.logger.exception("Email outbox dispatch failed")
+            db.session.rollback()
+            handled = 0
+        finally:
+            db.session.remove()
+        if handled < batch_size:
+            _wakeup.wait(poll_seconds)
+            _wakeup.clear()
+
+
+def start_thread(app) -> threading.Thread:
+    """Run the dispatcher in a daemon thread of this process."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return _thread
+
+    def target() -> None:
+        with app.app_context():
+            run()
+
+    _thread = threading.Thread(target=target, name="email-outbox", daemon=True)
+    _thread.start()
+    return _thread
@@ -10,9 +10,9 @@ from ..models import (
     Member,
     Meeting,
     Runoff,
-    Vote,
     VoteToken,
 )
+from . import tally, timeline
 
 
 def close_stage1(meeting: Meeting) -> tuple[list[Runoff], list[tuple[Member, str]]]:
@@ -28,9 +28,11 @@ def close_stage1(meeting: Meeting) -> tuple[list[Runoff], list[tuple[Member, str
         {},
         parser=lambda v: json.loads(v) if isinstance(v, str) else v,
     )
+    tallies = tally.meeting_tallies(meeting.id)
     for amend in amendments:
-        for_count = Vote.query.filter_by(amendment_id=amend.id, choice='for').count()
-        against_count = Vote.query.filter_by(amendment_id=amend.id, choice='against').count()
+        counts = tally.counts_for(tallies, 'amendment', amend.id)
+        for_count = counts['for']
+        against_count = counts['against']
         if for_count > against_count:
             amend.status = 'carried'
             amend.tie_break_method = None
@@ -63,6 +65,7 @@ def close_stage1(meeting: Meeting) -> tuple[list[Runoff], list[tuple[Member, str
             loser.status = 'failed'
             loser.tie_break_method = 'order'
 
+    tally.freeze_results(meeting, 1)
     db.session.commit()
 
     runoffs = _detect_runoffs(meeting)
@@ -79,28 +82,17 @@ def close_stage1(meeting: Meeting) -> tuple[list[Runoff], list[tuple[Member, str
         meeting.opens_at_stage2 = new_opens
         meeting.closes_at_stage2 = new_closes
         db.session.commit()
+        timeline.plan_meeting(meeting)
         members = Member.query.filter_by(meeting_id=meeting.id).all()
-        for member in members:
-            _, plain = VoteToken.create(
-                member_id=member.id,
-                stage=1,
-                salt=current_app.config["TOKEN_SALT"],
-            )
-            tokens_to_send.append((member, None, plain))
-        for proxy in members:
-            if proxy.proxy_for:
-                try:
-                    target = db.session.get(Member, int(proxy.proxy_for))
-                except (ValueError, TypeError):
-                    target = None
-                if target:
-                    _, plain = VoteToken.create(
-                        member_id=target.id,
-                        stage=1,
-                        salt=current_app.config["TOKEN_SALT"],
-                        proxy_holder_id=proxy.id,
-                    )
-                    tokens_to_send.append((proxy, target, plain))
+        by_id = {m.id: m for m in members}
+        proxies = VoteToken.proxy_map(members)
+        pairs = VoteToken.create_bulk(
+            by_id, 1, current_app.config["TOKEN_SALT"], proxies, meeting_id=meeting.id
+        )
+        for member_id, plain in pairs[:len(members)]:
+            tokens_to_send.append((by_id[member_id], None, plain))
+        for proxy_id, plain in pairs[len(members):]:
+            tokens_to_send.append((by_id[proxy_id], by_id[proxies[proxy_id]], plain))
         db.session.commit()
     return runoffs, tokens_to_send
 
@@ -131,11 +123,12 @@ def _detect_runoffs(meeting: Meeting) -> list[Runoff]:
 def close_runoff_stage(meeting: Meeting) -> None:
     """Tally run-off votes and finalise amendment statuses."""
     runoffs = Runoff.query.filter_by(meeting_id=meeting.id).all()
+    tallies = tally.meeting_tallies(meeting.id)
     for rof in runoffs:
         a = db.session.get(Amendment, rof.amendment_a_id)
         b = db.session.get(Amendment, rof.amendment_b_id)
-        a_for = Vote.query.filter_by(amendment_id=a.id, choice="for").count()
-        b_for = Vote.query.filter_by(amendment_id=b.id, choice="for").count()
+        a_for = tally.counts_for(tallies, "amendment", a.id)["for"]
+        b_for = tally.counts_for(tallies, "amendment", b.id)["for"]
         if a_for > b_for:
             winner, loser = a, b
         elif b_for > a_for:
@@ -154,12 +147,7 @@ def close_runoff_stage(meeting: Meeting) -> None:
         winner.status = "carried"
         loser.status = "failed"
 
-    tokens = (
-        VoteToken.query.join(Member, VoteToken.member_id == Member.id)
-        .filter(Member.meeting_id == meeting.id, VoteToken.stage == 1)
-        .all()
-    )
-    for t in tokens:
-        db.session.delete(t)
-
+    # refresh the Stage 1 snapshot now run-off outcomes are final
+    tally.freeze_results(meeting, 1)
     db.session.commit()
+    VoteToken.delete_batched(Member.meeting_id == meeting.id, VoteToken.stage == 1)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Iterator
+
+from flask import current_app
+
+from ..extensions import db
+from .leader import AdvisoryLock, FileLock
+
+# Lock files are shared between keys by hash so the directory stays small;
+# an unlucky pair of keys only waits on each other.
+LOCK_STRIPES = 256
+
+_local_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+_local_guard = threading.Lock()
+
+
+def _digest(name: str) -> bytes:
+    return hashlib.sha256(name.encode()).digest()
+
+
+def _local_lock(name: str) -> threading.Lock:
+    with _local_guard:
+        lock = _local_locks.get(name)
+        if lock is None:
+            lock = threading.Lock()
+            _local_locks[name] = lock
+        return lock
+
+
+def _process_lock(name: str) -> AdvisoryLock | FileLock:
+    if db.engine.dialect.name == "postgresql":
+        key = int.from_bytes(_digest(name)[:8], "big", signed=True)
+        return AdvisoryLock(db.engine, key)
+    directory = current_app.config.get("SINGLE_FLIGHT_LOCK_DIR") or os.path.join(
+        current_app.instance_path, "locks"
+    )
+    stripe = int.from_bytes(_digest(name)[:2], "big") % LOCK_STRIPES
+    return FileLock(os.path.abspath(os.path.join(directory, f"{stripe:03d}.lock")))
+
+
+@contextmanager
+def hold(name: str, timeout: float | None = None, *, shared: bool = True) -> Iterator[bool]:
+    """Hold the lock for ``name`` across threads and processes.
+
+    Waits up to ``timeout`` seconds (``SINGLE_FLIGHT_TIMEOUT``, default 30)
+    and then carries on without it, so a stuck holder slows requests down
+    rather than failing them. Pass ``shared=False`` when the result is only
+    kept in this process, so other processes are not made to wait for a
+    value they cannot reuse. Yields whether the lock was taken.
+    """
+    if timeout is None:
+        timeout = current_app.config.get("SINGLE_FLIGHT_TIMEOUT", 30)
+    deadline = time.monotonic() + timeout
+    local = _local_lock(name)
+    if not local.acquire(timeout=max(timeout, 0)):
+        current_app.logger.warning("Timed out waiting for %s", name)
+        yield False
+        return
+    try:
+        if not shared:
+            yield True
+            return
+        lock = _process_lock(name)
+        if not lock.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            current_app.logger.warning("Timed out waiting for %s", name)
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            lock.release()
+    finally:
+        local.release()
+
@@ -0,0 +1,282 @@
+from ..extensions import db
+from ..models import Amendment, Meeting, Motion, ResultSnapshot, Runoff, Vote, VoteTally
+from . import cache
+
+TallyMatrix = dict[str, dict[int, dict[str, int]]]
+
+
+def empty_counts() -> dict[str, int]:
+    """Return zeroed counts for the standard ballot choices."""
+    return {"for": 0, "against": 0, "abstain": 0}
+
+
+def meeting_tallies(meeting_id: int, *, include_test: bool = False) -> TallyMatrix:
+    """Return vote counts for every amendment and motion in a meeting.
+
+    Counts are read from the ``vote_tallies`` counters, so the cost depends
+    on the number of ballot items rather than the number of votes. The
+    result maps ``"amendment"`` and ``"motion"`` to
+    ``{target_id: {choice: count}}``. Test votes are not counted; passing
+    ``include_test`` falls back to a grouped scan of ``votes``.
+    """
+    tallies: TallyMatrix = {"amendment": {}, "motion": {}}
+    if include_test:
+        rows = [
+            (kind, target_id, choice, count)
+            for (_, kind, target_id, _, choice), count in _scan_votes(
+                meeting_id, include_test=True
+            ).items()
+        ]
+    else:
+        rows = (
+            db.session.query(
+                VoteTally.target_type,
+                VoteTally.target_id,
+                VoteTally.choice,
+                db.func.sum(VoteTally.count),
+            )
+            .filter(VoteTally.meeting_id == meeting_id)
+            .group_by(VoteTally.target_type, VoteTally.target_id, VoteTally.choice)
+            .all()
+        )
+    for kind, target_id, choice, count in rows:
+        bucket = tallies[kind].setdefault(target_id, empty_counts())
+        bucket[choice] = bucket.get(choice, 0) + int(count or 0)
+    return tallies
+
+
+def _scan_votes(
+    meeting_id: int | None = None, *, include_test: bool = False
+) -> dict[tuple[int, str, int, int, str], int]:
+    """Count votes straight from ``votes`` keyed like ``vote_tallies``."""
+    meeting_col = db.func.coalesce(Amendment.meeting_id, Motion.meeting_id)
+    stage_col = db.func.coalesce(Vote.stage, 0)
+    query = (
+        db.session.query(
+            meeting_col,
+            Vote.amendment_id,
+            Vote.motion_id,
+            stage_col,
+            Vote.choice,
+            db.func.count(Vote.id),
+        )
+        .outerjoin(Amendment, Vote.amendment_id == Amendment.id)
+        .outerjoin(Motion, Vote.motion_id == Motion.id)
+        .filter(meeting_col.isnot(None))
+    )
+    if meeting_id is not None:
+        query = query.filter(
+            db.or_(
+                Amendment.meeting_id == meeting_id,
+                Motion.meeting_id == meeting_id,
+            )
+        )
+    if not include_test:
+        # legacy rows have a NULL flag; count them like VoteTally.apply does
+        query = query.filter(db.or_(Vote.is_test.is_(None), Vote.is_test.is_(False)))
+    rows = query.group_by(
+        meeting_col, Vote.amendment_id, Vote.motion_id, stage_col, Vote.choice
+    ).all()
+
+    counts: dict[tuple[int, str, int, int, str], int] = {}
+    for meeting, amendment_id, motion_id, stage, choice, count in rows:
+        if amendment_id is not None:
+            key = (meeting, "amendment", amendment_id, stage, choice)
+        else:
+            key = (meeting, "motion", motion_id, stage, choice)
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def rebuild_counters(
+    meeting_id: int | None = None,
+) -> list[tuple[tuple[int, str, int, int, str], int, int]]:
+    """Recompute ``vote_tallies`` from ``votes`` and commit the result.
+
+    Only the given meeting is rebuilt when ``meeting_id`` is set. Returns
+    ``(key, stored, actual)`` for every counter that had drifted, where
+    ``key`` is ``(meeting_id, target_type, target_id, stage, choice)``.
+    """
+    actual = _scan_votes(meeting_id)
+    stored_query = VoteTally.query
+    if meeting_id is not None:
+        stored_query = stored_query.filter_by(meeting_id=meeting_id)
+    stored = {
+        (t.meeting_id, t.target_type, t.target_id, t.stage, t.choice): t.count
+        for t in stored_query.all()
+    }
+
+    drift = [
+        (key, stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(set(stored) | set(actual))
+        if stored.get(key, 0) != actual.get(key, 0)
+    ]
+
+    stored_query.delete(synchronize_session=False)
+    rows = [
+        dict(zip(VoteTally.KEY_COLUMNS, key), count=count)
+        for key, count in actual.items()
+        if count
+    ]
+    if rows:
+        db.session.execute(db.insert(VoteTally), rows)
+    Meeting.bump_results_version({key[0] for key, _, _ in drift})
+    db.session.commit()
+    return drift
+
+
+def results_tallies(meeting) -> TallyMatrix:
+    """Return the tallies to display for ``meeting``.
+
+    Completed meetings are served from the frozen Stage 2 snapshot when one
+    exists, cached under the meeting's tag and results version with
+    concurrent misses sharing one computation. Otherwise the live counters
+    are read; they change with every ballot, so are not cached.
+    """
+    if meeting.status != "Completed":
+        return meeting_tallies(meeting.id)
+
+    def compute() -> TallyMatrix:
+        snapshot = final_snapshot(meeting)
+        if snapshot is not None:
+            return snapshot.tallies
+        return meeting_tallies(meeting.id)
+
+    return cache.cached(
+        f"results-tallies:{meeting.id}:{meeting.results_version or 0}",
+        compute,
+        tags=[cache.meeting_tag(meeting.id)],
+        coalesce=True,
+    )
+
+
+def freeze_results(meeting, stage: int) -> ResultSnapshot:
+    """Record the current tallies and outcomes for ``meeting`` at ``stage``.
+
+    Call this after statuses have been assigned and before committing so
+    the snapshot is written in the same transaction.
+    """
+    amendments = Amendment.query.filter_by(meeting_id=meeting.id).all()
+    motions = Motion.query.filter_by(meeting_id=meeting.id).all()
+    runoffs = Runoff.query.filter_by(meeting_id=meeting.id).all()
+    statuses = {
+        "amendment": {a.id: a.status for a in amendments},
+        "motion": {m.id: m.status for m in motions},
+    }
+    tie_breaks = {
+        "amendment": {a.id: a.tie_break_method for a in amendments if a.tie_break_method},
+        "runoff": {r.id: r.tie_break_method for r in runoffs if r.tie_break_method},
+    }
+    return ResultSnapshot.store(
+        meeting.id, stage, meeting_tallies(meeting.id), statuses, tie_breaks
+    )
+
+
+def counts_for(tallies: TallyMatrix, kind: str, target_id: int) -> dict[str, int]:
+    """Return a copy of the counts for one amendment or motion."""
+    return dict(tallies[kind].get(target_id) or empty_counts())
+
+
+class FrozenOutcome:
+    """An amendment or motion showing the outcome recorded in a snapshot.
+
+    Other attributes are read from the wrapped row; writes go to the row,
+    so the frozen outcome keeps being displayed until results are frozen
+    again.
+    """
+
+    def __init__(self, row, status: str | None, tie_break_method: str | None = None) -> None:
+        object.__setattr__(self, "_row", row)
+        object.__setattr__(self, "status", status)
+        object.__setattr__(self, "tie_break_method", tie_break_method)
+
+    def __getattr__(self, name: str):
+        return getattr(self._row, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._row, name, value)
+
+
+def final_snapshot(meeting) -> ResultSnapshot | None:
+    """Return the Stage 2 snapshot that completed ``meeting``, if any."""
+    if meeting.status != "Completed":
+        return None
+    return db.session.get(ResultSnapshot, (meeting.id, 2))
+
+
+def _frozen(rows: list, kind: str, snapshot: ResultSnapshot | None) -> list:
+    if snapshot is None:
+        return rows
+    statuses = snapshot.statuses.get(kind, {})
+    tie_breaks = snapshot.tie_breaks.get(kind, {})
+    return [
+        FrozenOutcome(row, statuses.get(row.id, row.status), tie_breaks.get(row.id))
+        if row.id in statuses
+        else row
+        for row in rows
+    ]
+
+
+def amendment_results(
+    meeting, tallies: TallyMatrix | None = None
+) -> list[tuple[Amendment, dict[str, int]]]:
+    """Return ``(amendment, counts)`` pairs in amendment order.
+
+    For completed meetings the status and tie-break method come from the
+    final snapshot rather than the live rows.
+    """
+    if tallies is None:
+        tallies = results_tallies(meeting)
+    amendments = (
+        Amendment.query.filter_by(meeting_id=meeting.id)
+        .order_by(Amendment.order)
+        .all()
+    )
+    amendments = _frozen(amendments, "amendment", final_snapshot(meeting))
+    return [(a, counts_for(tallies, "amendment", a.id)) for a in amendments]
+
+
+def motion_results(
+    meeting, tallies: TallyMatrix | None = None
+) -> list[tuple[Motion, dict[str, int]]]:
+    """Return ``(motion, counts)`` pairs in motion order.
+
+    For completed meetings the status comes from the final snapshot rather
+    than the live rows.
+    """
+    if tallies is None:
+        tallies = results_tallies(meeting)
+    motions = (
+        Motion.query.filter_by(meeting_id=meeting.id)
+        .order_by(Motion.ordering)
+        .all()
+    )
+    motions = _frozen(motions, "motion", final_snapshot(meeting))
+    return [(m, counts_for(tallies, "motion", m.id)) for m in motions]
+
+
+def tally_rows(
+    amend_results: list[tuple[Amendment, dict[str, int]]],
+    motion_results: list[tuple[Motion, dict[str, int]]] | None = None,
+) -> list[dict[str, int | str]]:
+    """Return JSON-ready rows for the public tallies endpoints."""
+    rows: list[dict[str, int | str]] = []
+    for amend, counts in amend_results:
+        rows.append(
+            {
+                "type": "amendment",
+                "id": amend.id,
+                "text": (amend.text_md or "")[:40],
+                **counts,
+            }
+        )
+    for motion, counts in motion_results or []:
+        rows.append(
+            {
+                "type": "motion",
+                "id": motion.id,
+                "text": motion.title,
+                **counts,
+            }
+        )
+    return rows
@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+
+from ..extensions import db, scheduler
+from ..models import Amendment, AmendmentObjection, Meeting
+from ..utils import config_or_setting
+
+# Job store holding the one-shot meeting events, shared by all processes.
+JOBSTORE = "timeline"
+EVENT_FUNC = "app.tasks:run_meeting_event"
+KINDS = ("submission_invites", "stage1_reminder", "stage2_reminder", "objection_check")
+
+
+def jobstores(app) -> dict:
+    """Return the scheduler job stores for ``app``.
+
+    Recurring jobs live in memory and are registered by every process;
+    meeting events are persisted in the database so they survive restarts
+    and can be planned by any worker.
+    """
+    url = app.config.get("SCHEDULER_JOBSTORE_URL") or app.config["SQLALCHEMY_DATABASE_URI"]
+    if url.endswith(":memory:"):
+        timeline = MemoryJobStore()
+    else:
+        timeline = SQLAlchemyJobStore(url=url)
+    return {"default": MemoryJobStore(), JOBSTORE: timeline}
+
+
+def job_id(meeting_id: int, kind: str) -> str:
+    return f"meeting-{meeting_id}-{kind}"
+
+
+def _reminder_due(
+    closes_at: datetime | None,
+    sent_at: datetime | None,
+    hours_key: str,
+    cooldown_key: str,
+    now: datetime,
+) -> datetime | None:
+    if not closes_at or closes_at <= now:
+        return None
+    due = closes_at - timedelta(hours=config_or_setting(hours_key, 6, parser=int))
+    if sent_at:
+        cooldown = timedelta(hours=config_or_setting(cooldown_key, 24, parser=int))
+        due = max(due, sent_at + cooldown)
+    return due if due < closes_at else None
+
+
+def _objection_due(meeting: Meeting, now: datetime) -> datetime | None:
+    in_meeting = AmendmentObjection.amendment_id.in_(
+        db.select(Amendment.id).where(Amendment.meeting_id == meeting.id)
+    )
+    first, final = db.session.execute(
+        db.select(
+            db.func.min(
+                db.case(
+                    (
+                        db.and_(
+                            AmendmentObjection.deadline_final.is_(None),
+                            AmendmentObjection.deadline_first > now,
+                        ),
+                        AmendmentObjection.deadline_first,
+                    )
+                )
+            ),
+            db.func.min(AmendmentObjection.deadline_final),
+        ).where(in_meeting)
+    ).one()
+    due = [d for d in (first, final) if d is not None]
+    return min(due) if due else None
+
+
+def due_events(meeting: Meeting, now: datetime | None = None) -> dict[str, datetime]:
+    """Return when each pending event of ``meeting`` is next due.
+
+    Events already overdue are due ``now``. Kinds with nothing left to do
+    are left out.
+    """
+    now = now or datetime.utcnow()
+    events = {
+        "submission_invites": (
+            meeting.motions_opens_at if not meeting.submission_invites_sent_at else None
+        ),
+        "stage1_reminder": _reminder_due(
+            meeting.closes_at_stage1,
+            meeting.stage1_reminder_sent_at,
+            "REMINDER_HOURS_BEFORE_CLOSE",
+            "REMINDER_COOLDOWN_HOURS",
+            now,
+        ),
+        "stage2_reminder": _reminder_due(
+            meeting.closes_at_stage2,
+            meeting.stage2_reminder_sent_at,
+            "STAGE2_REMINDER_HOURS_BEFORE_CLOSE",
+            "STAGE2_REMINDER_COOLDOWN_HOURS",
+            now,
+        ),
+        "objection_check": _objection_due(meeting, now),
+    }
+    return {kind: max(due, now) for kind, due in events.items() if due is not None}
+
+
+def plan_meeting(
+    meeting: Meeting,
+    now: datetime | None = None,
+    *,
+    done: tuple[str, ...] = (),
+    check_objections: bool = False,
+) -> dict[str, datetime]:
+    """Schedule one job per pending event of ``meeting`` and drop the rest.
+
+    ``done`` names event kinds that have just run; they are only planned
+    again if due in the future. ``check_objections`` runs the objection
+    check straight away, e.g. after a late confirmation. Jobs are written
+    only when this process's scheduler is started (paused or not); the
+    returned events are computed either way.
+    """
+    now = now or datetime.utcnow()
+    events = due_events(meeting, now)
+    for kind in done:
+        if kind in events and events[kind] <= now:
+            del events[kind]
+    if check_objections:
+        events["objection_check"] = now
+    if not scheduler.running:
+        return events
+    for kind in KINDS:
+        if kind not in events:
+            try:
+                scheduler.remove_job(job_id(meeting.id, kind), jobstore=JOBSTORE)
+            except JobLookupError:
+                pass
+            continue
+        scheduler.add_job(
+            job_id(meeting.id, kind),
+            EVENT_FUNC,
+            args=[meeting.id, kind],
+            trigger="date",
+            run_date=events[kind].replace(tzinfo=timezone.utc),
+            jobstore=JOBSTORE,
+            replace_existing=True,
+            misfire_grace_time=None,
+            coalesce=True,
+        )
+    return events
+
+
+def plan_all(now: datetime | None = None) -> int:
+    """Re-plan every meeting with events still ahead; return how many."""
+    now = now or datetime.utcnow()
+    with_objections = (
+        db.select(Amendment.meeting_id)
+        .join(AmendmentObjection, AmendmentObjection.amendment_id == Amendment.id)
+        .where(
+            db.or_(
+                AmendmentObjection.deadline_final.isnot(None),
+                AmendmentObjection.deadline_first > now,
+            )
+        )
+    )
+    meetings = Meeting.query.filter(
+        db.or_(
+            Meeting.closes_at_stage1 > now,
+            Meeting.closes_at_stage2 > now,
+            db.and_(
+                Meeting.motions_opens_at.isnot(None),
+                Meeting.submission_invites_sent_at.is_(None),
+            ),
+            Meeting.id.in_(with_objections),
+        )
+    ).all()
+    for meeting in meetings:
+        plan_meeting(meeting, now)
+    return len(meetings)
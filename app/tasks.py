@@ -1,5 +1,8 @@
-from datetime import datetime, timedelta
-from flask import current_app
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import current_app, has_request_context, request
 from .utils import config_or_setting
 
 from .extensions import scheduler, db
@@ -8,222 +11,334 @@ from .models import (
     Member,
     VoteToken,
     AppSetting,
-    AmendmentObjection,
-    Amendment,
 )
-import math
+from .services import objections, timeline
 from .services.email import (
     send_stage1_reminder,
     send_stage2_reminder,
-    send_board_notice,
-    send_amendment_reinstated,
     send_submission_invite,
     auto_send_enabled,
+    mail_context,
+    MailContext,
 )
 
 
+def _in_app_context(func):
+    """Run a job inside the app context of the scheduler's Flask app."""
+
+    @wraps(func)
+    def job():
+        with scheduler.app.app_context():
+            try:
+                return func()
+            finally:
+                db.session.remove()
+
+    return job
+
+
 def register_jobs():
-    scheduler.add_job('stage1_reminders', send_stage1_reminders, trigger='interval', hours=1)
-    scheduler.add_job('stage2_reminders', send_stage2_reminders, trigger='interval', hours=1)
-    scheduler.add_job('token_cleanup', cleanup_vote_tokens, trigger='cron', hour=0)
-    scheduler.add_job('objection_check', check_objection_deadlines, trigger='cron', hour='*')
-    scheduler.add_job('submission_invites', send_submission_invites, trigger='cron', hour='*')
+    scheduler.add_job('token_cleanup', _in_app_context(cleanup_vote_tokens), trigger='cron', hour=0)
+    # runs as soon as a process becomes leader, then nightly, so meeting events
+    # missed while no scheduler ran or affected by settings changes are re-planned
+    scheduler.add_job(
+        'timeline_replan',
+        _in_app_context(timeline.plan_all),
+        trigger='cron',
+        hour=0,
+        minute=30,
+        next_run_time=datetime.now(timezone.utc),
+        misfire_grace_time=None,
+        coalesce=True,
+    )
+
+
+def run_meeting_event(meeting_id: int, kind: str) -> None:
+    """Run one planned timeline event for a meeting, then plan its next events."""
+    with scheduler.app.app_context():
+        try:
+            meeting = db.session.get(Meeting, meeting_id)
+            if meeting is None:
+                return
+            now = datetime.utcnow()
+            if kind == 'objection_check':
+                check_objection_deadlines(meeting_id)
+            elif AppSetting.get("manual_email_mode") != "1":
+                if kind == 'stage1_reminder':
+                    _stage1_reminder(meeting, now)
+                elif kind == 'stage2_reminder':
+                    _stage2_reminder(meeting, now)
+                elif kind == 'submission_invites':
+                    _submission_invites(meeting, now)
+            timeline.plan_meeting(meeting, now, done=(kind,))
+        finally:
+            db.session.remove()
 
 
-def send_stage1_reminders():
-    """Check meetings nearing Stage 1 close and email reminders."""
-    if AppSetting.get("manual_email_mode") == "1":
+def _stage1_reminder(meeting: Meeting, now: datetime) -> None:
+    if meeting.stage1_votes_count() >= meeting.quorum:
         return
-    now = datetime.utcnow()
-    soon = now + timedelta(
-        hours=config_or_setting('REMINDER_HOURS_BEFORE_CLOSE', 6, parser=int)
+    last = getattr(meeting, 'stage1_reminder_sent_at', None)
+    cooldown = timedelta(
+        hours=config_or_setting('REMINDER_COOLDOWN_HOURS', 24, parser=int)
+    )
+    if last and now - last < cooldown:
+        return
+    if not auto_send_enabled(meeting, 'stage1_reminder'):
+        return
+    if remind_unvoted(meeting, 1, now)["sent"]:
+        meeting.stage1_reminder_sent_at = now
+        db.session.commit()
+
+
+def _stage2_reminder(meeting: Meeting, now: datetime) -> None:
+    last = getattr(meeting, 'stage2_reminder_sent_at', None)
+    cooldown = timedelta(
+        hours=config_or_setting('STAGE2_REMINDER_COOLDOWN_HOURS', 24, parser=int)
     )
-    meetings = Meeting.query.filter(
-        Meeting.closes_at_stage1.isnot(None),
-        Meeting.closes_at_stage1 <= soon,
-        Meeting.closes_at_stage1 >= now,
-    ).all()
-    for meeting in meetings:
-        if meeting.stage1_votes_count() >= meeting.quorum:
-            continue
-        last = getattr(meeting, 'stage1_reminder_sent_at', None)
-        cooldown = timedelta(
-            hours=config_or_setting('REMINDER_COOLDOWN_HOURS', 24, parser=int)
+    if last and now - last < cooldown:
+        return
+    if not auto_send_enabled(meeting, 'stage2_reminder'):
+        return
+    if remind_unvoted(meeting, 2, now)["sent"]:
+        meeting.stage2_reminder_sent_at = now
+        db.session.commit()
+
+
+def remind_unvoted(
+    meeting: Meeting,
+    stage: int,
+    now: datetime | None = None,
+    *,
+    chunk_size: int | None = None,
+    concurrency: int | None = None,
+) -> dict:
+    """Send a fresh voting link to every member yet to vote in ``stage``.
+
+    Members are handled in chunks of ``REMINDER_CHUNK_SIZE`` whose emails
+    are sent by a pool of ``REMINDER_CONCURRENCY`` threads; see
+    :func:`_send_reminders`. Members whose email failed keep their current
+    link and are tried once more after the last chunk. A run that stops
+    part way can be repeated; members reminded within the cooldown are
+    skipped. Returns ``sent``, ``failed`` and ``chunks`` counts with the
+    elapsed ``seconds`` and ``per_second`` throughput.
+    """
+    now = now or datetime.utcnow()
+    chunk_size = chunk_size or current_app.config.get('REMINDER_CHUNK_SIZE', 500)
+    concurrency = concurrency or current_app.config.get('REMINDER_CONCURRENCY', 4)
+    if stage == 1:
+        sent_at = Member.stage1_reminder_sent_at
+        cooldown_key = 'REMINDER_COOLDOWN_HOURS'
+    else:
+        sent_at = Member.stage2_reminder_sent_at
+        cooldown_key = 'STAGE2_REMINDER_COOLDOWN_HOURS'
+    cooldown = timedelta(hours=config_or_setting(cooldown_key, 24, parser=int))
+    meeting_id = meeting.id
+    pending = (
+        db.select(Member.id)
+        .join(
+            VoteToken,
+            db.and_(
+                VoteToken.member_id == Member.id,
+                VoteToken.stage == stage,
+                VoteToken.used_at.is_(None),
+            ),
         )
-        if last and now - last < cooldown:
-            continue
-        if not auto_send_enabled(meeting, 'stage1_reminder'):
-            continue
-        members = (
-            Member.query.join(
-                VoteToken,
-                db.and_(
-                    VoteToken.member_id == Member.id,
-                    VoteToken.stage == 1,
-                    VoteToken.used_at.is_(None),
-                ),
-            )
-            .filter(Member.meeting_id == meeting.id)
-            .distinct()
-            .all()
+        .where(
+            Member.meeting_id == meeting_id,
+            db.or_(sent_at.is_(None), sent_at <= now - cooldown),
         )
-        for member in members:
-            _, plain = VoteToken.create(
-                member_id=member.id,
-                stage=1,
-                salt=current_app.config["TOKEN_SALT"],
-            )
-            send_stage1_reminder(member, plain, meeting)
-        if members:
-            meeting.stage1_reminder_sent_at = now
-            db.session.commit()
+        .distinct()
+        .order_by(Member.id)
+        .limit(chunk_size)
+    )
+    app = current_app._get_current_object()
+    base_url = request.host_url if has_request_context() else None
+    stats = {"sent": 0, "failed": 0, "chunks": 0}
+    started = time.monotonic()
+    last_id = 0
+    failed: list[int] = []
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='reminders') as pool:
 
+        def send(member_ids: list[int]) -> list[int]:
+            slices = [member_ids[i::concurrency] for i in range(min(concurrency, len(member_ids)))]
+            reached = set()
+            for done in pool.map(
+                lambda part: _send_reminders(app, base_url, meeting_id, stage, part, now), slices
+            ):
+                reached.update(done)
+            stats["sent"] += len(reached)
+            return [member_id for member_id in member_ids if member_id not in reached]
 
-def send_stage2_reminders():
-    """Check meetings nearing Stage 2 close and email reminders."""
-    if AppSetting.get("manual_email_mode") == "1":
-        return
-    now = datetime.utcnow()
-    soon = now + timedelta(
-        hours=config_or_setting('STAGE2_REMINDER_HOURS_BEFORE_CLOSE', 6, parser=int)
+        while True:
+            member_ids = db.session.scalars(pending.where(Member.id > last_id)).all()
+            if not member_ids:
+                break
+            last_id = member_ids[-1]
+            failed.extend(send(member_ids))
+            stats["chunks"] += 1
+        if failed:
+            # a fresh connection often gets past a dropped or throttled one
+            failed = send(failed)
+    stats["failed"] = len(failed)
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    stats["per_second"] = round(stats["sent"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    current_app.logger.info(
+        "Stage %s reminders for meeting %s: sent %s, failed %s in %s chunk(s), %ss (%s/s)",
+        stage,
+        meeting_id,
+        stats["sent"],
+        stats["failed"],
+        stats["chunks"],
+        stats["seconds"],
+        stats["per_second"],
     )
-    meetings = Meeting.query.filter(
-        Meeting.closes_at_stage2.isnot(None),
-        Meeting.closes_at_stage2 <= soon,
-        Meeting.closes_at_stage2 >= now,
-    ).all()
-    for meeting in meetings:
-        last = getattr(meeting, 'stage2_reminder_sent_at', None)
-        cooldown = timedelta(
-            hours=config_or_setting('STAGE2_REMINDER_COOLDOWN_HOURS', 24, parser=int)
-        )
-        if last and now - last < cooldown:
-            continue
-        if not auto_send_enabled(meeting, 'stage2_reminder'):
-            continue
-        members = (
-            Member.query.join(
-                VoteToken,
-                db.and_(
-                    VoteToken.member_id == Member.id,
-                    VoteToken.stage == 2,
-                    VoteToken.used_at.is_(None),
-                ),
+    return stats
+
+
+def _send_reminders(
+    app, base_url: str | None, meeting_id: int, stage: int, member_ids: list[int], now: datetime
+) -> list[int]:
+    """Email reminder links from a worker thread; return the members reached.
+
+    Links are re-keyed in the worker's transaction and a member whose email
+    fails gets their previous link back, so only members who were sent (or
+    queued) a new one lose the old one. Links, queued emails and
+    ``stage<N>_reminder_sent_at`` stamps are committed together per
+    ``MailContext.FLUSH_EVERY`` members.
+    """
+    ctx = app.test_request_context(base_url=base_url) if base_url else app.app_context()
+    with ctx:
+        try:
+            reached = []
+            for start in range(0, len(member_ids), MailContext.FLUSH_EVERY):
+                batch = member_ids[start:start + MailContext.FLUSH_EVERY]
+                reached.extend(_send_reminder_batch(meeting_id, stage, batch, now))
+            return reached
+        finally:
+            db.session.remove()
+
+
+def _send_reminder_batch(
+    meeting_id: int, stage: int, member_ids: list[int], now: datetime
+) -> list[int]:
+    if stage == 1:
+        send, sent_at = send_stage1_reminder, Member.stage1_reminder_sent_at
+    else:
+        send, sent_at = send_stage2_reminder, Member.stage2_reminder_sent_at
+    in_batch = Member.id.in_(member_ids)
+    own_tokens = db.and_(VoteToken.stage == stage, VoteToken.proxy_holder_id.is_(None))
+    previous = dict(
+        db.session.execute(
+            db.select(VoteToken.member_id, VoteToken.token).where(
+                own_tokens, VoteToken.member_id.in_(member_ids)
             )
-            .filter(Member.meeting_id == meeting.id)
-            .distinct()
-            .all()
+        ).all()
+    )
+    reached = []
+    recipients = db.session.execute(db.select(Member.id, Member.email_opt_out).where(in_batch))
+    with mail_context(recipients):
+        # loaded after the context commits its unsubscribe tokens
+        meeting = db.session.get(Meeting, meeting_id)
+        members = {m.id: m for m in Member.query.filter(in_batch)}
+        pairs = VoteToken.create_bulk(
+            member_ids, stage, current_app.config["TOKEN_SALT"], meeting_id=meeting_id
         )
-        for member in members:
-            _, plain = VoteToken.create(
-                member_id=member.id,
-                stage=2,
-                salt=current_app.config["TOKEN_SALT"],
+        for member_id, plain in pairs:
+            try:
+                send(members[member_id], plain, meeting)
+            except Exception:
+                current_app.logger.exception(
+                    "Stage %s reminder to member %s failed", stage, member_id
+                )
+                own_token = db.and_(own_tokens, VoteToken.member_id == member_id)
+                if member_id in previous:
+                    db.session.execute(
+                        db.update(VoteToken).where(own_token).values(token=previous[member_id])
+                    )
+                else:
+                    db.session.execute(db.delete(VoteToken).where(own_token))
+            else:
+                reached.append(member_id)
+        if reached:
+            Member.query.filter(Member.id.in_(reached)).update(
+                {sent_at: now}, synchronize_session=False
             )
-            send_stage2_reminder(member, plain, meeting)
-        if members:
-            meeting.stage2_reminder_sent_at = now
-            db.session.commit()
+    db.session.commit()
+    return reached
 
 
-def cleanup_vote_tokens() -> None:
-    """Delete used or expired vote tokens."""
+def cleanup_vote_tokens() -> int:
+    """Delete used or expired vote tokens and return how many were removed.
+
+    Used tokens are kept while their stage is open, as they record who has
+    already voted.
+    """
     now = datetime.utcnow()
-    tokens = (
-        VoteToken.query.join(Member, VoteToken.member_id == Member.id)
-        .join(Meeting, Member.meeting_id == Meeting.id)
-        .filter(
-            db.or_(
+    # the isnot(None) checks keep these false rather than NULL for unset dates
+    stage1_open = db.or_(
+        db.and_(
+            Meeting.opens_at_stage1.isnot(None),
+            Meeting.opens_at_stage1 <= now,
+            db.or_(Meeting.closes_at_stage1.is_(None), Meeting.closes_at_stage1 >= now),
+        ),
+        db.and_(
+            Meeting.runoff_opens_at.isnot(None),
+            Meeting.runoff_closes_at.isnot(None),
+            Meeting.runoff_opens_at <= now,
+            Meeting.runoff_closes_at >= now,
+        ),
+    )
+    stage2_open = db.and_(
+        Meeting.opens_at_stage2.isnot(None),
+        Meeting.opens_at_stage2 <= now,
+        db.or_(Meeting.closes_at_stage2.is_(None), Meeting.closes_at_stage2 >= now),
+    )
+    removed = VoteToken.delete_batched(
+        db.or_(
+            db.and_(
                 VoteToken.used_at.isnot(None),
-                db.and_(
-                    VoteToken.stage == 1,
-                    db.or_(
-                        db.and_(
-                            Meeting.runoff_closes_at.isnot(None),
-                            Meeting.runoff_closes_at < now,
-                        ),
-                        db.and_(
-                            Meeting.runoff_closes_at.is_(None),
-                            Meeting.closes_at_stage1.isnot(None),
-                            Meeting.closes_at_stage1 < now,
-                        ),
+                ~db.and_(VoteToken.stage == 1, stage1_open),
+                ~db.and_(VoteToken.stage == 2, stage2_open),
+            ),
+            db.and_(
+                VoteToken.stage == 1,
+                db.or_(
+                    db.and_(
+                        Meeting.runoff_closes_at.isnot(None),
+                        Meeting.runoff_closes_at < now,
+                    ),
+                    db.and_(
+                        Meeting.runoff_closes_at.is_(None),
+                        Meeting.closes_at_stage1.isnot(None),
+                        Meeting.closes_at_stage1 < now,
                     ),
                 ),
-                db.and_(
-                    VoteToken.stage == 2,
-                    Meeting.closes_at_stage2.isnot(None),
-                    Meeting.closes_at_stage2 < now,
-                ),
-            )
+            ),
+            db.and_(
+                VoteToken.stage == 2,
+                Meeting.closes_at_stage2.isnot(None),
+                Meeting.closes_at_stage2 < now,
+            ),
         )
-        .all()
     )
-    for token in tokens:
-        db.session.delete(token)
-    db.session.commit()
+    current_app.logger.info("Removed %s vote token(s)", removed)
+    return removed
 
 
-def check_objection_deadlines() -> None:
-    now = datetime.utcnow()
-    objs_first = AmendmentObjection.query.filter(
-        AmendmentObjection.deadline_first.isnot(None),
-        AmendmentObjection.deadline_first <= now,
-        AmendmentObjection.deadline_final.is_(None),
-    ).all()
-    for obj in objs_first:
-        count = (
-            AmendmentObjection.query.filter_by(amendment_id=obj.amendment_id)
-            .filter(AmendmentObjection.confirmed_at.isnot(None))
-            .count()
-        )
-        if count >= 10:
-            amendment = db.session.get(Amendment, obj.amendment_id)
-            meeting = db.session.get(Meeting, amendment.meeting_id)
-            send_board_notice(amendment, meeting)
-            deadline = obj.deadline_first + timedelta(days=5)
-            AmendmentObjection.query.filter_by(amendment_id=obj.amendment_id).update(
-                {"deadline_final": deadline}, synchronize_session=False
-            )
-            db.session.commit()
-
-    objs_final = AmendmentObjection.query.filter(
-        AmendmentObjection.deadline_final.isnot(None),
-        AmendmentObjection.deadline_final <= now,
-    ).all()
-    for obj in objs_final:
-        amendment = db.session.get(Amendment, obj.amendment_id)
-        meeting = db.session.get(Meeting, amendment.meeting_id)
-        count = (
-            AmendmentObjection.query.filter_by(amendment_id=obj.amendment_id)
-            .filter(AmendmentObjection.confirmed_at.isnot(None))
-            .count()
-        )
-        total = Member.query.filter_by(meeting_id=meeting.id).count()
-        threshold = max(25, math.ceil(total * 0.05))
-        if count >= threshold:
-            amendment.status = None
-            send_amendment_reinstated(amendment, meeting)
-        AmendmentObjection.query.filter_by(amendment_id=obj.amendment_id).update(
-            {"deadline_final": None}, synchronize_session=False
-        )
-        db.session.commit()
+def check_objection_deadlines(meeting_id: int | None = None) -> dict:
+    """Process passed objection deadlines, for one meeting or all of them."""
+    return objections.process_deadlines(meeting_id)
 
 
-def send_submission_invites() -> None:
-    """Send motion submission invites when the window opens."""
-    if AppSetting.get("manual_email_mode") == "1":
+def _submission_invites(meeting: Meeting, now: datetime) -> None:
+    if meeting.submission_invites_sent_at or not auto_send_enabled(
+        meeting, "submission_invite"
+    ):
         return
-    now = datetime.utcnow()
-    meetings = Meeting.query.filter(
-        Meeting.motions_opens_at.isnot(None),
-        Meeting.motions_opens_at <= now,
-        Meeting.submission_invites_sent_at.is_(None),
-    ).all()
-    for meeting in meetings:
-        if not auto_send_enabled(meeting, "submission_invite"):
-            continue
-        members = Member.query.filter_by(meeting_id=meeting.id).all()
+    members = Member.query.filter_by(meeting_id=meeting.id).all()
+    with mail_context(members):
         for member in members:
             send_submission_invite(member, meeting)
-        meeting.submission_invites_sent_at = now
-        db.session.commit()
+    meeting.submission_invites_sent_at = now
+    db.session.commit()
@@ -16,10 +16,11 @@ ALLOWED_TAGS = (
         'br',
     }
 )
-from flask import current_app
-from .models import AppSetting, Amendment
+from flask import Response, after_this_request, current_app, request
+from .models import AppSetting, Amendment, Meeting
 import hashlib
 import json
+import time
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 from uuid import uuid4
@@ -67,6 +68,32 @@ def config_or_setting(
     return value
 
 
+def navigation_status() -> tuple[str | None, float | None]:
+    """Return the stage label and quorum percentage of the latest meeting.
+
+    The values are shared by every render in the process for
+    ``NAV_STATUS_CACHE_SECONDS`` so busy pages do not query the meeting and
+    its turnout each time.
+    """
+    now = time.monotonic()
+    cached = current_app.extensions.get("nav_status")
+    if cached and cached[0] > now:
+        return cached[1]
+    meeting = Meeting.query.order_by(Meeting.notice_date.desc()).first()
+    if meeting:
+        status = (meeting.status or "Draft", meeting.quorum_percentage())
+    else:
+        status = (None, None)
+    ttl = current_app.config.get("NAV_STATUS_CACHE_SECONDS", 30)
+    current_app.extensions["nav_status"] = (now + ttl, status)
+    return status
+
+
+def reset_navigation_status() -> None:
+    """Drop the cached navigation status so the next render reloads it."""
+    current_app.extensions.pop("nav_status", None)
+
+
 def markdown_to_html(text: str) -> Markup:
     """Convert Markdown text to safe HTML.
 
@@ -98,6 +125,60 @@ def format_dt(dt: datetime, tz_name: str | None = None) -> str:
     return dt.astimezone(tz).strftime("%Y-%m-%d %H:%M %Z")
 
 
+def results_not_modified(
+    meeting,
+    variant: str,
+    *,
+    private: bool = False,
+    weak: bool = False,
+    revalidate: bool = False,
+) -> Response | None:
+    """Handle conditional GETs for a representation of a meeting's results.
+
+    Validators are derived from ``meeting.results_revision()``. Returns a
+    ``304 Not Modified`` response when the client's copy is current;
+    otherwise schedules ``ETag``, ``Last-Modified`` and ``Cache-Control``
+    headers for the view's response and returns ``None``. ``revalidate``
+    marks representations that must always be checked with the ``ETag``,
+    such as HTML pages carrying a CSP nonce or flashed messages.
+    """
+    completed = meeting.status == "Completed"
+    etag = f"{variant}-{meeting.id}-{meeting.results_revision()}"
+    # votes do not move results_updated_at, so only completed results can
+    # be validated by date
+    last_modified = meeting.results_updated_at if completed else None
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+    max_age = current_app.config.get("RESULTS_CACHE_MAX_AGE", 300)
+    cacheable = completed and max_age and not revalidate
+
+    def add_headers(response: Response) -> Response:
+        if response.status_code not in (200, 304):
+            return response
+        response.set_etag(etag, weak=weak)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        if private:
+            response.cache_control.private = True
+        else:
+            response.cache_control.public = True
+        if cacheable:
+            response.cache_control.max_age = max_age
+        else:
+            response.cache_control.no_cache = True
+        return response
+
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified is not None:
+        matched = last_modified <= request.if_modified_since
+    else:
+        matched = False
+    if matched:
+        return add_headers(Response(status=304))
+    after_this_request(add_headers)
+    return None
+
 
 def generate_stage_ics(meeting, stage: int) -> bytes:
     """Return ICS file bytes for the given meeting stage."""
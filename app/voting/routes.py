@@ -5,7 +5,6 @@ from flask_login import current_user
 from ..extensions import db
 from ..models import (
     VoteToken,
-    Member,
     Amendment,
     Meeting,
     Vote,
@@ -118,21 +117,11 @@ def ballot_token(token: str):
         from ..meetings.routes import preview_voting
         return preview_voting(meeting.id, stage)
 
-    vote_token = VoteToken.verify(token, current_app.config["TOKEN_SALT"])
-    if not vote_token:
+    loaded = VoteToken.load(token, current_app.config["TOKEN_SALT"])
+    if loaded is None:
         return render_template("voting/token_error.html", message="Invalid voting link."), 404
-    member = db.session.get(Member, vote_token.member_id)
-    if member is None:
-        abort(404)
-    acting_member = (
-        db.session.get(Member, vote_token.proxy_holder_id)
-        if vote_token.proxy_holder_id
-        else member
-    )
-    meeting = db.session.get(Meeting, member.meeting_id)
-    if meeting is None:
-        abort(404)
-
+    vote_token, member, proxy_holder, meeting, used_any = loaded
+    acting_member = proxy_holder or member
     proxy_for = member if vote_token.proxy_holder_id else None
 
     # verify current time falls within the configured window
@@ -173,11 +162,6 @@ def ballot_token(token: str):
             400,
         )
 
-    used_any = (
-        VoteToken.query.filter_by(member_id=member.id, stage=vote_token.stage)
-        .filter(VoteToken.used_at.isnot(None))
-        .first()
-    )
     if used_any and not meeting.revoting_allowed:
         return (
             render_template(
@@ -205,36 +189,21 @@ def ballot_token(token: str):
         )
         form = _combined_form(motions, amendments)
         if form.validate_on_submit():
-            hashes = []
-            if revote:
-                for amend in amendments:
-                    Vote.query.filter_by(member_id=member.id, amendment_id=amend.id).delete()
-                for motion in motions:
-                    Vote.query.filter_by(member_id=member.id, motion_id=motion.id).delete()
-                db.session.commit()
-            for amend in amendments:
-                choice = form[f"amend_{amend.id}"].data
-                vote = Vote.record(
-                    member_id=member.id,
-                    amendment_id=amend.id,
-                    choice=choice,
-                    salt=current_app.config["VOTE_SALT"],
-                    stage=vote_token.stage,
-                )
-                hashes.append(vote.hash)
-            for motion in motions:
-                choice = form[f"motion_{motion.id}"].data
-                vote = Vote.record(
-                    member_id=member.id,
-                    motion_id=motion.id,
-                    choice=choice,
-                    salt=current_app.config["VOTE_SALT"],
-                    stage=vote_token.stage,
-                )
-                hashes.append(vote.hash)
-            now = datetime.utcnow()
-            VoteToken.query.filter_by(member_id=member.id, stage=vote_token.stage).update({"used_at": now})
-            db.session.commit()
+            choices = [
+                ("amendment", amend.id, form[f"amend_{amend.id}"].data)
+                for amend in amendments
+            ]
+            choices += [
+                ("motion", motion.id, form[f"motion_{motion.id}"].data)
+                for motion in motions
+            ]
+            hashes = Vote.record_ballot(
+                member.id,
+                vote_token.stage,
+                choices,
+                current_app.config["VOTE_SALT"],
+                replace=revote,
+            )
             send_vote_receipt(acting_member, meeting, hashes)
             return render_template(
                 "voting/confirmation.html",
@@ -285,24 +254,17 @@ def ballot_token(token: str):
         )
         form = _amendment_form(amendments)
         if form.validate_on_submit():
-            hashes = []
-            if revote:
-                for amend in amendments:
-                    Vote.query.filter_by(member_id=member.id, amendment_id=amend.id).delete()
-                db.session.commit()
-            for amend in amendments:
-                choice = form[f"amend_{amend.id}"].data
-                vote = Vote.record(
-                    member_id=member.id,
-                    amendment_id=amend.id,
-                    choice=choice,
-                    salt=current_app.config["VOTE_SALT"],
-                    stage=vote_token.stage,
-                )
-                hashes.append(vote.hash)
-            now = datetime.utcnow()
-            VoteToken.query.filter_by(member_id=member.id, stage=vote_token.stage).update({"used_at": now})
-            db.session.commit()
+            choices = [
+                ("amendment", amend.id, form[f"amend_{amend.id}"].data)
+                for amend in amendments
+            ]
+            hashes = Vote.record_ballot(
+                member.id,
+                vote_token.stage,
+                choices,
+                current_app.config["VOTE_SALT"],
+                replace=revote,
+            )
             send_vote_receipt(acting_member, meeting, hashes)
             return render_template(
                 "voting/confirmation.html",
@@ -345,24 +307,17 @@ def ballot_token(token: str):
         )
         form = _motion_form(motions)
         if form.validate_on_submit():
-            hashes = []
-            if revote:
-                for motion in motions:
-                    Vote.query.filter_by(member_id=member.id, motion_id=motion.id).delete()
-                db.session.commit()
-            for motion in motions:
-                choice = form[f"motion_{motion.id}"].data
-                vote = Vote.record(
-                    member_id=member.id,
-                    motion_id=motion.id,
-                    choice=choice,
-                    salt=current_app.config["VOTE_SALT"],
-                    stage=vote_token.stage,
-                )
-                hashes.append(vote.hash)
-            now = datetime.utcnow()
-            VoteToken.query.filter_by(member_id=member.id, stage=vote_token.stage).update({"used_at": now})
-            db.session.commit()
+            choices = [
+                ("motion", motion.id, form[f"motion_{motion.id}"].data)
+                for motion in motions
+            ]
+            hashes = Vote.record_ballot(
+                member.id,
+                vote_token.stage,
+                choices,
+                current_app.config["VOTE_SALT"],
+                replace=revote,
+            )
             send_vote_receipt(acting_member, meeting, hashes)
             return render_template(
                 "voting/confirmation.html",
@@ -448,28 +403,12 @@ def runoff_ballot(token: str):
             snippet=amendment_snippet,
         )
 
-    vote_token = VoteToken.verify(token, current_app.config["TOKEN_SALT"])
-    if not vote_token or vote_token.stage != 1:
+    loaded = VoteToken.load(token, current_app.config["TOKEN_SALT"])
+    if loaded is None or loaded[0].stage != 1:
         return render_template("voting/token_error.html", message="Invalid voting link."), 404
-    member = db.session.get(Member, vote_token.member_id)
-    if member is None:
-        abort(404)
-    meeting = db.session.get(Meeting, member.meeting_id)
-    if meeting is None:
-        abort(404)
-
-    acting_member = (
-        db.session.get(Member, vote_token.proxy_holder_id)
-        if vote_token.proxy_holder_id
-        else member
-    )
+    vote_token, member, proxy_holder, meeting, used_any = loaded
+    acting_member = proxy_holder or member
     proxy_for = member if vote_token.proxy_holder_id else None
-
-    used_any = (
-        VoteToken.query.filter_by(member_id=member.id, stage=vote_token.stage)
-        .filter(VoteToken.used_at.isnot(None))
-        .first()
-    )
     if used_any and not meeting.revoting_allowed:
         return (
             render_template(
@@ -512,26 +451,23 @@ def runoff_ballot(token: str):
     form = type("RunoffForm", (FlaskForm,), fields)()
 
     if form.validate_on_submit():
-        hashes = []
+        choices = []
         for r in runoffs:
             choice = form[f"runoff_{r.id}"].data
-            a_id = r.amendment_a_id
-            b_id = r.amendment_b_id
             if choice == "a":
-                v1 = Vote.record(member_id=member.id, amendment_id=a_id, choice="for", salt=current_app.config["VOTE_SALT"], stage=vote_token.stage)
-                v2 = Vote.record(member_id=member.id, amendment_id=b_id, choice="against", salt=current_app.config["VOTE_SALT"], stage=vote_token.stage)
-                hashes.extend([v1.hash, v2.hash])
+                a_choice, b_choice = "for", "against"
             elif choice == "b":
-                v1 = Vote.record(member_id=member.id, amendment_id=a_id, choice="against", salt=current_app.config["VOTE_SALT"], stage=vote_token.stage)
-                v2 = Vote.record(member_id=member.id, amendment_id=b_id, choice="for", salt=current_app.config["VOTE_SALT"], stage=vote_token.stage)
-                hashes.extend([v1.hash, v2.hash])
+                a_choice, b_choice = "against", "for"
             else:
-                v1 = Vote.record(member_id=member.id, amendment_id=a_id, choice="abstain", salt=current_app.config["VOTE_SALT"], stage=vote_token.stage)
-                v2 = Vote.record(member_id=member.id, amendment_id=b_id, choice="abstain", salt=current_app.config["VOTE_SALT"], stage=vote_token.stage)
-                hashes.extend([v1.hash, v2.hash])
-        now = datetime.utcnow()
-        VoteToken.query.filter_by(member_id=member.id, stage=vote_token.stage).update({"used_at": now})
-        db.session.commit()
+                a_choice, b_choice = "abstain", "abstain"
+            choices.append(("amendment", r.amendment_a_id, a_choice))
+            choices.append(("amendment", r.amendment_b_id, b_choice))
+        hashes = Vote.record_ballot(
+            member.id,
+            vote_token.stage,
+            choices,
+            current_app.config["VOTE_SALT"],
+        )
         send_vote_receipt(acting_member, meeting, hashes)
         return render_template(
             "voting/confirmation.html",
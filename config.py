@@ -14,9 +14,12 @@ class Config:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "true").lower() in ["1", "true"]
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
+    MAIL_MAX_EMAILS = int(os.getenv("MAIL_MAX_EMAILS", "100"))  # Messages per SMTP connection during bulk sends
     VOTE_SALT = os.getenv("VOTE_SALT", "static-salt")
     TOKEN_SALT = os.getenv("TOKEN_SALT", "token-salt")
     API_TOKEN_SALT = os.getenv("API_TOKEN_SALT", "api-token-salt")
+    SIGNED_VOTE_TOKENS = os.getenv("SIGNED_VOTE_TOKENS", "false").lower() in ["1", "true"]  # Issue HMAC-signed voting links
+    VOTE_TOKEN_MAX_AGE_DAYS = int(os.getenv("VOTE_TOKEN_MAX_AGE_DAYS", "90"))  # Lifetime of signed voting links
     PASSWORD_RESET_EXPIRY_HOURS = int(os.getenv("PASSWORD_RESET_EXPIRY_HOURS", "24"))
     UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "instance/files")
     RUNOFF_EXTENSION_MINUTES = int(os.getenv("RUNOFF_EXTENSION_MINUTES", "2880"))
@@ -33,6 +36,8 @@ class Config:
     STAGE2_REMINDER_HOURS_BEFORE_CLOSE = int(os.getenv("STAGE2_REMINDER_HOURS_BEFORE_CLOSE", "6"))
     STAGE2_REMINDER_COOLDOWN_HOURS = int(os.getenv("STAGE2_REMINDER_COOLDOWN_HOURS", "24"))
     STAGE2_REMINDER_TEMPLATE = os.getenv("STAGE2_REMINDER_TEMPLATE", "email/stage2_reminder")
+    REMINDER_CHUNK_SIZE = int(os.getenv("REMINDER_CHUNK_SIZE", "500"))  # Members re-keyed and stamped per reminder checkpoint
+    REMINDER_CONCURRENCY = int(os.getenv("REMINDER_CONCURRENCY", "4"))  # Threads sending each chunk of reminders
     TIE_BREAK_DECISIONS = os.getenv("TIE_BREAK_DECISIONS", "{}")
     CLERICAL_TEXT = os.getenv(
         "CLERICAL_TEXT",
@@ -53,6 +58,24 @@ class Config:
     RATELIMIT_STORAGE_URL = os.getenv("RATELIMIT_STORAGE_URL", "memory://")
     COMMENTS_PER_PAGE = int(os.getenv("COMMENTS_PER_PAGE", "10"))
     COMMENT_EDIT_MINUTES = int(os.getenv("COMMENT_EDIT_MINUTES", "15"))
+    CACHE_URL = os.getenv("CACHE_URL", "memory://")  # memory:// (per process) or redis://host:port/db
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv("CACHE_DEFAULT_TIMEOUT", "300"))  # Seconds an application cache entry lives
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))  # Size of the in-process LRU cache
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "votebuddy:")  # Namespace for keys on a shared cache server
+    SINGLE_FLIGHT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_TIMEOUT", "30"))  # Longest a request waits for another to compute the same result
+    SINGLE_FLIGHT_LOCK_DIR = os.getenv("SINGLE_FLIGHT_LOCK_DIR")  # Lock files used without PostgreSQL; defaults to instance/locks
+    DOCUMENT_CACHE_MAX_MB = int(os.getenv("DOCUMENT_CACHE_MAX_MB", "200"))  # Size cap for rendered results documents
+    APP_SETTINGS_CACHE_SECONDS = float(os.getenv("APP_SETTINGS_CACHE_SECONDS", "5"))  # Longest a long-running worker reuses settings without checking their version
+    NAV_STATUS_CACHE_SECONDS = float(os.getenv("NAV_STATUS_CACHE_SECONDS", "30"))  # Seconds pages reuse the latest meeting's stage and quorum
+    RESULTS_CACHE_MAX_AGE = int(os.getenv("RESULTS_CACHE_MAX_AGE", "300"))  # Seconds shared caches may reuse completed results
+    EMAIL_DELIVERY = os.getenv("EMAIL_DELIVERY", "sync")  # sync, outbox (separate worker) or thread (in-process worker)
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "8"))  # Delivery attempts before an email is dead-lettered
+    EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", "60"))  # First retry delay, doubled on each failure
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))  # Emails claimed per dispatcher pass
+    SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "embedded")  # embedded (elect a leader among web workers) or off (use flask run-scheduler)
+    SCHEDULER_LOCK_FILE = os.getenv("SCHEDULER_LOCK_FILE")  # Leader lock file when not on PostgreSQL; defaults to instance/scheduler.lock
+    SCHEDULER_JOBSTORE_URL = os.getenv("SCHEDULER_JOBSTORE_URL")  # Database for planned meeting events; defaults to DATABASE_URL
+    SCHEDULER_LEADER_POLL_SECONDS = float(os.getenv("SCHEDULER_LEADER_POLL_SECONDS", "15"))  # Seconds between leader lock checks
     EMAIL_WHY_TEXT = os.getenv(
         "EMAIL_WHY_TEXT",
         "You are a member of our organisation and have therefore been invited to participate in voting in AGMs/EGMs. If you do not want to participate in the process then please ignore this and subsequent emails",
@@ -0,0 +1,62 @@
+"""add vote tally counters and vote stage
+
+Revision ID: m1n2o3p4q5r6
+Revises: 12383e6c4404
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'm1n2o3p4q5r6'
+down_revision = '12383e6c4404'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('votes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('stage', sa.Integer(), nullable=True))
+    op.create_table(
+        'vote_tallies',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('meeting_id', sa.Integer(), sa.ForeignKey('meetings.id')),
+        sa.Column('target_type', sa.String(length=10), nullable=False),
+        sa.Column('target_id', sa.Integer(), nullable=False),
+        sa.Column('stage', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('choice', sa.String(length=10), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.UniqueConstraint(
+            'meeting_id', 'target_type', 'target_id', 'stage', 'choice',
+            name='uq_vote_tallies_key',
+        ),
+    )
+    op.create_index('ix_vote_tallies_meeting_id', 'vote_tallies', ['meeting_id'])
+    # Existing votes have no recorded stage so they are counted under stage 0.
+    op.execute(
+        """
+        INSERT INTO vote_tallies (meeting_id, target_type, target_id, stage, choice, count)
+        SELECT COALESCE(a.meeting_id, m.meeting_id),
+               CASE WHEN v.amendment_id IS NOT NULL THEN 'amendment' ELSE 'motion' END,
+               COALESCE(v.amendment_id, v.motion_id),
+               0,
+               v.choice,
+               COUNT(*)
+        FROM votes v
+        LEFT JOIN amendments a ON a.id = v.amendment_id
+        LEFT JOIN motions m ON m.id = v.motion_id
+        WHERE (v.is_test IS NULL OR v.is_test = false)
+          AND v.choice IS NOT NULL
+          AND COALESCE(a.meeting_id, m.meeting_id) IS NOT NULL
+        GROUP BY COALESCE(a.meeting_id, m.meeting_id),
+                 CASE WHEN v.amendment_id IS NOT NULL THEN 'amendment' ELSE 'motion' END,
+                 COALESCE(v.amendment_id, v.motion_id),
+                 v.choice
+        """
+    )
+
+
+def downgrade():
+    op.drop_index('ix_vote_tallies_meeting_id', table_name='vote_tallies')
+    op.drop_table('vote_tallies')
+    with op.batch_alter_table('votes', schema=None) as batch_op:
+        batch_op.drop_column('stage')
@@ -0,0 +1,30 @@
+"""add result snapshots
+
+Revision ID: n2o3p4q5r6s7
+Revises: m1n2o3p4q5r6
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'n2o3p4q5r6s7'
+down_revision = 'm1n2o3p4q5r6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'result_snapshots',
+        sa.Column('meeting_id', sa.Integer(), sa.ForeignKey('meetings.id'), primary_key=True),
+        sa.Column('stage', sa.Integer(), primary_key=True),
+        sa.Column('tallies_json', sa.Text(), nullable=False),
+        sa.Column('statuses_json', sa.Text(), nullable=False),
+        sa.Column('tie_breaks_json', sa.Text(), nullable=False),
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('result_snapshots')
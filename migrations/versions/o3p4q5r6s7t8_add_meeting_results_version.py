@@ -0,0 +1,25 @@
+"""add results version to meetings
+
+Revision ID: o3p4q5r6s7t8
+Revises: n2o3p4q5r6s7
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'o3p4q5r6s7t8'
+down_revision = 'n2o3p4q5r6s7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meetings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('results_version', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('results_updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('meetings', schema=None) as batch_op:
+        batch_op.drop_column('results_updated_at')
+        batch_op.drop_column('results_version')
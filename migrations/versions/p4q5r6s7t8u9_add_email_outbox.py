@@ -0,0 +1,46 @@
+"""add email outbox
+
+Revision ID: p4q5r6s7t8u9
+Revises: o3p4q5r6s7t8
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'p4q5r6s7t8u9'
+down_revision = 'o3p4q5r6s7t8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('meeting_id', sa.Integer(), sa.ForeignKey('meetings.id')),
+        sa.Column('member_id', sa.Integer(), sa.ForeignKey('members.id')),
+        sa.Column('kind', sa.String(length=50)),
+        sa.Column('is_test', sa.Boolean(), server_default=sa.false()),
+        sa.Column('message_json', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime()),
+        sa.Column('claimed_at', sa.DateTime()),
+        sa.Column('last_error', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('sent_at', sa.DateTime()),
+    )
+    op.create_index('ix_email_outbox_meeting_id', 'email_outbox', ['meeting_id'])
+    op.create_index('ix_email_outbox_member_id', 'email_outbox', ['member_id'])
+    op.create_index(
+        'ix_email_outbox_status_next_attempt_at',
+        'email_outbox',
+        ['status', 'next_attempt_at'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_email_outbox_status_next_attempt_at', table_name='email_outbox')
+    op.drop_index('ix_email_outbox_member_id', table_name='email_outbox')
+    op.drop_index('ix_email_outbox_meeting_id', table_name='email_outbox')
+    op.drop_table('email_outbox')
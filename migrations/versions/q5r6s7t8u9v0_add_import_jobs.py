@@ -0,0 +1,43 @@
+"""add import jobs
+
+Revision ID: q5r6s7t8u9v0
+Revises: p4q5r6s7t8u9
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'q5r6s7t8u9v0'
+down_revision = 'p4q5r6s7t8u9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('meeting_id', sa.Integer(), sa.ForeignKey('meetings.id')),
+        sa.Column('created_by_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('filename', sa.String(length=255)),
+        sa.Column('upload_path', sa.String(length=500), nullable=False),
+        sa.Column('report_id', sa.String(length=32), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False, server_default='queued'),
+        sa.Column('total_rows', sa.Integer()),
+        sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_line', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('error', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('heartbeat_at', sa.DateTime()),
+        sa.Column('finished_at', sa.DateTime()),
+    )
+    op.create_index('ix_import_jobs_meeting_id', 'import_jobs', ['meeting_id'])
+    op.create_index('ix_import_jobs_status', 'import_jobs', ['status'])
+
+
+def downgrade():
+    op.drop_index('ix_import_jobs_status', table_name='import_jobs')
+    op.drop_index('ix_import_jobs_meeting_id', table_name='import_jobs')
+    op.drop_table('import_jobs')
@@ -0,0 +1,58 @@
+"""one vote token per member, stage and proxy holder
+
+Revision ID: r6s7t8u9v0w1
+Revises: q5r6s7t8u9v0
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'r6s7t8u9v0w1'
+down_revision = 'q5r6s7t8u9v0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep one row per (member, stage, proxy holder): a used row if there is
+    # one, so members who voted stay marked as voted.
+    op.execute(
+        """
+        DELETE FROM vote_tokens
+        WHERE EXISTS (
+            SELECT 1 FROM vote_tokens other
+            WHERE other.member_id = vote_tokens.member_id
+              AND other.stage = vote_tokens.stage
+              AND (
+                other.proxy_holder_id = vote_tokens.proxy_holder_id
+                OR (other.proxy_holder_id IS NULL AND vote_tokens.proxy_holder_id IS NULL)
+              )
+              AND (
+                (other.used_at IS NOT NULL AND vote_tokens.used_at IS NULL)
+                OR (
+                  (other.used_at IS NULL) = (vote_tokens.used_at IS NULL)
+                  AND other.token > vote_tokens.token
+                )
+              )
+        )
+        """
+    )
+    with op.batch_alter_table('vote_tokens') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_vote_tokens_member_stage_proxy',
+            ['member_id', 'stage', 'proxy_holder_id'],
+        )
+    op.create_index(
+        'uq_vote_tokens_member_stage_own',
+        'vote_tokens',
+        ['member_id', 'stage'],
+        unique=True,
+        sqlite_where=sa.text('proxy_holder_id IS NULL'),
+        postgresql_where=sa.text('proxy_holder_id IS NULL'),
+    )
+
+
+def downgrade():
+    op.drop_index('uq_vote_tokens_member_stage_own', table_name='vote_tokens')
+    with op.batch_alter_table('vote_tokens') as batch_op:
+        batch_op.drop_constraint('uq_vote_tokens_member_stage_proxy', type_='unique')
@@ -0,0 +1,25 @@
+"""add per-member reminder timestamps
+
+Revision ID: s7t8u9v0w1x2
+Revises: r6s7t8u9v0w1
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 's7t8u9v0w1x2'
+down_revision = 'r6s7t8u9v0w1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('stage1_reminder_sent_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('stage2_reminder_sent_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.drop_column('stage2_reminder_sent_at')
+        batch_op.drop_column('stage1_reminder_sent_at')
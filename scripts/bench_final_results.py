@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark per-recipient cost of the final results email.
+
+Builds throwaway in-memory meetings of increasing size and times
+``send_final_results`` with and without a shared ``final_results_payload``,
+and with the payload inside a ``mail_context``. With the shared payload the
+per-recipient time should stay flat as the number of motions and amendments
+grows; the mail context removes the remaining per-recipient queries.
+
+Usage: python scripts/bench_final_results.py [members]
+"""
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# set before config.py loads .env, so the benchmark never touches a real
+# database and never runs scheduled jobs
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ["SCHEDULER_MODE"] = "off"
+
+from app import create_app  # noqa: E402
+from app.extensions import db, mail  # noqa: E402
+from app.models import Amendment, Meeting, Member, Motion  # noqa: E402
+from app.services.email import (  # noqa: E402
+    final_results_payload,
+    mail_context,
+    send_final_results,
+)
+
+
+def _build_meeting(motions: int, members: int) -> tuple[Meeting, list[Member]]:
+    meeting = Meeting(title=f"Bench {motions}", public_results=False, status="Completed")
+    db.session.add(meeting)
+    db.session.flush()
+    for idx in range(motions):
+        motion = Motion(
+            meeting_id=meeting.id,
+            title=f"Motion {idx}",
+            text_md="Motion text",
+            category="motion",
+            threshold="normal",
+            ordering=idx,
+            status="carried",
+        )
+        db.session.add(motion)
+        db.session.flush()
+        db.session.add(
+            Amendment(
+                meeting_id=meeting.id,
+                motion_id=motion.id,
+                text_md=f"Amendment {idx}",
+                order=idx,
+                status="carried",
+            )
+        )
+    people = [
+        Member(meeting_id=meeting.id, name=f"M{idx}", email=f"m{idx}@example.com")
+        for idx in range(members)
+    ]
+    db.session.add_all(people)
+    db.session.commit()
+    # start each run with an empty identity map so earlier meetings do not
+    # inflate the cost of every commit
+    meeting_id = meeting.id
+    db.session.expunge_all()
+    meeting = db.session.get(Meeting, meeting_id)
+    return meeting, Member.query.filter_by(meeting_id=meeting_id).all()
+
+
+def _per_recipient_ms(
+    meeting: Meeting, members: list[Member], shared: bool, context: bool = False
+) -> float:
+    payload = final_results_payload(meeting) if shared else None
+    start = time.perf_counter()
+    if context:
+        with mail_context(members):
+            for member in members:
+                send_final_results(member, meeting, payload=payload)
+    else:
+        for member in members:
+            send_final_results(member, meeting, payload=payload)
+    return (time.perf_counter() - start) * 1000 / len(members)
+
+
+def main() -> None:
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        app.extensions["mail"].suppress = True
+        with app.test_request_context("/"), patch.object(mail, "send"):
+            print(
+                f"{'motions':>8} {'per-member ms':>14} {'shared payload ms':>18}"
+                f" {'mail context ms':>16}"
+            )
+            for motions in (5, 25, 100):
+                meeting, people = _build_meeting(motions, members)
+                naive = _per_recipient_ms(meeting, people, shared=False)
+                shared = _per_recipient_ms(meeting, people, shared=True)
+                context = _per_recipient_ms(meeting, people, shared=True, context=True)
+                print(f"{motions:>8} {naive:>14.2f} {shared:>18.2f} {context:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
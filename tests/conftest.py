@@ -0,0 +1,5 @@
+import os
+
+# Loaded before the test modules import the app: no test app campaigns for
+# scheduler leadership unless a test starts it itself.
+os.environ.setdefault("SCHEDULER_MODE", "off")
@@ -46,8 +46,12 @@ def test_toggle_public_results_logged():
         db.session.add_all([perm, role, user, meeting])
         db.session.commit()
         with app.test_request_context(f'/admin/meetings/{meeting.id}/toggle-public', method='POST'):
-            with patch('flask_login.utils._get_user', return_value=user):
+            with patch('flask_login.utils._get_user', return_value=user), \
+                    patch('app.admin.routes.documents.prewarm') as prewarm:
+                admin.toggle_public_results(meeting.id)
                 admin.toggle_public_results(meeting.id)
+        # documents are only prepared when results are published
+        prewarm.assert_called_once_with(meeting)
         log = AdminLog.query.filter_by(action='toggle_public_results').first()
         assert log and str(meeting.id) in log.details
 
@@ -71,3 +71,49 @@ def test_list_permissions_contains_create_and_edit_links():
                 assert url_for('admin.create_permission') in html
                 assert url_for('admin.edit_permission', permission_id=perm.id) in html
 
+
+
+def test_permission_names_cached_until_role_saved():
+    from sqlalchemy import event as sa_event
+    from app import login_manager
+    from app.admin.forms import RoleForm
+    from app.admin.routes import _save_role
+
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        view = Permission(name='view_dashboard')
+        manage = Permission(name='manage_users')
+        role = Role(name='Staff', permissions=[view])
+        db.session.add_all([manage, User(email='s@example.com', role=role)])
+        db.session.commit()
+        choices = [(view.id, view.name), (manage.id, manage.name)]
+        role_id = role.id
+        with app.test_request_context('/'):
+            user = login_manager._user_callback('1')
+            assert user.permission_names == frozenset({'view_dashboard'})
+        db.session.remove()
+
+        statements = []
+        listen = lambda *args: statements.append(args[2])
+        with app.test_request_context('/'):
+            user = login_manager._user_callback('1')
+            sa_event.listen(db.engine, 'before_cursor_execute', listen)
+            try:
+                assert user.has_permission('view_dashboard')
+                assert not user.has_permission('manage_users')
+            finally:
+                sa_event.remove(db.engine, 'before_cursor_execute', listen)
+            assert not any('permissions' in s for s in statements)
+
+            form = RoleForm(meta={'csrf': False})
+            form.name.data = 'Staff'
+            form.permission_ids.choices = choices
+            form.permission_ids.data = [pid for pid, _ in choices]
+            _save_role(form, db.session.get(Role, role_id))
+        db.session.remove()
+
+        with app.test_request_context('/'):
+            user = login_manager._user_callback('1')
+            assert user.has_permission('manage_users')
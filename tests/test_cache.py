@@ -0,0 +1,132 @@
+import os
+import socketserver
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.extensions import db
+from app.models import Comment, Meeting
+from app.services import cache
+
+
+class _FakeRedis(socketserver.StreamRequestHandler):
+    """Answer the few commands the cache uses, in the Redis protocol."""
+
+    def _bulk(self, value):
+        if value is None:
+            return b'$-1\r\n'
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            name = args[0].upper()
+            if name == b'MGET':
+                reply = b'*%d\r\n' % (len(args) - 1)
+                reply += b''.join(self._bulk(store.get(k)) for k in args[1:])
+            elif name == b'SET':
+                if b'NX' in args[3:] and args[1] in store:
+                    reply = b'$-1\r\n'
+                else:
+                    store[args[1]] = args[2]
+                    reply = b'+OK\r\n'
+            elif name == b'DEL':
+                reply = b':%d\r\n' % sum(store.pop(k, None) is not None for k in args[1:])
+            else:
+                reply = b'-ERR unknown command\r\n'
+            self.wfile.write(reply)
+
+
+def _setup_app(**config):
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config.update(config)
+    return app
+
+
+def test_redis_backend_caches_and_invalidates_by_tag():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _FakeRedis)
+    server.daemon_threads = True
+    server.store = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        app = _setup_app(CACHE_URL=f'redis://{host}:{port}/0')
+        with app.app_context():
+            assert isinstance(cache.backend(), cache.RedisBackend)
+            calls = []
+
+            def compute():
+                calls.append(1)
+                return {'motion': {1: {'for': 3}}}
+
+            tags = [cache.meeting_tag(1)]
+            assert cache.cached('tallies', compute, tags) == {'motion': {1: {'for': 3}}}
+            assert cache.cached('tallies', compute, tags) == {'motion': {1: {'for': 3}}}
+            assert len(calls) == 1
+
+            cache.invalidate_meetings([2])
+            cache.cached('tallies', compute, tags)
+            assert len(calls) == 1
+
+            cache.invalidate_meetings([1])
+            cache.cached('tallies', compute, tags)
+            assert len(calls) == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_committing_a_comment_invalidates_its_meeting():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        other = Meeting(title='EGM')
+        db.session.add_all([meeting, other])
+        db.session.commit()
+        cache.set('page', 'agm', [cache.meeting_tag(meeting.id)])
+        cache.set('page', 'egm', [cache.meeting_tag(other.id)])
+
+        db.session.add(Comment(meeting_id=meeting.id, text_md='Hello'))
+        assert cache.get('page', [cache.meeting_tag(meeting.id)]) == 'agm'
+        db.session.commit()
+
+        assert cache.get('page', [cache.meeting_tag(meeting.id)]) is None
+        assert cache.get('page', [cache.meeting_tag(other.id)]) == 'egm'
+
+
+def test_coalesced_misses_share_one_computation(tmp_path):
+    import time
+
+    app = _setup_app(SINGLE_FLIGHT_LOCK_DIR=str(tmp_path))
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'tallies'
+
+    def request():
+        with app.app_context():
+            results.append(cache.cached('results', compute, coalesce=True))
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ['tallies'] * 5
+    assert len(calls) == 1
+    # a memory cache is not shared, so other processes are not locked out
+    assert not any(tmp_path.iterdir())
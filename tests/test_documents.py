@@ -0,0 +1,87 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.extensions import db
+from app.models import Meeting, Motion, Member, Vote
+from app.services import documents
+
+
+def _setup_app(tmp_path):
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    app.config['SINGLE_FLIGHT_LOCK_DIR'] = str(tmp_path / 'locks')
+    return app
+
+
+def test_cached_document_reuses_bytes_until_results_change(tmp_path):
+    app = _setup_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM', public_results=True)
+        db.session.add(meeting)
+        db.session.flush()
+        motion = Motion(meeting_id=meeting.id, title='M1', text_md='T', category='motion', threshold='normal', ordering=1)
+        member = Member(meeting_id=meeting.id, name='A')
+        db.session.add_all([motion, member])
+        db.session.commit()
+
+        calls = []
+
+        def render():
+            calls.append(1)
+            return b'doc-%d' % len(calls)
+
+        first = documents.cached_document(meeting, 'final.pdf', render)
+        second = documents.cached_document(meeting, 'final.pdf', render)
+        assert first == second
+        assert len(calls) == 1
+        with open(first, 'rb') as fh:
+            assert fh.read() == b'doc-1'
+
+        Vote.record(member_id=member.id, motion_id=motion.id, choice='for', salt='s')
+        db.session.refresh(meeting)
+        third = documents.cached_document(meeting, 'final.pdf', render)
+        assert third != first
+        assert len(calls) == 2
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    app = _setup_app(tmp_path)
+    app.config['DOCUMENT_CACHE_MAX_MB'] = 1
+    with app.app_context():
+        directory = documents.cache_dir()
+        os.makedirs(directory)
+        for idx, name in enumerate(['old.pdf', 'mid.pdf', 'new.pdf']):
+            path = os.path.join(directory, name)
+            with open(path, 'wb') as fh:
+                fh.write(b'x' * 600 * 1024)
+            os.utime(path, (1000 + idx, 1000 + idx))
+
+        writing = os.path.join(directory, 'abc.pdf.1.tmp')
+        abandoned = os.path.join(directory, 'abc.pdf.2.tmp')
+        for path in (writing, abandoned):
+            with open(path, 'wb') as fh:
+                fh.write(b'x' * 600 * 1024)
+        os.utime(abandoned, (1000, 1000))
+
+        removed = documents.evict(keep=os.path.join(directory, 'new.pdf'))
+
+        assert removed == 2
+        assert sorted(os.listdir(directory)) == ['abc.pdf.1.tmp', 'new.pdf']
+
+
+def test_document_key_changes_with_branding_settings(tmp_path):
+    from app.models import AppSetting
+
+    app = _setup_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.commit()
+        with app.test_request_context('/'):
+            before = documents.document_key(meeting, 'final.pdf')
+            AppSetting.set('site_title', 'Members Vote')
+            assert documents.document_key(meeting, 'final.pdf') != before
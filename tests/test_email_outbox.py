@@ -0,0 +1,269 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import smtplib
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from email import message_from_bytes
+from unittest.mock import patch
+
+from app import create_app
+from app.extensions import db, mail
+from flask_mail import Message
+
+from app.models import EmailLog, EmailOutbox, Meeting, Member
+from app.services import mailer, outbox
+from app.services.email import send_vote_invite
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue that stores each DATA payload on the server."""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        self.server.connections += 1
+        self._reply("220 sink ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self._reply("250 sink")
+            elif command.startswith("MAIL FROM"):
+                self._reply("250 OK")
+            elif command.startswith("RCPT TO"):
+                if self.server.reject_rcpt:
+                    self._reply("550 no such user")
+                else:
+                    self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 end with .")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b".\n", b""):
+                        break
+                    lines.append(data)
+                self.server.messages.append(b"".join(lines))
+                self._reply("250 queued")
+                if len(self.server.messages) in self.server.drop_after:
+                    return
+            elif command == "QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("250 OK")
+
+
+class _SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages: list[bytes] = []
+        self.connections = 0
+        self.reject_rcpt = False
+        # hang up after delivering this many messages in total
+        self.drop_after: set[int] = set()
+
+
+def _setup_app(sink=None):
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['EMAIL_DELIVERY'] = 'outbox'
+    state = app.extensions['mail']
+    if sink is not None:
+        state.server, state.port = sink.server_address
+        state.use_tls = False
+        state.use_ssl = False
+        state.username = state.password = None
+        state.suppress = False
+    return app
+
+
+def _meeting_and_member():
+    now = datetime.utcnow()
+    meeting = Meeting(
+        title='AGM',
+        opens_at_stage1=now,
+        closes_at_stage1=now + timedelta(hours=1),
+    )
+    db.session.add(meeting)
+    db.session.flush()
+    member = Member(name='Alice', email='alice@example.com', meeting_id=meeting.id)
+    db.session.add(member)
+    db.session.commit()
+    return meeting, member
+
+
+def test_outbox_delivers_to_smtp_sink_and_logs():
+    sink = _SMTPSink()
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    try:
+        app = _setup_app(sink)
+        with app.app_context():
+            db.create_all()
+            meeting, member = _meeting_and_member()
+            with app.test_request_context('/'):
+                send_vote_invite(member, 'abc123', meeting)
+
+            entry = EmailOutbox.query.one()
+            assert entry.status == 'pending'
+            assert entry.kind == 'stage1_invite'
+            assert sink.messages == []
+            assert EmailLog.query.count() == 0
+
+            counts = outbox.dispatch()
+
+            assert counts == {'sent': 1, 'retry': 0, 'dead': 0}
+            assert db.session.get(EmailOutbox, entry.id).status == 'sent'
+            log = EmailLog.query.one()
+            assert (log.member_id, log.type) == (member.id, 'stage1_invite')
+            assert len(sink.messages) == 1
+            received = message_from_bytes(sink.messages[0])
+            assert received['Subject'] == 'Your voting link for AGM'
+            assert 'stage1.ics' in [part.get_filename() for part in received.walk()]
+    finally:
+        sink.shutdown()
+        sink.server_close()
+
+
+def test_outbox_dead_letters_permanent_smtp_failure():
+    sink = _SMTPSink()
+    sink.reject_rcpt = True
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    try:
+        app = _setup_app(sink)
+        with app.app_context():
+            db.create_all()
+            meeting, member = _meeting_and_member()
+            with app.test_request_context('/'):
+                send_vote_invite(member, 'abc123', meeting)
+
+            assert outbox.dispatch() == {'sent': 0, 'retry': 0, 'dead': 1}
+            entry = EmailOutbox.query.one()
+            assert entry.status == 'dead'
+            assert 'SMTPRecipientsRefused' in entry.last_error
+            assert EmailLog.query.count() == 0
+    finally:
+        sink.shutdown()
+        sink.server_close()
+
+
+def test_outbox_retries_with_backoff_then_dead_letters():
+    app = _setup_app()
+    app.config['EMAIL_MAX_ATTEMPTS'] = 3
+    app.config['EMAIL_RETRY_BASE_SECONDS'] = 60
+    with app.app_context():
+        db.create_all()
+        meeting, member = _meeting_and_member()
+        with app.test_request_context('/'):
+            send_vote_invite(member, 'abc123', meeting)
+        entry_id = EmailOutbox.query.one().id
+        now = datetime.utcnow()
+
+        with patch.object(mailer, 'send', side_effect=smtplib.SMTPServerDisconnected('gone')):
+            assert outbox.dispatch(now=now)['retry'] == 1
+            entry = db.session.get(EmailOutbox, entry_id)
+            assert entry.next_attempt_at == now + timedelta(seconds=60)
+            # not due yet
+            assert outbox.dispatch(now=now + timedelta(seconds=30)) == {
+                'sent': 0, 'retry': 0, 'dead': 0
+            }
+            later = now + timedelta(seconds=60)
+            assert outbox.dispatch(now=later)['retry'] == 1
+            assert entry.next_attempt_at == later + timedelta(seconds=120)
+            assert outbox.dispatch(now=later + timedelta(seconds=120))['dead'] == 1
+
+        assert entry.status == 'dead'
+        assert entry.attempts == 3
+        assert outbox.requeue_dead() == 1
+        with patch.object(mailer, 'send') as mock_send:
+            assert outbox.dispatch()['sent'] == 1
+            sent = mock_send.call_args[0][0]
+            assert sent.recipients == ['alice@example.com']
+            assert any(a.filename == 'stage1.ics' for a in sent.attachments)
+        assert EmailLog.query.count() == 1
+
+
+def test_claim_skips_rows_another_dispatcher_took():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        meeting, member = _meeting_and_member()
+        with app.test_request_context('/'):
+            send_vote_invite(member, 'abc123', meeting)
+        entry_id = EmailOutbox.query.one().id
+        now = datetime.utcnow()
+
+        first = outbox.claim(10, now=now)
+        assert [row.id for row in first] == [entry_id]
+        # a second worker racing for the same row gets nothing
+        assert outbox.claim(10, now=now + timedelta(seconds=1)) == []
+        # until the first claim goes stale
+        stale = now + outbox.CLAIM_TIMEOUT + timedelta(seconds=1)
+        assert [row.id for row in outbox.claim(10, now=stale)] == [entry_id]
+
+
+def test_enqueue_commits_with_pending_changes():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        meeting, member = _meeting_and_member()
+        member.name = 'Alice Smith'
+        with app.test_request_context('/'), patch.object(mail, 'send') as mock_send:
+            send_vote_invite(member, 'abc123', meeting)
+            mock_send.assert_not_called()
+        db.session.rollback()
+        assert db.session.get(Member, member.id).name == 'Alice Smith'
+        assert EmailOutbox.query.count() == 1
+
+
+def _send_many(sink, count, max_emails=None):
+    app = _setup_app(sink)
+    app.extensions['mail'].max_emails = max_emails
+    with app.app_context():
+        with mailer.bulk_send():
+            for idx in range(count):
+                mailer.send(
+                    Message(
+                        subject=f'Message {idx}',
+                        sender='noreply@example.com',
+                        recipients=[f'm{idx}@example.com'],
+                        body='Hello',
+                    )
+                )
+
+
+def test_bulk_send_reuses_connection_up_to_max_emails():
+    sink = _SMTPSink()
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    try:
+        _send_many(sink, 5)
+        assert len(sink.messages) == 5
+        assert sink.connections == 1
+
+        _send_many(sink, 5, max_emails=2)
+        assert len(sink.messages) == 10
+        assert sink.connections == 1 + 3
+    finally:
+        sink.shutdown()
+        sink.server_close()
+
+
+def test_bulk_send_reconnects_when_server_hangs_up():
+    sink = _SMTPSink()
+    sink.drop_after = {2}
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    try:
+        _send_many(sink, 4)
+        assert len(sink.messages) == 4
+        assert sink.connections == 2
+    finally:
+        sink.shutdown()
+        sink.server_close()
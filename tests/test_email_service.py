@@ -5,7 +5,7 @@ from unittest.mock import patch
 from datetime import datetime, timedelta
 from app import create_app
 from app.extensions import db, mail
-from app.models import Member, Meeting, Motion, Vote
+from app.models import EmailLog, ImportJob, Member, Meeting, Motion, UnsubscribeToken, Vote
 from app.services.email import (
     send_vote_invite,
     send_runoff_invite,
@@ -17,7 +17,12 @@ from app.services.email import (
     send_vote_receipt,
     send_quorum_failure,
     send_final_results,
+    final_results_payload,
+    mail_context,
 )
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+import pytest
 
 
 def test_send_vote_invite_sends_mail():
@@ -249,6 +254,129 @@ def test_send_final_results_uses_results_link_when_public():
                 assert '/results/' in sent_msg.body
 
 
+def _final_results_statements(motion_count):
+    """Return SQL statements issued per recipient for a meeting of a given size."""
+    app = _setup_final_app()
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM', public_results=False, status='Completed')
+        db.session.add(meeting)
+        db.session.flush()
+        for idx in range(motion_count):
+            db.session.add(
+                Motion(
+                    meeting_id=meeting.id,
+                    title=f'M{idx}',
+                    text_md='text',
+                    category='motion',
+                    threshold='normal',
+                    ordering=idx,
+                    status='carried',
+                )
+            )
+        members = [
+            Member(name=f'P{idx}', email=f'p{idx}@example.com', meeting_id=meeting.id)
+            for idx in range(2)
+        ]
+        db.session.add_all(members)
+        db.session.commit()
+        with app.test_request_context('/'):
+            with patch.object(mail, 'send') as mock_send:
+                with patch(
+                    'app.services.email._final_results_docx', return_value=b'docx'
+                ) as mock_docx:
+                    payload = final_results_payload(meeting)
+                    send_final_results(members[0], meeting, payload=payload)
+                    statements = []
+                    listener = lambda *args: statements.append(args[2])
+                    event.listen(db.engine, 'before_cursor_execute', listener)
+                    try:
+                        send_final_results(members[1], meeting, payload=payload)
+                    finally:
+                        event.remove(db.engine, 'before_cursor_execute', listener)
+                    assert mock_docx.call_count == 1
+                    assert mock_send.call_count == 2
+                    sent_msg = mock_send.call_args[0][0]
+                    assert sent_msg.attachments[0].data == b'docx'
+        return len(statements)
+
+
+def test_send_final_results_payload_cost_independent_of_meeting_size():
+    assert _final_results_statements(1) == _final_results_statements(25)
+
+
+def test_mail_context_shares_settings_tokens_and_logs():
+    app = _setup_app()
+    app.extensions['mail'].suppress = True
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        meeting = Meeting(
+            title='AGM',
+            opens_at_stage1=now,
+            closes_at_stage1=now + timedelta(hours=1),
+        )
+        db.session.add(meeting)
+        db.session.flush()
+        members = [
+            Member(name=f'M{idx}', email=f'm{idx}@example.com', meeting_id=meeting.id)
+            for idx in range(3)
+        ]
+        db.session.add_all(members)
+        db.session.flush()
+        db.session.add(UnsubscribeToken(token='existing', member_id=members[0].id))
+        db.session.commit()
+
+        statements = []
+
+        def listener(conn, cursor, statement, params, context, executemany):
+            statements.append(statement)
+
+        with app.test_request_context('/'), mail.record_messages() as outbox:
+            with mail_context(members):
+                send_vote_invite(members[0], 'tok0', meeting)
+                event.listen(db.engine, 'before_cursor_execute', listener)
+                try:
+                    for member in members[1:]:
+                        send_vote_invite(member, 'tok', meeting)
+                finally:
+                    event.remove(db.engine, 'before_cursor_execute', listener)
+                assert EmailLog.query.count() == 0
+            assert len(outbox) == 3
+            assert '/unsubscribe/existing' in outbox[0].body
+
+        assert not any(
+            'app_settings' in s or 'unsubscribe_tokens' in s or 'email_logs' in s
+            for s in statements
+        )
+        assert EmailLog.query.count() == 3
+        assert UnsubscribeToken.query.count() == 3
+
+
+def test_mail_context_reraises_database_errors_and_keeps_sent_logs():
+    app = _setup_app()
+    app.extensions['mail'].suppress = True
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.flush()
+        member = Member(name='Alice', email='alice@example.com', meeting_id=meeting.id)
+        db.session.add(member)
+        db.session.commit()
+
+        with app.test_request_context('/'), pytest.raises(IntegrityError):
+            with mail_context([member]):
+                send_vote_invite(member, 'tok', meeting)
+                # the caller's own work fails on a NOT NULL column
+                db.session.add(ImportJob(report_id='x'))
+                db.session.flush()
+
+        assert ImportJob.query.count() == 0
+        log = EmailLog.query.one()
+        assert (log.member_id, log.type) == (member.id, 'stage1_invite')
+
+
 def test_invite_includes_notice_text():
     app = create_app()
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
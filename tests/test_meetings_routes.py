@@ -20,9 +20,12 @@ from app.models import (
     Amendment,
     MeetingFile,
     Vote,
+    ResultSnapshot,
+    ImportJob,
 )
 import io
 from app.meetings import routes as meetings
+from app.services import member_import
 from app import routes as main
 from docx import Document
 from app.meetings.forms import MeetingForm
@@ -33,6 +36,13 @@ from werkzeug.datastructures import MultiDict
 from app.models import AmendmentConflict
 
 
+def _run_import_inline():
+    return patch(
+        "app.services.member_import.start_job",
+        side_effect=lambda app, job_id, base_url=None: member_import.run_job(job_id),
+    )
+
+
 def _make_user(has_permission: bool):
     perm = Permission(name="manage_meetings") if has_permission else None
     role = Role(permissions=[perm] if perm else [])
@@ -78,9 +88,10 @@ def test_list_meetings_contains_create_link():
                 assert "bp-btn-primary" in html
 
 
-def test_import_members_sends_invites_and_tokens():
+def test_import_members_sends_invites_and_tokens(tmp_path):
     app = create_app()
     app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
     with app.app_context():
         db.create_all()
         meeting = Meeting(title="Test")
@@ -101,10 +112,17 @@ def test_import_members_sends_invites_and_tokens():
                 with patch(
                     "app.meetings.routes.MemberImportForm", return_value=dummy_form
                 ):
-                    with patch("app.meetings.routes.send_vote_invite") as mock_send:
-                        meetings.import_members(meeting.id)
+                    with _run_import_inline(), patch(
+                        "app.services.member_import.send_vote_invite"
+                    ) as mock_send:
+                        resp = meetings.import_members(meeting.id)
+                        assert resp.status_code == 302
                         mock_send.assert_called_once()
                         assert VoteToken.query.count() == 1
+        job = ImportJob.query.one()
+        assert (job.status, job.processed, job.failed) == ("completed", 1, 0)
+        # the stored upload is removed once the import has finished
+        assert not os.path.exists(job.upload_path)
 
 
 def test_close_stage1_creates_stage2_tokens_and_emails():
@@ -526,9 +544,11 @@ def test_add_amendment_notice_deadline():
         assert Amendment.query.count() == 0
 
 
-def test_results_stage2_docx_returns_file():
+def test_results_stage2_docx_returns_file(tmp_path):
     app = create_app()
     app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    app.config["SINGLE_FLIGHT_LOCK_DIR"] = str(tmp_path / "locks")
     with app.app_context():
         db.create_all()
         meeting = Meeting(
@@ -724,6 +744,9 @@ def test_close_stage2_sets_motion_statuses():
         assert m1.status == "carried"
         assert m2.status == "carried"
         assert meeting.status == "Completed"
+        snapshot = db.session.get(ResultSnapshot, (meeting.id, 2))
+        assert snapshot.tallies["motion"][m1.id] == {"for": 2, "against": 1, "abstain": 0}
+        assert snapshot.statuses["motion"] == {m1.id: "carried", m2.id: "carried"}
 
 
 def test_meeting_form_duration_validations():
@@ -1116,6 +1139,7 @@ def test_resend_and_invalidate_proxy_token():
             proxy_holder_id=proxy.id,
         )
         db.session.commit()
+        old_key = tok.token
 
         with app.test_request_context(
             f"/meetings/{meeting.id}/proxy-tokens/{tok.token}/resend", method="POST"
@@ -1125,9 +1149,12 @@ def test_resend_and_invalidate_proxy_token():
                 with patch("app.meetings.routes.send_proxy_invite") as mock_send:
                     meetings.resend_proxy_token(meeting.id, tok.token)
                     mock_send.assert_called_once()
+                    # the proxy's token row is re-keyed rather than duplicated
                     assert (
-                        VoteToken.query.filter_by(proxy_holder_id=proxy.id).count() == 2
+                        VoteToken.query.filter_by(proxy_holder_id=proxy.id).count() == 1
                     )
+                    assert tok.token != old_key
+                    assert VoteToken.verify(plain, "s") is None
 
         with app.test_request_context(
             f"/meetings/{meeting.id}/proxy-tokens/{tok.token}/invalidate", method="POST"
@@ -1410,9 +1437,10 @@ def test_list_members_requires_permission():
                     meetings.list_members(meeting.id)
 
 
-def test_import_members_rejects_duplicates():
+def test_import_members_rejects_duplicates(tmp_path):
     app = create_app()
     app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
     with app.app_context():
         db.create_all()
         meeting = Meeting(title="Test")
@@ -1437,15 +1465,268 @@ def test_import_members_rejects_duplicates():
                 with patch(
                     "app.meetings.routes.MemberImportForm", return_value=dummy_form
                 ):
-                    with patch("app.meetings.routes.flash") as mock_flash:
-                        with patch(
-                            "app.meetings.routes.render_template", return_value=""
-                        ):
-                            meetings.import_members(meeting.id)
-                        mock_flash.assert_any_call(
-                            "Duplicate email: alice@example.com", "error"
-                        )
+                    with _run_import_inline(), patch(
+                        "app.services.member_import.send_vote_invite"
+                    ) as mock_send:
+                        meetings.import_members(meeting.id)
                         assert Member.query.count() == 1
+                        # valid rows are still imported and invited
+                        mock_send.assert_called_once()
+        job = ImportJob.query.one()
+        assert (job.processed, job.failed) == (2, 1)
+        with open(member_import.report_path(meeting.id, job.report_id)) as fh:
+            assert "Duplicate email: alice@example.com" in fh.read()
+
+
+def test_import_members_reports_all_bad_rows_and_resolves_proxies(tmp_path):
+    app = create_app()
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title="Test")
+        db.session.add(meeting)
+        db.session.flush()
+        existing = Member(
+            meeting_id=meeting.id,
+            name="Existing",
+            email="existing@example.com",
+            member_number="100",
+        )
+        db.session.add(existing)
+        db.session.commit()
+        csv_content = (
+            "member_id,name,email,proxy_for\n"
+            "1,Alice,alice@example.com,\n"
+            "2,,nobody@example.com,\n"
+            "3,Carol,EXISTING@example.com,\n"
+            "100,Dan,dan@example.com,\n"
+            f"4,Erin,erin@example.com,{existing.id}\n"
+        )
+        with app.test_request_context(
+            f"/meetings/{meeting.id}/import-members", method="POST"
+        ):
+            user = _make_user(True)
+            dummy_form = SimpleNamespace(
+                csv_file=SimpleNamespace(data=io.BytesIO(csv_content.encode()))
+            )
+            dummy_form.validate_on_submit = lambda: True
+            with patch("flask_login.utils._get_user", return_value=user), patch(
+                "app.meetings.routes.MemberImportForm", return_value=dummy_form
+            ), _run_import_inline(), patch(
+                "app.services.member_import.send_vote_invite"
+            ) as mock_send, patch(
+                "app.services.member_import.send_proxy_invite"
+            ) as mock_proxy:
+                meetings.import_members(meeting.id)
+
+            assert mock_send.call_count == 2
+            proxy, target, _, _ = mock_proxy.call_args[0]
+            assert (proxy.name, target.id) == ("Erin", existing.id)
+            job = ImportJob.query.one()
+            with patch("flask_login.utils._get_user", return_value=user):
+                html = meetings.import_job_status(meeting.id, job.id)
+                response = meetings.import_error_report(meeting.id, job.report_id)
+            assert "5 of 5 rows processed" in html
+            assert "2 imported, 3 skipped" in html
+            assert "hx-trigger" not in html
+            response.direct_passthrough = False
+            report = response.get_data(as_text=True)
+            response.close()
+            assert "Row 3: name is required" in report
+            assert "Duplicate email: existing@example.com" in report
+            assert "Duplicate member ID: 100" in report
+
+        assert Member.query.count() == 3
+        assert VoteToken.query.filter_by(proxy_holder_id=None).count() == 2
+        assert VoteToken.query.filter(VoteToken.proxy_holder_id.isnot(None)).count() == 1
+
+
+def test_import_job_resumes_after_last_committed_line(tmp_path):
+    app = create_app()
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title="Test")
+        db.session.add(meeting)
+        db.session.commit()
+        csv_content = "member_id,name,email,proxy_for\n" + "".join(
+            f"{n},Member {n},m{n}@example.com,\n" for n in range(1, 6)
+        )
+        job = member_import.create_job(
+            meeting, io.BytesIO(csv_content.encode()), "members.csv"
+        )
+        with app.test_request_context("/"), patch(
+            "app.services.member_import.send_vote_invite"
+        ), patch.object(
+            member_import,
+            "append_error_report",
+            side_effect=RuntimeError("disk full"),
+        ):
+            # the first chunk (lines 2-3) commits, then the worker dies
+            db.session.add(Member(meeting_id=meeting.id, name="Dup", email="m3@example.com"))
+            db.session.commit()
+            member_import.run_job(job.id, chunk_size=2)
+        assert (job.status, job.last_line, job.processed) == ("failed", 3, 2)
+        assert Member.query.count() == 3
+
+        # a running job with a fresh heartbeat belongs to another worker
+        job.status = "running"
+        job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+        assert member_import.resume_jobs() == 0
+
+        job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        with app.test_request_context("/"), patch(
+            "app.services.member_import.send_vote_invite"
+        ) as mock_send:
+            assert member_import.resume_jobs() == 1
+        assert (job.status, job.processed, job.failed) == ("completed", 5, 1)
+        assert mock_send.call_count == 2
+        assert Member.query.count() == 5
+
+
+def test_import_job_resends_unsent_invites_and_late_proxies(tmp_path):
+    app = create_app()
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title="Test")
+        db.session.add(meeting)
+        db.session.commit()
+        # Member 1 holds a proxy for member 3, imported in the next chunk
+        csv_content = (
+            "member_id,name,email,proxy_for\n"
+            "1,Alice,alice@example.com,3\n"
+            "2,Bob,bob@example.com,\n"
+            "3,Carol,carol@example.com,\n"
+        )
+        job = member_import.create_job(
+            meeting, io.BytesIO(csv_content.encode()), "members.csv"
+        )
+        # the worker dies after emailing Alice but before Bob
+        with app.test_request_context("/"), patch(
+            "app.services.member_import.send_vote_invite",
+            side_effect=[None, SystemExit()],
+        ), pytest.raises(SystemExit):
+            member_import.run_job(job.id, chunk_size=2)
+        db.session.rollback()
+        assert (job.status, job.last_line) == ("running", 3)
+        assert job.pending_invites is not None
+        stale = {t.token for t in VoteToken.query.all()}
+
+        job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        with app.test_request_context("/"), patch(
+            "app.services.member_import.send_vote_invite"
+        ) as mock_send, patch(
+            "app.services.member_import.send_proxy_invite"
+        ) as mock_proxy:
+            member_import.run_job(job.id, chunk_size=2)
+        assert job.status == "completed"
+        assert job.pending_invites is None
+        # both links of the unsent chunk are re-keyed and sent, then Carol's
+        assert mock_send.call_count == 3
+        proxy, target, _, _ = mock_proxy.call_args[0]
+        assert (proxy.name, target.name) == ("Alice", "Carol")
+        assert stale.isdisjoint(t.token for t in VoteToken.query.all())
+
+
+def test_import_job_reports_failed_invites_and_keeps_heartbeat(tmp_path):
+    app = create_app()
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title="Test")
+        db.session.add(meeting)
+        db.session.commit()
+        csv_content = "member_id,name,email,proxy_for\n" + "".join(
+            f"{n},Member {n},m{n}@example.com,\n" for n in range(1, 4)
+        )
+        job = member_import.create_job(
+            meeting, io.BytesIO(csv_content.encode()), "members.csv"
+        )
+        beats = []
+
+        def slow_send(member, token, meeting):
+            beats.append(
+                db.session.scalar(
+                    db.select(ImportJob.heartbeat_at).where(ImportJob.id == job.id)
+                )
+            )
+            if len(beats) == 3:
+                raise RuntimeError("SMTP down")
+
+        with app.test_request_context("/"), patch(
+            "app.services.member_import.send_vote_invite", side_effect=slow_send
+        ), patch.object(member_import, "HEARTBEAT_EVERY", timedelta(0)):
+            member_import.run_job(job.id)
+        # the heartbeat moves on while invites are still going out
+        assert beats[0] < beats[1] < beats[2]
+        assert job.status == "failed"
+        assert job.pending_invites is None
+        assert job.error.startswith("Up to 3 invite(s)")
+        assert member_import.resume_jobs() == 0
+
+
+def test_save_meeting_prerenders_documents_only_when_publishing():
+    app = create_app()
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["WTF_CSRF_ENABLED"] = False
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title="AGM", status="Completed")
+        db.session.add(meeting)
+        db.session.commit()
+
+        def save(**fields):
+            data = MultiDict({"title": "AGM", "status": "Completed", **fields})
+            with app.test_request_context("/"):
+                meetings._save_meeting(MeetingForm(formdata=data), meeting)
+
+        with patch("app.meetings.routes.documents.prewarm") as prewarm:
+            save()
+            assert prewarm.call_count == 0
+            save(public_results="y")
+            prewarm.assert_called_once_with(meeting)
+            # editing a meeting whose results are already out renders nothing
+            save(public_results="y", summary_md="Thanks")
+            prewarm.assert_called_once_with(meeting)
+
+
+def test_manual_test_send_leaves_real_member_link_alone():
+    app = create_app()
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["WTF_CSRF_ENABLED"] = False
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title="AGM")
+        db.session.add(meeting)
+        db.session.flush()
+        # the admin is also a real member of the meeting
+        member = Member(meeting_id=meeting.id, name="Admin", email="admin@example.com")
+        db.session.add(member)
+        db.session.flush()
+        _, plain = VoteToken.create(member.id, 1, app.config["TOKEN_SALT"])
+        db.session.commit()
+
+        data = {"email_type": "stage1_invite", "test_mode": "y"}
+        with app.test_request_context(
+            f"/meetings/{meeting.id}/send-emails", method="POST", data=data
+        ):
+            with patch("flask_login.utils._get_user", return_value=_make_user(True)), \
+                    patch("app.meetings.routes.send_vote_invite") as mock_send, \
+                    patch("app.meetings.routes.flash"):
+                meetings.manual_send_emails(meeting.id)
+
+        recipient = mock_send.call_args[0][0]
+        assert recipient.id != member.id and recipient.is_test
+        live = VoteToken.verify(plain, app.config["TOKEN_SALT"])
+        assert (live.member_id, live.is_test) == (member.id, False)
 
 
 def test_batch_edit_requires_permission():
@@ -107,3 +107,121 @@ def test_stage2_progress_percent_future():
         db.session.add(meeting)
         db.session.commit()
         assert meeting.stage2_progress_percent() == 0
+
+
+def test_vote_record_ballot_replaces_and_marks_token_used():
+    from app.models import Vote
+
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.flush()
+        member = Member(meeting_id=meeting.id, name='A')
+        db.session.add(member)
+        db.session.flush()
+        token = VoteToken(token=VoteToken._hash('t1', 's'), member_id=member.id, stage=1)
+        db.session.add(token)
+        db.session.commit()
+
+        hashes = Vote.record_ballot(member.id, 1, [('amendment', 1, 'for'), ('motion', 2, 'against')], 's')
+        assert len(hashes) == 2
+        assert hashes[0] == Vote._digest(member.id, 'for', 's', amendment_id=1, stage=1)
+        assert token.used_at is not None
+
+        Vote.record_ballot(member.id, 1, [('amendment', 1, 'abstain')], 's', replace=True)
+        votes = Vote.query.filter_by(member_id=member.id).order_by(Vote.id).all()
+        assert [(v.amendment_id, v.motion_id, v.choice) for v in votes] == [
+            (None, 2, 'against'),
+            (1, None, 'abstain'),
+        ]
+
+
+def test_vote_token_create_bulk_issues_member_and_proxy_tokens():
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.flush()
+        alice = Member(meeting_id=meeting.id, name='Alice')
+        db.session.add(alice)
+        db.session.flush()
+        bob = Member(meeting_id=meeting.id, name='Bob', proxy_for=str(alice.id))
+        carol = Member(meeting_id=meeting.id, name='Carol', proxy_for='999')
+        db.session.add_all([bob, carol])
+        db.session.flush()
+
+        proxies = VoteToken.proxy_map([alice, bob, carol])
+        assert proxies == {bob.id: alice.id}
+        pairs = VoteToken.create_bulk([alice.id, bob.id, carol.id], 2, 's', proxies)
+        db.session.commit()
+
+        assert [member_id for member_id, _ in pairs] == [alice.id, bob.id, carol.id, bob.id]
+        assert len({plain for _, plain in pairs}) == 4
+        proxy_token = VoteToken.verify(pairs[-1][1], 's')
+        assert (proxy_token.member_id, proxy_token.proxy_holder_id) == (alice.id, bob.id)
+        own = VoteToken.verify(pairs[0][1], 's')
+        assert (own.member_id, own.stage, own.proxy_holder_id) == (alice.id, 2, None)
+        assert VoteToken.query.count() == 4
+
+
+def test_vote_token_reissue_takes_test_flag_of_new_link():
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.flush()
+        alice = Member(meeting_id=meeting.id, name='Alice')
+        db.session.add(alice)
+        db.session.flush()
+
+        VoteToken.create_bulk([alice.id], 1, 's', is_test=True)
+        db.session.commit()
+        plain = dict(VoteToken.create_bulk([alice.id], 1, 's'))[alice.id]
+        token = VoteToken.verify(plain, 's')
+        assert token.is_test is False
+        token.used_at = datetime.utcnow()
+        db.session.commit()
+        assert meeting.stage1_votes_count() == 1
+
+        token, _ = VoteToken.create(member_id=alice.id, stage=1, salt='s', is_test=True)
+        assert token.is_test is True
+        token, _ = VoteToken.create(member_id=alice.id, stage=1, salt='s')
+        assert token.is_test is False
+
+
+def test_vote_token_reissue_rekeys_current_row():
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.flush()
+        alice = Member(meeting_id=meeting.id, name='Alice')
+        bob = Member(meeting_id=meeting.id, name='Bob')
+        db.session.add_all([alice, bob])
+        db.session.flush()
+        bob.proxy_for = str(alice.id)
+
+        first = dict(VoteToken.create_bulk([alice.id], 1, 's', {bob.id: alice.id}))
+        db.session.commit()
+        token, _ = VoteToken.create(member_id=alice.id, stage=1, salt='s')
+        token.used_at = datetime.utcnow()
+        db.session.commit()
+        second = dict(VoteToken.create_bulk([alice.id, bob.id], 1, 's', {bob.id: alice.id}))
+        db.session.commit()
+
+        # alice's own row and bob's proxy row were re-keyed, bob's own row is new
+        assert VoteToken.query.count() == 3
+        assert VoteToken.verify(first[alice.id], 's') is None
+        assert VoteToken.verify(first[bob.id], 's') is None
+        current = VoteToken.verify(second[alice.id], 's')
+        assert current is token
+        assert current.used_at is not None
@@ -105,3 +105,21 @@ def test_nav_includes_audit_log_for_root():
             with patch('flask_login.utils._get_user', return_value=user):
                 html = render_template('base.html')
                 assert 'Audit Log' in html
+
+
+def test_meeting_status_is_looked_up_lazily_and_cached():
+    from flask import render_template_string
+    from app.models import Meeting
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(Meeting(title='AGM', status='Stage 1', quorum=10))
+        db.session.commit()
+        with app.test_request_context('/'):
+            with patch('app.utils.Meeting.quorum_percentage', return_value=40.0) as pct:
+                assert render_template_string('{{ 1 }}') == '1'
+                assert pct.call_count == 0
+                template = '{{ current_stage_label }} {{ current_quorum_pct|round|int }}'
+                assert render_template_string(template) == 'Stage 1 40'
+                assert render_template_string(template) == 'Stage 1 40'
+                assert pct.call_count == 1
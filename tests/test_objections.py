@@ -6,9 +6,10 @@ from app.extensions import db
 from app.models import Meeting, Member, Motion, Amendment, AmendmentObjection, Role, Permission, User
 from app.meetings import routes as meetings
 from app.admin import routes as admin
+from app.services import objections
 from unittest.mock import patch
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 def _setup_app():
@@ -123,3 +124,62 @@ def test_reinstate_requires_permission():
             with patch('flask_login.utils._get_user', return_value=user):
                 with pytest.raises(Exception):
                     admin.reinstate_amendment(amend.id)
+
+
+def test_objection_deadlines_processed_once_per_amendment():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.flush()
+        amend = Amendment(meeting_id=meeting.id, text_md='A1', order=1, status='rejected')
+        quiet = Amendment(meeting_id=meeting.id, text_md='A2', order=2, status='rejected')
+        db.session.add_all([amend, quiet])
+        db.session.flush()
+        for i in range(30):
+            m = Member(meeting_id=meeting.id, name=f'M{i}')
+            db.session.add(m)
+            db.session.flush()
+            db.session.add(
+                AmendmentObjection(
+                    amendment_id=amend.id,
+                    member_id=m.id,
+                    confirmed_at=now - timedelta(days=6),
+                    deadline_first=now - timedelta(days=1, minutes=i),
+                )
+            )
+            if i < 3:
+                db.session.add(
+                    AmendmentObjection(
+                        amendment_id=quiet.id,
+                        member_id=m.id,
+                        confirmed_at=now - timedelta(days=6),
+                        deadline_first=now - timedelta(days=1),
+                    )
+                )
+        db.session.commit()
+
+        with patch('app.services.objections.send_board_notice') as notice, \
+                patch('app.services.objections.send_amendment_reinstated') as reinstated:
+            assert objections.process_deadlines(now=now) == {'notices': 1, 'reinstated': 0}
+            notice.assert_called_once()
+            assert notice.call_args.args[0].id == amend.id
+            finals = {
+                o.deadline_final
+                for o in AmendmentObjection.query.filter_by(amendment_id=amend.id)
+            }
+            # earliest first deadline plus the board's five days
+            assert finals == {now - timedelta(days=1, minutes=29) + timedelta(days=5)}
+
+            later = now + timedelta(days=5)
+            assert objections.process_deadlines(meeting.id, now=later) == {
+                'notices': 0, 'reinstated': 1
+            }
+            reinstated.assert_called_once()
+        assert db.session.get(Amendment, amend.id).status is None
+        assert db.session.get(Amendment, quiet.id).status == 'rejected'
+        assert AmendmentObjection.query.filter(
+            AmendmentObjection.deadline_final.isnot(None)
+        ).count() == 0
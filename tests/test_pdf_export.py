@@ -46,8 +46,10 @@ import werkzeug.utils
         "Line\nBreak",
     ],
 )
-def test_public_results_pdf_route(title):
+def test_public_results_pdf_route(title, tmp_path):
     app = _setup_app()
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    app.config["SINGLE_FLIGHT_LOCK_DIR"] = str(tmp_path / "locks")
     with app.app_context():
         db.create_all()
         meeting = Meeting(title=title)
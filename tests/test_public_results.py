@@ -112,3 +112,77 @@ def test_public_amendment_text_requires_public_results():
         with app.test_request_context(f'/results/amendment/{amend.id}'):
             html = main.public_amendment_text(amend.id)
             assert 'Amendment A1' in html
+
+
+def test_public_results_json_conditional_get():
+    app = _setup_app()
+    app.debug = False
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM', public_results=True)
+        db.session.add(meeting)
+        db.session.flush()
+        amend = Amendment(meeting_id=meeting.id, motion_id=None, text_md='A1', order=1)
+        member = Member(meeting_id=meeting.id, name='Alice')
+        db.session.add_all([amend, member])
+        db.session.commit()
+        meeting_id = meeting.id
+
+        client = app.test_client()
+        first = client.get(f'/results/{meeting_id}/tallies.json')
+        etag = first.headers['ETag']
+        assert first.status_code == 200
+        assert 'no-cache' in first.headers['Cache-Control']
+
+        again = client.get(f'/results/{meeting_id}/tallies.json', headers={'If-None-Match': etag})
+        assert again.status_code == 304
+        assert again.data == b''
+
+        Vote.record(member_id=member.id, amendment_id=amend.id, choice='for', salt='s')
+        changed = client.get(f'/results/{meeting_id}/tallies.json', headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+
+        meeting = db.session.get(Meeting, meeting_id)
+        meeting.status = 'Completed'
+        db.session.commit()
+        done = client.get(f'/results/{meeting_id}/tallies.json')
+        assert 'max-age=300' in done.headers['Cache-Control']
+        assert done.headers['ETag'] != changed.headers['ETag']
+
+
+def test_public_results_html_is_private_and_votes_leave_version_alone():
+    app = _setup_app()
+    app.debug = False
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM', public_results=True)
+        db.session.add(meeting)
+        db.session.flush()
+        amend = Amendment(meeting_id=meeting.id, motion_id=None, text_md='A1', order=1)
+        member = Member(meeting_id=meeting.id, name='Alice')
+        db.session.add_all([amend, member])
+        db.session.commit()
+        meeting_id = meeting.id
+        version = meeting.results_version
+
+        Vote.record(member_id=member.id, amendment_id=amend.id, choice='for', salt='s')
+        db.session.commit()
+        assert db.session.get(Meeting, meeting_id).results_version == version
+
+        meeting = db.session.get(Meeting, meeting_id)
+        meeting.status = 'Completed'
+        db.session.commit()
+
+        client = app.test_client()
+        page = client.get(f'/results/{meeting_id}')
+        assert page.status_code == 200
+        assert 'private' in page.headers['Cache-Control']
+        assert 'no-cache' in page.headers['Cache-Control']
+        assert 'max-age' not in page.headers['Cache-Control']
+        again = client.get(f'/results/{meeting_id}', headers={'If-None-Match': page.headers['ETag']})
+        assert again.status_code == 304
+
+        data = client.get(f'/results/{meeting_id}/tallies.json')
+        assert 'public' in data.headers['Cache-Control']
+        assert 'max-age=300' in data.headers['Cache-Control']
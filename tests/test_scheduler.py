@@ -1,18 +1,27 @@
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from unittest.mock import patch
+import threading
+import time
+from unittest.mock import MagicMock, patch
 from datetime import datetime, timedelta
 
-from app import create_app
+import sqlalchemy
+
+from app import create_app, register_scheduler_leader
+from config import DevelopmentConfig
+from flask import Flask
 from app.extensions import db, scheduler
 from app.models import Meeting, Member, VoteToken, EmailSetting
+from app.services import leader, timeline
 from app.tasks import (
     register_jobs,
-    send_stage1_reminders,
-    send_stage2_reminders,
+    _stage1_reminder,
+    _stage2_reminder,
     cleanup_vote_tokens,
-    send_submission_invites,
+    _submission_invites,
+    run_meeting_event,
+    remind_unvoted,
 )
 
 
@@ -30,10 +39,21 @@ def _setup_app():
 def test_register_jobs_adds_interval_job():
     with patch.object(scheduler, 'add_job') as add_job:
         register_jobs()
-        assert add_job.call_count == 5
+        assert add_job.call_count == 2
+        assert [c.args[0] for c in add_job.call_args_list] == ['token_cleanup', 'timeline_replan']
+
+
+def _record(sent):
+    """Side effect noting the member and meeting ids of each reminder, as the
+    worker threads' sessions are closed by the time the test looks."""
+
+    def send(member, token, meeting):
+        sent.append((member.id, meeting.id))
+
+    return send
 
 
-def test_send_stage1_reminders_sends_only_unvoted():
+def test_stage1_reminder_sends_only_unvoted():
     app = _setup_app()
     with app.app_context():
         db.create_all()
@@ -50,14 +70,14 @@ def test_send_stage1_reminders_sends_only_unvoted():
         t2.used_at = now
         db.session.add_all([t1, t2])
         db.session.commit()
-        with patch('app.tasks.send_stage1_reminder') as mock_send:
-            send_stage1_reminders()
-            assert mock_send.call_count == 1
-            assert mock_send.call_args.args[0].id == m1.id
+        sent = []
+        with patch('app.tasks.send_stage1_reminder', side_effect=_record(sent)):
+            _stage1_reminder(meeting, now)
+            assert [member_id for member_id, _ in sent] == [m1.id]
             assert meeting.stage1_reminder_sent_at is not None
 
 
-def test_send_stage2_reminders_sends_only_unvoted():
+def test_stage2_reminder_sends_only_unvoted():
     app = _setup_app()
     with app.app_context():
         db.create_all()
@@ -76,10 +96,10 @@ def test_send_stage2_reminders_sends_only_unvoted():
         token2.used_at = now
         db.session.add_all([token1, token2])
         db.session.commit()
-        with patch('app.tasks.send_stage2_reminder') as mock_send:
-            send_stage2_reminders()
-            assert mock_send.call_count == 1
-            assert mock_send.call_args.args[0].id == m1.id
+        sent = []
+        with patch('app.tasks.send_stage2_reminder', side_effect=_record(sent)):
+            _stage2_reminder(meeting, now)
+            assert [member_id for member_id, _ in sent] == [m1.id]
             assert meeting.stage2_reminder_sent_at is not None
 
 
@@ -111,13 +131,45 @@ def test_cleanup_vote_tokens_removes_expired_and_used():
         db.session.add_all([t_used, t_expired1, t_expired2, t_valid])
         db.session.commit()
 
-        cleanup_vote_tokens()
+        assert cleanup_vote_tokens() == 2
         remaining = VoteToken.query.all()
         assert len(remaining) == 1
         assert remaining[0].token == t_valid.token
 
 
-def test_send_submission_invites_respects_setting():
+def test_cleanup_vote_tokens_batches_and_keeps_used_tokens_of_open_stage():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        closed = Meeting(title='Closed', closes_at_stage1=now - timedelta(hours=1))
+        open_ = Meeting(
+            title='Open',
+            opens_at_stage1=now - timedelta(hours=1),
+            closes_at_stage1=now + timedelta(hours=1),
+        )
+        db.session.add_all([closed, open_])
+        db.session.flush()
+        members = [Member(meeting_id=closed.id, name=f'C{i}') for i in range(5)]
+        voter = Member(meeting_id=open_.id, name='Voter')
+        db.session.add_all([*members, voter])
+        db.session.flush()
+        VoteToken.create_bulk([m.id for m in members], 1, 's')
+        used, _ = VoteToken.create(member_id=voter.id, stage=1, salt='s')
+        used.used_at = now
+        db.session.commit()
+
+        with patch('app.models.time.sleep') as sleep:
+            assert VoteToken.delete_batched(
+                Meeting.id == closed.id, batch_size=2, pause=0.5
+            ) == 5
+        # full batches of 2, 2 then a short batch of 1
+        assert sleep.call_count == 2
+        assert cleanup_vote_tokens() == 0
+        assert VoteToken.query.one().member_id == voter.id
+
+
+def test_submission_invites_respect_setting():
     app = _setup_app()
     with app.app_context():
         db.create_all()
@@ -138,11 +190,11 @@ def test_send_submission_invites_respects_setting():
         db.session.commit()
 
         with patch('app.tasks.send_submission_invite') as mock_send:
-            send_submission_invites()
+            _submission_invites(meeting, now)
             assert mock_send.call_count == 0
 
 
-def test_send_submission_invites_sends_when_enabled():
+def test_submission_invites_sent_when_enabled():
     app = _setup_app()
     with app.app_context():
         db.create_all()
@@ -157,5 +209,226 @@ def test_send_submission_invites_sends_when_enabled():
         db.session.commit()
 
         with patch('app.tasks.send_submission_invite') as mock_send:
-            send_submission_invites()
+            _submission_invites(meeting, now)
             mock_send.assert_called_once()
+
+
+def test_file_lock_allows_one_leader_at_a_time(tmp_path):
+    path = str(tmp_path / 'scheduler.lock')
+    first, second = leader.FileLock(path), leader.FileLock(path)
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_locks_give_up_after_timeout_without_raising(tmp_path):
+    path = str(tmp_path / 'scheduler.lock')
+    first, second = leader.FileLock(path), leader.FileLock(path)
+    assert first.acquire()
+    started = time.monotonic()
+    assert not second.acquire(timeout=0.2)
+    assert time.monotonic() - started >= 0.2
+    first.release()
+    assert second.acquire(timeout=0.2)
+    second.release()
+
+    # an exhausted connection pool is a failed attempt, not an error
+    engine = MagicMock()
+    engine.connect.side_effect = sqlalchemy.exc.TimeoutError('QueuePool limit reached')
+    assert not leader.AdvisoryLock(engine).acquire(timeout=1)
+    engine.connect.assert_called_once_with()
+
+
+def test_campaign_resumes_jobs_only_while_leader(tmp_path):
+    app = _setup_app()
+    app.config['SCHEDULER_LOCK_FILE'] = str(tmp_path / 'scheduler.lock')
+    with app.app_context():
+        other = leader.FileLock(app.config['SCHEDULER_LOCK_FILE'])
+        assert other.acquire()
+        stop = threading.Event()
+
+        def run():
+            with app.app_context():
+                leader.campaign(stop, 0.01)
+
+        with patch.object(scheduler, 'resume') as resume, patch.object(scheduler, 'pause') as pause, \
+            patch.object(scheduler.scheduler, 'wakeup'):
+            thread = threading.Thread(target=run)
+            thread.start()
+            time.sleep(0.1)
+            resume.assert_not_called()
+
+            other.release()
+            deadline = time.time() + 2
+            while not resume.called and time.time() < deadline:
+                time.sleep(0.01)
+            resume.assert_called_once()
+            assert not other.acquire()
+
+            stop.set()
+            thread.join(2)
+            pause.assert_called_once()
+        assert other.acquire()
+        other.release()
+
+
+def test_timeline_plans_meeting_events_at_their_due_time():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        now = datetime(2030, 1, 1, 12, 0)
+        meeting = Meeting(
+            title='AGM',
+            motions_opens_at=now - timedelta(days=1),
+            closes_at_stage1=now + timedelta(hours=10),
+            closes_at_stage2=now - timedelta(hours=1),
+            stage2_reminder_sent_at=None,
+        )
+        db.session.add(meeting)
+        db.session.commit()
+
+        assert timeline.due_events(meeting, now) == {
+            'submission_invites': now,
+            'stage1_reminder': now + timedelta(hours=8),
+        }
+
+        meeting.stage1_reminder_sent_at = now + timedelta(hours=8)
+        meeting.submission_invites_sent_at = now
+        assert timeline.due_events(meeting, now) == {}
+
+        meeting.stage1_reminder_sent_at = None
+        meeting.closes_at_stage1 = now + timedelta(hours=1)
+        # already inside the reminder window but it has just run
+        assert timeline.plan_meeting(meeting, now, done=('stage1_reminder',)) == {}
+        assert timeline.plan_meeting(meeting, now) == {'stage1_reminder': now}
+
+
+def test_scheduler_leader_only_campaigns_where_the_site_is_served():
+    def make_app(testing=False, mode='embedded'):
+        app = Flask(__name__)
+        app.testing = testing
+        app.config['SCHEDULER_MODE'] = mode
+        return app
+
+    with patch.object(leader, 'start_thread') as start, \
+            patch.dict(os.environ, {'FLASK_RUN_FROM_CLI': ''}):
+        register_scheduler_leader(make_app(testing=True))
+        register_scheduler_leader(make_app(mode='off'))
+        assert start.call_count == 0
+        served = make_app()
+        register_scheduler_leader(served)
+        start.assert_called_once_with(served)
+
+    # under the flask command only a request, i.e. ``flask run``, campaigns
+    with patch.object(leader, 'start_thread') as start, \
+            patch.dict(os.environ, {'FLASK_RUN_FROM_CLI': 'true'}):
+        app = make_app()
+        register_scheduler_leader(app)
+        assert start.call_count == 0
+        app.add_url_rule('/', 'index', lambda: 'ok')
+        assert app.test_client().get('/').status_code == 200
+        start.assert_called_once_with(app)
+
+
+def test_plan_meeting_writes_one_shot_jobs_to_timeline_store():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        meeting = Meeting(title='AGM', closes_at_stage1=now + timedelta(hours=10))
+        db.session.add(meeting)
+        db.session.commit()
+
+        # started paused by create_app, as in web workers that are not leader
+        assert scheduler.running
+        timeline.plan_meeting(meeting, now)
+        job = scheduler.get_job(timeline.job_id(meeting.id, 'stage1_reminder'))
+        assert job.args == (meeting.id, 'stage1_reminder')
+        assert job.next_run_time.replace(tzinfo=None) == now + timedelta(hours=8)
+        assert job.func_ref == timeline.EVENT_FUNC
+
+        meeting.closes_at_stage1 = now - timedelta(hours=1)
+        timeline.plan_meeting(meeting, now)
+        assert scheduler.get_job(timeline.job_id(meeting.id, 'stage1_reminder')) is None
+
+
+def test_run_meeting_event_sends_reminder_for_that_meeting():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        meetings = []
+        for title in ('AGM', 'EGM'):
+            meeting = Meeting(title=title, closes_at_stage1=now + timedelta(hours=1), quorum=1)
+            db.session.add(meeting)
+            db.session.flush()
+            member = Member(meeting_id=meeting.id, name='Alice', email=f'{title}@example.com')
+            db.session.add(member)
+            db.session.flush()
+            VoteToken.create(member.id, 1, app.config['TOKEN_SALT'])
+            meetings.append(meeting)
+        db.session.commit()
+
+        sent = []
+        with patch('app.tasks.send_stage1_reminder', side_effect=_record(sent)), \
+                patch.object(scheduler, 'app', app):
+            run_meeting_event(meetings[0].id, 'stage1_reminder')
+            assert [meeting_id for _, meeting_id in sent] == [meetings[0].id]
+        db.session.expire_all()
+        assert db.session.get(Meeting, meetings[0].id).stage1_reminder_sent_at is not None
+        assert db.session.get(Meeting, meetings[1].id).stage1_reminder_sent_at is None
+
+
+def test_remind_unvoted_checkpoints_chunks_and_resumes(tmp_path):
+    class FileDatabaseConfig(DevelopmentConfig):
+        # the sending threads need connections of their own, which an
+        # in-memory database cannot give them
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'app.db'}"
+
+    app = create_app(FileDatabaseConfig)
+    app.config['REMINDER_COOLDOWN_HOURS'] = 24
+    app.config['TOKEN_SALT'] = 's'
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        meeting = Meeting(title='M', closes_at_stage1=now + timedelta(hours=1))
+        db.session.add(meeting)
+        db.session.flush()
+        members = [
+            Member(meeting_id=meeting.id, name=f'M{i}', email=f'm{i}@example.com')
+            for i in range(5)
+        ]
+        db.session.add_all(members)
+        db.session.flush()
+        VoteToken.create_bulk([m.id for m in members], 1, 's')
+        # reminded by an earlier, interrupted run
+        members[0].stage1_reminder_sent_at = now - timedelta(hours=1)
+        db.session.commit()
+        failing = members[3].id
+
+        kept = VoteToken.query.filter_by(member_id=failing).one().token
+
+        def send(member, plain, meeting):
+            if member.id == failing:
+                raise OSError('connection refused')
+
+        with patch('app.tasks.send_stage1_reminder', side_effect=send) as mock_send:
+            stats = remind_unvoted(meeting, 1, now, chunk_size=2, concurrency=2)
+        # the failed member is tried again after the last chunk
+        assert mock_send.call_count == 5
+        assert (stats['sent'], stats['failed'], stats['chunks']) == (3, 1, 2)
+        assert stats['seconds'] >= 0
+        db.session.expire_all()
+        stamped = {m.id for m in Member.query.filter(Member.stage1_reminder_sent_at == now)}
+        assert stamped == {members[1].id, members[2].id, members[4].id}
+        # a failed email leaves the member's current link working
+        assert VoteToken.query.filter_by(member_id=failing).one().token == kept
+
+        sent = []
+        with patch('app.tasks.send_stage1_reminder', side_effect=_record(sent)):
+            stats = remind_unvoted(meeting, 1, now)
+        # only the member whose email failed is retried
+        assert [member_id for member_id, _ in sent] == [failing]
+        assert stats['sent'] == 1
@@ -2,6 +2,7 @@ from unittest.mock import patch
 import pytest
 from flask_login import AnonymousUserMixin
 from flask import render_template
+from sqlalchemy import event as sa_event
 
 from app import create_app
 from app.extensions import db
@@ -50,3 +51,36 @@ def test_site_title_used_in_template():
             with patch('flask_login.utils._get_user', return_value=anon):
                 html = render_template('base.html')
                 assert '<title>My Vote</title>' in html
+
+
+def test_settings_cached_per_process_and_revalidated_by_version():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        AppSetting.set('site_title', 'My Vote')
+        AppSetting.get('site_title')
+        statements = []
+        listen = lambda *args: statements.append(args[2])
+        sa_event.listen(db.engine, 'before_cursor_execute', listen)
+        try:
+            assert AppSetting.get('site_title') == 'My Vote'
+            assert AppSetting.get('from_email', 'x@example.com') == 'x@example.com'
+            assert statements == []
+        finally:
+            sa_event.remove(db.engine, 'before_cursor_execute', listen)
+
+        # another worker changes the setting and bumps the version
+        db.session.execute(
+            db.update(AppSetting).where(AppSetting.key == 'site_title').values(value='New')
+        )
+        db.session.execute(
+            db.update(AppSetting).where(AppSetting.key == '_version').values(value='other')
+        )
+        db.session.commit()
+        assert AppSetting.get('site_title') == 'My Vote'
+
+    with app.app_context():
+        assert AppSetting.get('site_title') == 'New'
+        assert AppSetting.get('_version') is None
+        AppSetting.delete('site_title')
+        assert AppSetting.get('site_title', 'Default') == 'Default'
@@ -0,0 +1,163 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models import Meeting, Amendment, Motion, Member, Vote, VoteTally, ResultSnapshot
+from app.services import tally
+
+
+def _setup_app():
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    return app
+
+
+def test_meeting_tallies_single_query_and_excludes_test_votes():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        other = Meeting(title='Other')
+        db.session.add_all([meeting, other])
+        db.session.flush()
+        motion = Motion(meeting_id=meeting.id, title='M1', text_md='T', category='motion', threshold='normal', ordering=1)
+        other_motion = Motion(meeting_id=other.id, title='M2', text_md='T', category='motion', threshold='normal', ordering=1)
+        db.session.add_all([motion, other_motion])
+        db.session.flush()
+        amend = Amendment(meeting_id=meeting.id, motion_id=motion.id, text_md='A1', order=1)
+        m1 = Member(meeting_id=meeting.id, name='A')
+        m2 = Member(meeting_id=meeting.id, name='B')
+        db.session.add_all([amend, m1, m2])
+        db.session.commit()
+        Vote.record(member_id=m1.id, amendment_id=amend.id, choice='for', salt='s')
+        Vote.record(member_id=m2.id, amendment_id=amend.id, choice='for', salt='s')
+        Vote.record(member_id=m1.id, motion_id=motion.id, choice='against', salt='s')
+        Vote.record(member_id=m2.id, motion_id=motion.id, choice='for', salt='s', is_test=True)
+        Vote.record(member_id=m2.id, motion_id=other_motion.id, choice='for', salt='s')
+
+        meeting_id = meeting.id
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            matrix = tally.meeting_tallies(meeting_id)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        assert len(statements) == 1
+        assert matrix['amendment'][amend.id] == {'for': 2, 'against': 0, 'abstain': 0}
+        assert matrix['motion'] == {motion.id: {'for': 0, 'against': 1, 'abstain': 0}}
+        assert tally.counts_for(matrix, 'motion', 999) == tally.empty_counts()
+        with_test = tally.meeting_tallies(meeting.id, include_test=True)
+        assert with_test['motion'][motion.id]['for'] == 1
+
+
+def test_counters_follow_revotes_and_member_removal():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.flush()
+        motion = Motion(meeting_id=meeting.id, title='M1', text_md='T', category='motion', threshold='normal', ordering=1)
+        db.session.add(motion)
+        db.session.flush()
+        amend = Amendment(meeting_id=meeting.id, motion_id=motion.id, text_md='A1', order=1)
+        m1 = Member(meeting_id=meeting.id, name='A')
+        m2 = Member(meeting_id=meeting.id, name='B')
+        db.session.add_all([amend, m1, m2])
+        db.session.commit()
+
+        Vote.record_ballot(m1.id, 1, [('amendment', amend.id, 'for')], 's')
+        Vote.record_ballot(m2.id, 1, [('amendment', amend.id, 'for')], 's')
+        Vote.record_ballot(m1.id, 1, [('amendment', amend.id, 'against')], 's', replace=True)
+        matrix = tally.meeting_tallies(meeting.id)
+        assert matrix['amendment'][amend.id] == {'for': 1, 'against': 1, 'abstain': 0}
+
+        Vote.delete_where(Vote.member_id == m2.id)
+        db.session.commit()
+        matrix = tally.meeting_tallies(meeting.id)
+        assert matrix['amendment'][amend.id] == {'for': 0, 'against': 1, 'abstain': 0}
+        assert VoteTally.query.filter_by(stage=1, choice='against').one().count == 1
+
+
+def test_rebuild_counters_reports_and_fixes_drift():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.flush()
+        motion = Motion(meeting_id=meeting.id, title='M1', text_md='T', category='motion', threshold='normal', ordering=1)
+        member = Member(meeting_id=meeting.id, name='A')
+        db.session.add_all([motion, member])
+        db.session.commit()
+        Vote.record(member_id=member.id, motion_id=motion.id, choice='for', salt='s', stage=2)
+        VoteTally.query.update({'count': 5})
+        db.session.commit()
+
+        drift = tally.rebuild_counters(meeting.id)
+
+        assert drift == [((meeting.id, 'motion', motion.id, 2, 'for'), 5, 1)]
+        assert tally.meeting_tallies(meeting.id)['motion'][motion.id]['for'] == 1
+        assert tally.rebuild_counters() == []
+
+
+def test_rebuild_counters_counts_legacy_null_test_flag():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM')
+        db.session.add(meeting)
+        db.session.flush()
+        motion = Motion(meeting_id=meeting.id, title='M1', text_md='T', category='motion', threshold='normal', ordering=1)
+        member = Member(meeting_id=meeting.id, name='A')
+        db.session.add_all([motion, member])
+        db.session.commit()
+        Vote.record(member_id=member.id, motion_id=motion.id, choice='for', salt='s', stage=2)
+        Vote.query.update({'is_test': None})
+        db.session.commit()
+
+        assert tally.rebuild_counters(meeting.id) == []
+        assert tally.meeting_tallies(meeting.id)['motion'][motion.id]['for'] == 1
+
+
+def test_completed_meeting_served_from_snapshot():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        meeting = Meeting(title='AGM', status='Stage 2')
+        db.session.add(meeting)
+        db.session.flush()
+        motion = Motion(meeting_id=meeting.id, title='M1', text_md='T', category='motion', threshold='normal', ordering=1, status='carried')
+        m1 = Member(meeting_id=meeting.id, name='A')
+        m2 = Member(meeting_id=meeting.id, name='B')
+        db.session.add_all([motion, m1, m2])
+        db.session.commit()
+        Vote.record(member_id=m1.id, motion_id=motion.id, choice='for', salt='s', stage=2)
+
+        meeting.status = 'Completed'
+        snapshot = tally.freeze_results(meeting, 2)
+        db.session.commit()
+        assert len(snapshot.digest) == 64
+
+        # a late vote must not change the frozen results
+        Vote.record(member_id=m2.id, motion_id=motion.id, choice='against', salt='s', stage=2)
+        assert tally.results_tallies(meeting)['motion'][motion.id]['against'] == 0
+        assert tally.meeting_tallies(meeting.id)['motion'][motion.id]['against'] == 1
+        assert db.session.get(ResultSnapshot, (meeting.id, 2)).statuses == {
+            'amendment': {},
+            'motion': {motion.id: 'carried'},
+        }
+
+
+        # later edits to the row do not change the published outcome
+        motion.status = 'failed'
+        db.session.commit()
+        [(shown, counts)] = tally.motion_results(meeting)
+        assert shown.status == 'carried'
+        assert shown.title == 'M1'
+        assert counts['for'] == 1
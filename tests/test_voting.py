@@ -4,6 +4,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from datetime import datetime
 import hashlib
+import time
 
 import pytest
 from werkzeug.exceptions import NotFound, Forbidden
@@ -1174,3 +1175,51 @@ def test_preview_runoff_ballot():
                 html = voting.runoff_ballot("preview")
                 assert "Run-off Vote" in html
 
+
+
+def test_signed_token_votes_and_rejects_tampering_without_query():
+    app = _setup_app()
+    with app.app_context():
+        db.create_all()
+        now = datetime.utcnow()
+        meeting = Meeting(
+            title="AGM",
+            opens_at_stage1=now - timedelta(hours=1),
+            closes_at_stage1=now + timedelta(hours=1),
+        )
+        db.session.add(meeting)
+        db.session.flush()
+        member = Member(meeting_id=meeting.id, name="Alice", email="a@example.com")
+        db.session.add(member)
+        db.session.flush()
+        app.config["SIGNED_VOTE_TOKENS"] = False
+        legacy_token, legacy = VoteToken.create(member_id=member.id, stage=2, salt="other")
+        app.config["SIGNED_VOTE_TOKENS"] = True
+        (_, plain), = VoteToken.create_bulk([member.id], 1, app.config["TOKEN_SALT"])
+        db.session.commit()
+
+        assert "." in plain and "." not in legacy
+        vote_token, loaded_member, holder, loaded_meeting, used = VoteToken.load(
+            plain, app.config["TOKEN_SALT"]
+        )
+        assert (loaded_member.id, holder, loaded_meeting.id, used) == (
+            member.id, None, meeting.id, False
+        )
+        # tokens issued before signing was enabled still verify
+        assert VoteToken.verify(legacy, "other") is legacy_token
+
+        tampered = plain[:-2] + ("AA" if not plain.endswith("AA") else "BB")
+        with patch.object(db.session, "execute") as execute, patch.object(
+            db.session, "get"
+        ) as get:
+            assert VoteToken.load(tampered, app.config["TOKEN_SALT"]) is None
+            assert VoteToken.verify(tampered, app.config["TOKEN_SALT"]) is None
+            with patch("app.models.time.time", return_value=time.time() + 91 * 86400):
+                assert VoteToken.load(plain, app.config["TOKEN_SALT"]) is None
+            execute.assert_not_called()
+            get.assert_not_called()
+
+        with app.test_request_context(f"/vote/{plain}"):
+            html = voting.ballot_token(plain)
+            assert isinstance(html, str)
+            assert "AGM" in html